@@ -19,6 +19,10 @@ from app.models.base import Base
 from app.models.member import Member
 from app.models.payment import Payment, PaymentResult
 from app.models.reward import Reward, RewardCalculation
+from app.models.genealogy import MemberTreePath
+from app.models.dashboard import MonthlyStats
+from app.models.user import User
+from app.models.job import Job
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
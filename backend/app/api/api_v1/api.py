@@ -7,8 +7,7 @@ from fastapi import APIRouter
 from app.api.api_v1.endpoints import (
     dashboard,
     members, 
-    payments,
-    reports,
+    jobs,
     auth
 )
 
@@ -34,13 +33,7 @@ api_router.include_router(
 )
 
 api_router.include_router(
-    payments.router, 
-    prefix="/payments", 
-    tags=["決済管理"]
-)
-
-api_router.include_router(
-    reports.router, 
-    prefix="/reports", 
-    tags=["レポート"]
+    jobs.router, 
+    prefix="/jobs", 
+    tags=["ジョブ"]
 )
\ No newline at end of file
@@ -9,42 +9,52 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 
 from app.core.database import get_db
 from app.core.config import settings
-from app.models.user import User as UserModel
-from app.schemas.auth import Token, User, UserLogin, UserRegister
+from app.core.passwords import PasswordHashingBusy, password_hasher
+from app.core.principals import Principal, principal_cache
+from app.models.user import User as UserModel, UserRole
+from app.schemas.auth import Token, User, UserLogin, UserRegister, UserUpdate
 
 router = APIRouter()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """パスワード検証"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """パスワード検証（スレッドプールで実行）"""
+    valid, _ = await password_hasher.verify(plain_password, hashed_password)
+    return valid
+
 
+async def get_password_hash(password: str) -> str:
+    """パスワードハッシュ化（スレッドプールで実行）"""
+    return await password_hasher.hash(password)
 
-def get_password_hash(password: str) -> str:
-    """パスワードハッシュ化"""
-    return pwd_context.hash(password)
+
+def hashing_busy_exception() -> HTTPException:
+    """ハッシュ処理の実行待ちが上限に達した場合の応答"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent login requests, please retry",
+        headers={"Retry-After": "1"},
+    )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """アクセストークン生成"""
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # iat はユーザーの失効（principal_cache.revoke）より前に発行されたトークンの判定に使う
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -57,18 +67,31 @@ async def get_user_by_email(db: AsyncSession, email: str) -> Optional[UserModel]
 
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[UserModel]:
-    """ユーザー認証"""
+    """
+    ユーザー認証
+    ハッシュのコストが設定と異なる場合は、検証に使ったパスワードで再ハッシュして保存する。
+    """
     user = await get_user_by_email(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+    if not user:
+        return None
+    valid, new_hash = await password_hasher.verify(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-) -> UserModel:
-    """現在のユーザー取得"""
+) -> Principal:
+    """
+    現在のユーザー取得
+    通常はトークンのクレームだけで認証し、失効後のトークン・旧形式のトークンの
+    場合のみ DB（principal_cache にキャッシュ）を参照する。
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -83,16 +106,20 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = await get_user_by_email(db, email)
-    if user is None:
+    async def load_principal() -> Optional[Principal]:
+        user = await get_user_by_email(db, email)
+        return Principal.from_user(user) if user else None
+    
+    principal = await principal_cache.resolve(payload, load_principal)
+    if principal is None:
         raise credentials_exception
     
-    return user
+    return principal
 
 
 async def get_current_active_user(
-    current_user: UserModel = Depends(get_current_user)
-) -> UserModel:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """アクティブなユーザー取得"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -107,7 +134,10 @@ async def login(
     """
     ログイン・トークン取得
     """
-    user = await authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except PasswordHashingBusy:
+        raise hashing_busy_exception()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -117,7 +147,7 @@ async def login(
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data=Principal.from_user(user).claims(), expires_delta=access_token_expires
     )
     
     return Token(
@@ -144,7 +174,10 @@ async def register(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await get_password_hash(user_data.password)
+    except PasswordHashingBusy:
+        raise hashing_busy_exception()
     user = UserModel(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -160,9 +193,39 @@ async def register(
     return User.from_orm(user)
 
 
+@router.patch("/users/{user_id}", response_model=User)
+async def update_user(
+    user_id: int,
+    user_data: UserUpdate,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ユーザー更新（権限変更・無効化）
+    変更したユーザーの発行済みトークンは次回から DB の状態で認証する。
+    """
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    
+    user = await db.get(UserModel, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    update_data = user_data.dict(exclude_unset=True)
+    changed = any(getattr(user, field) != value for field, value in update_data.items())
+    for field, value in update_data.items():
+        setattr(user, field, value)
+    
+    await db.commit()
+    if changed:
+        await principal_cache.revoke(user.email)
+    
+    return User.from_orm(user)
+
+
 @router.get("/me", response_model=User)
 async def get_current_user_info(
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     現在のユーザー情報取得
@@ -1,72 +1,110 @@
 """
 IROAS BOSS System - Dashboard API
 ダッシュボード用APIエンドポイント (P-001対応)
+
+集計値は monthly_stats（月次集計）から読み出す。レスポンスは更新時にタグで無効化して
+キャッシュするため、無効化直後にレプリカの古い値をキャッシュしないようプライマリから読む。
 """
 
-from typing import Dict, Any
-from fastapi import APIRouter, Depends
+import calendar
+from decimal import Decimal
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import CACHE_TAG_DASHBOARD, cached
 from app.core.database import get_db
+from app.schemas.dashboard import AlertItem, ChartData, DashboardStats, GrowthRates
+from app.services.dashboard_stats import MonthSnapshot, get_monthly_snapshots
 
 router = APIRouter()
 
+# チャートに表示する月数
+CHART_MONTHS = 12
+
+
+def _growth_percent(current: Decimal, previous: Decimal) -> float:
+    """前月比（%）。前月が0の場合は0"""
+    if not previous:
+        return 0.0
+    return round(float((current - previous) / previous * 100), 1)
+
+
+def _difference(current, previous) -> int:
+    """前月差（未集計の月は0）"""
+    if current is None or previous is None:
+        return 0
+    return current - previous
+
 
-@router.get("/stats")
+def _alerts(current: MonthSnapshot) -> List[AlertItem]:
+    """ダッシュボードのアラート"""
+    alerts = []
+    if current.unpaid_count:
+        alerts.append(AlertItem(
+            type="error",
+            message=f"未決済アラート: {current.unpaid_count}件の未決済があります。月次処理前に確認してください。"
+        ))
+    month_end = current.month.replace(day=calendar.monthrange(current.month.year, current.month.month)[1])
+    alerts.append(AlertItem(
+        type="info",
+        message=f"月次処理予定: {month_end.year}年{month_end.month}月{month_end.day}日に月次処理を実行予定です。"
+    ))
+    if current.new_members:
+        alerts.append(AlertItem(
+            type="warning",
+            message=f"会員数更新: 新規会員が{current.new_members}名増加しました。"
+        ))
+    return alerts
+
+
+@router.get("/stats", response_model=DashboardStats)
+@cached("dashboard.stats", tags=[CACHE_TAG_DASHBOARD])
 async def get_dashboard_stats(
     db: AsyncSession = Depends(get_db)
-) -> Dict[str, Any]:
+):
     """
     ダッシュボード統計データ取得
-    P-001 ダッシュボードで使用
+    P-001 ダッシュボードで使用（当月・前月の月次集計を比較）
     """
-    # TODO: 実際のデータベースクエリを実装
-    return {
-        "monthly_sales": 2856000,
-        "active_members": 1247,
-        "suspended_members": 89,
-        "withdrawn_members": 34,
-        "unpaid_count": 15,
-        "total_revenue": 485600,
-        "growth_rates": {
-            "sales": 12.3,
-            "active_members": 23,
-            "suspended_members": 5,
-            "withdrawn_members": 8,
-            "revenue": 8.7
-        },
-        "alerts": [
-            {
-                "type": "error",
-                "message": "未決済アラート: 15件の未決済があります。月次処理前に確認してください。"
-            },
-            {
-                "type": "info", 
-                "message": "月次処理予定: 2025年8月31日に月次処理を実行予定です。"
-            },
-            {
-                "type": "warning",
-                "message": "会員数更新: 新規会員が23名増加しました。"
-            }
-        ]
-    }
-
-
-@router.get("/chart-data")
+    previous, current = await get_monthly_snapshots(db, months=2)
+
+    return DashboardStats(
+        monthly_sales=current.sales_amount,
+        active_members=current.active_members or 0,
+        suspended_members=current.suspended_members or 0,
+        withdrawn_members=current.withdrawn_members or 0,
+        unpaid_count=current.unpaid_count or 0,
+        total_revenue=current.revenue,
+        growth_rates=GrowthRates(
+            sales=_growth_percent(current.sales_amount, previous.sales_amount),
+            active_members=_difference(current.active_members, previous.active_members),
+            suspended_members=_difference(current.suspended_members, previous.suspended_members),
+            withdrawn_members=_difference(current.withdrawn_members, previous.withdrawn_members),
+            revenue=_growth_percent(current.revenue, previous.revenue),
+        ),
+        alerts=_alerts(current)
+    )
+
+
+@router.get("/chart-data", response_model=ChartData)
+@cached("dashboard.chart", tags=[CACHE_TAG_DASHBOARD], ttl=300)
 async def get_chart_data(
     period: str = "monthly",
     db: AsyncSession = Depends(get_db)
-) -> Dict[str, Any]:
+):
     """
     チャート用データ取得
-    月次売上推移等のグラフデータ
+    月次売上推移・在籍会員数推移（直近12ヶ月）
     """
-    # TODO: 実際のデータベースクエリを実装
-    if period == "monthly":
-        return {
-            "labels": ["2024年1月", "2024年2月", "2024年3月", "2024年4月", "2024年5月", "2024年6月"],
-            "sales": [2200000, 2350000, 2580000, 2420000, 2680000, 2856000],
-            "members": [1180, 1205, 1220, 1198, 1224, 1247]
-        }
-    
-    return {"message": "Invalid period specified"}
\ No newline at end of file
+    if period != "monthly":
+        raise HTTPException(status_code=400, detail="Invalid period specified")
+
+    snapshots = await get_monthly_snapshots(db, months=CHART_MONTHS)
+
+    return ChartData(
+        labels=[f"{s.month.year}年{s.month.month}月" for s in snapshots],
+        sales=[s.sales_amount for s in snapshots],
+        members=[s.total_members for s in snapshots]
+    )
\ No newline at end of file
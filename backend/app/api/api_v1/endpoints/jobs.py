@@ -0,0 +1,121 @@
+"""
+IROAS BOSS System - Jobs API
+バックグラウンドジョブ（報酬計算・振込データ作成・消込）の登録・状況確認
+
+ジョブは scripts/job_worker.py（または JOB_WORKER_IN_PROCESS 指定時は API プロセス内）の
+ワーカーが実行する。登録・キャンセルは管理者のみ。
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.api_v1.endpoints.auth import get_current_active_user
+from app.core.database import get_db
+from app.core.principals import Principal
+from app.models.job import Job as JobModel
+from app.models.user import UserRole
+from app.schemas.job import Job, JobList, JobSubmit
+from app.services.job_handlers import JOB_DEFINITIONS
+from app.services.jobs import JobNotCancellable, request_cancel, submit_job
+
+router = APIRouter()
+
+
+def _require_admin(current_user: Principal) -> None:
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+
+
+async def _get_job(db: AsyncSession, job_id: int) -> JobModel:
+    job = await db.get(JobModel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    job_data: JobSubmit,
+    response: Response,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ジョブ登録
+    同じ対象（報酬対象月など）のジョブが実行待ち・実行中・成功済みの場合は登録せず、
+    そのジョブを 200 で返す（成功済みを再実行する場合は rerun=true）。
+    """
+    _require_admin(current_user)
+    definition = JOB_DEFINITIONS.get(job_data.job_type)
+    if definition is None:
+        raise HTTPException(status_code=400, detail=f"Unknown job type: {job_data.job_type}")
+    try:
+        params, key = definition.prepare(job_data.dict(exclude={"job_type", "rerun"}, exclude_none=True))
+        if definition.check is not None:
+            await definition.check(db, params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job, created = await submit_job(
+        db, job_data.job_type, params, key, rerun=job_data.rerun, submitted_by=current_user.email
+    )
+    await db.commit()
+    await db.refresh(job)
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return Job.from_orm(job)
+
+
+@router.get("/", response_model=JobList)
+async def get_jobs(
+    job_type: Optional[str] = Query(None, description="ジョブ種別"),
+    status: Optional[str] = Query(None, description="ステータス"),
+    limit: int = Query(50, ge=1, le=500, description="取得する件数"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ジョブ一覧（新しい順）
+    """
+    query = select(JobModel).order_by(JobModel.id.desc()).limit(limit)
+    if job_type:
+        query = query.where(JobModel.job_type == job_type)
+    if status:
+        query = query.where(JobModel.status == status)
+    result = await db.execute(query)
+    return JobList(jobs=[Job.from_orm(job) for job in result.scalars()])
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(
+    job_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ジョブの状況（進捗・処理件数・結果）
+    """
+    return Job.from_orm(await _get_job(db, job_id))
+
+
+@router.post("/{job_id}/cancel", response_model=Job)
+async def cancel_job(
+    job_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ジョブのキャンセル
+    実行待ちはその場でキャンセルする。実行中は中断を要求し、ワーカーが次の進捗記録の
+    時点で処理結果を rollback して cancelled にする。
+    """
+    _require_admin(current_user)
+    job = await _get_job(db, job_id)
+    try:
+        job = await request_cancel(db, job)
+    except JobNotCancellable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    await db.commit()
+    return Job.from_orm(job)
\ No newline at end of file
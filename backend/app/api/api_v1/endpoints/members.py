@@ -3,72 +3,103 @@ IROAS BOSS System - Members API
 会員管理APIエンドポイント (P-002対応)
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
+from sqlalchemy.orm import joinedload, selectinload
 from datetime import datetime
 
-from app.core.database import get_db
+from app.api.api_v1.endpoints.auth import get_current_active_user
+from app.core.cache import CACHE_TAG_DASHBOARD, CACHE_TAG_MEMBERS, cached, response_cache
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.core.principals import Principal
 from app.models.member import Member as MemberModel, MemberStatus
+from app.models.user import UserRole
 from app.schemas.member import (
-    Member, MemberCreate, MemberUpdate, MemberList, MemberStats
+    Member, MemberCreate, MemberUpdate, MemberList, MemberStats, MemberSummaryList,
+    MemberBulkResult, DownlineNode, DownlinePage
+)
+from app.services.dashboard_stats import record_member_registered, record_member_status_change
+from app.services.genealogy import (
+    downline_nodes_query, index_new_member, parse_downline_after, reindex_member_parents
+)
+from app.services.master_data import JST
+from app.services.member_bulk import bulk_create_members, bulk_update_members
+from app.services.member_export import (
+    EXPORT_FORMAT_CSV, EXPORT_FORMAT_XLSX, EXPORT_MEDIA_TYPES, stream_csv, stream_xlsx
+)
+from app.services.member_search import (
+    COUNT_EXACT, COUNT_MODES, SUMMARY_FIELDS, parse_after, parse_fields, search_members
 )
 
 router = APIRouter()
 
+# NDJSONストリーミング時に1回でフェッチする行数
+DOWNLINE_STREAM_BATCH_SIZE = 1000
+
 
-@router.get("/", response_model=MemberList)
+def _require_admin(current_user: Principal) -> None:
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(status_code=403, detail="Admin only")
+
+
+@router.get("/", response_model=Union[MemberList, MemberSummaryList])
+@cached("members.list", tags=[CACHE_TAG_MEMBERS], ttl=30)
 async def get_members(
     skip: int = Query(0, ge=0, description="スキップする件数"),
     limit: int = Query(100, ge=1, le=1000, description="取得する件数"),
     status: Optional[str] = Query(None, description="ステータスフィルタ"),
     search: Optional[str] = Query(None, description="検索キーワード"),
+    cursor: Optional[str] = Query(None, description="次ページカーソル（指定時は skip を無視）"),
+    count: str = Query(COUNT_EXACT, pattern=f"^({'|'.join(COUNT_MODES)})$", description="件数の求め方"),
+    view: str = Query("full", pattern=r'^(full|summary)$', description="返す項目（summary は一覧表示用の列のみ）"),
+    fields: Optional[str] = Query(None, description="返す列（カンマ区切り。指定時は view より優先）"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     会員一覧取得
     P-002 会員管理ページで使用
+    search は会員番号・氏名・カナ（半角/全角/ひらがな可）・メール・電話番号の部分一致で、
+    指定時は関連度順に並べる。深いページは skip ではなく next_cursor で辿ること。
+    count: exact（正確な件数）/ estimated（推定値）/ cached（キャッシュ済みの件数）/ none
+    view=summary または fields 指定時は必要な列だけを取得し、MemberSummaryList で返す。
     """
-    # Base query
-    query = select(MemberModel)
-    count_query = select(func.count(MemberModel.id))
-    
-    # Status filter
-    if status:
-        query = query.where(MemberModel.status == status)
-        count_query = count_query.where(MemberModel.status == status)
-    
-    # Search filter
-    if search:
-        search_filter = (
-            MemberModel.family_name.contains(search) |
-            MemberModel.given_name.contains(search) |
-            MemberModel.member_code.contains(search) |
-            MemberModel.email.contains(search)
-        )
-        query = query.where(search_filter)
-        count_query = count_query.where(search_filter)
-    
-    # Add pagination and ordering
-    query = query.offset(skip).limit(limit).order_by(MemberModel.registration_date.desc())
+    try:
+        after = parse_after(decode_cursor(cursor, 2))
+    except (InvalidCursor, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    # Execute queries
-    result = await db.execute(query)
-    count_result = await db.execute(count_query)
-    
-    members = result.scalars().all()
-    total = count_result.scalar()
+    try:
+        columns = parse_fields(fields)
+        if columns is None and view == "summary":
+            columns = SUMMARY_FIELDS
+        page = await search_members(
+            db, query=search, status=status, skip=skip, limit=limit, after=after, count=count,
+            fields=columns, options=(selectinload(MemberModel.sponsor),)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return MemberList(
-        members=[Member.from_orm(member) for member in members],
-        total=total,
-        page=(skip // limit) + 1,
-        size=limit
+    paging = dict(
+        total=page.total,
+        total_estimated=page.total_estimated,
+        page=(skip // limit) + 1 if after is None else 1,
+        size=limit,
+        next_cursor=encode_cursor(*page.next_after) if page.next_after else None
     )
+    if columns is not None:
+        # 行 dict は DB の型のままなので検証を省いて組み立てる
+        return MemberSummaryList.model_construct(members=page.members, **paging)
+    return MemberList(members=[Member.from_orm(member) for member in page.members], **paging)
 
 
 @router.get("/stats", response_model=MemberStats)
+@cached("members.stats", tags=[CACHE_TAG_MEMBERS])
 async def get_member_stats(
     db: AsyncSession = Depends(get_db)
 ):
@@ -103,6 +134,69 @@ async def get_member_stats(
     )
 
 
+@router.get("/export")
+async def export_members(
+    format: str = Query(EXPORT_FORMAT_CSV, pattern=r'^(csv|xlsx)$', description="出力形式"),
+    status: Optional[str] = Query(None, description="ステータスフィルタ"),
+    search: Optional[str] = Query(None, description="検索キーワード"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    会員一覧エクスポート（経理向け・管理者のみ）
+    旧システムの master_data.CSV と同じ列構成で、csv は cp932、xlsx は Excel ブック。
+    status / search は会員一覧と同じ絞り込み。登録日順に全件をストリーミングで返す。
+    口座情報・住所・連絡先を含むため管理者に限る。
+    """
+    _require_admin(current_user)
+    stream = stream_xlsx if format == EXPORT_FORMAT_XLSX else stream_csv
+    filename = f"members_{datetime.now(JST):%Y%m%d_%H%M%S}.{format}"
+    # text/* の media_type には utf-8 の charset が付け足されるため Content-Type は直接指定する
+    return StreamingResponse(
+        stream(db, query=search, status=status),
+        headers={
+            "Content-Type": EXPORT_MEDIA_TYPES[format],
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        }
+    )
+
+
+@router.post("/bulk", response_model=MemberBulkResult)
+async def bulk_create(
+    items: List[Any] = Body(..., max_length=settings.MEMBER_BULK_MAX_ITEMS, description="MemberCreate の配列"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    会員一括登録（管理者のみ）
+    行ごとに検証し、エラーの行を除いて登録する（results はリクエストと同じ順）。
+    """
+    _require_admin(current_user)
+    report = await bulk_create_members(db, items)
+    await db.commit()
+    if report.succeeded:
+        await response_cache.invalidate(CACHE_TAG_MEMBERS, CACHE_TAG_DASHBOARD)
+    return report
+
+
+@router.patch("/bulk", response_model=MemberBulkResult)
+async def bulk_update(
+    items: List[Any] = Body(..., max_length=settings.MEMBER_BULK_MAX_ITEMS, description="id + MemberUpdate の配列"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    会員一括更新（管理者のみ）
+    各行は id と更新する項目のみを含める。ステータス変更時の日付は update_member と同じ。
+    """
+    _require_admin(current_user)
+    report = await bulk_update_members(db, items)
+    await db.commit()
+    if report.succeeded:
+        await response_cache.invalidate(CACHE_TAG_MEMBERS, CACHE_TAG_DASHBOARD)
+    return report
+
+
 @router.get("/{member_id}", response_model=Member)
 async def get_member(
     member_id: int,
@@ -111,9 +205,7 @@ async def get_member(
     """
     会員詳細取得
     """
-    query = select(MemberModel).where(MemberModel.id == member_id)
-    result = await db.execute(query)
-    member = result.scalar_one_or_none()
+    member = await _load_member(db, member_id)
     
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
@@ -121,6 +213,74 @@ async def get_member(
     return Member.from_orm(member)
 
 
+async def _load_member(db: AsyncSession, member_id: int) -> Optional[MemberModel]:
+    """
+    レスポンス（Member）用の会員取得
+    スポンサーも同じクエリで読む。identity map にある会員も DB の値で上書きする
+    （登録・更新のコミット後に refresh の代わりに使う）。
+    """
+    query = select(MemberModel).options(
+        joinedload(MemberModel.sponsor)
+    ).where(MemberModel.id == member_id).execution_options(populate_existing=True)
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+
+@router.get("/{member_id}/downline", response_model=DownlinePage)
+async def get_member_downline(
+    member_id: int,
+    tree: str = Query("upline", pattern=r'^(sponsor|upline)$', description="ツリー種別"),
+    max_depth: Optional[int] = Query(None, ge=1, description="取得する最大段数"),
+    cursor: Optional[str] = Query(None, description="次ページカーソル"),
+    limit: int = Query(1000, ge=1, le=10000, description="取得する件数"),
+    format: str = Query("json", pattern=r'^(json|ndjson)$', description="レスポンス形式"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    ダウンライン取得（組織図用）
+    幅優先順（段数, 会員ID）で返す。format=ndjson の場合は cursor 以降の全件を
+    1行1会員でストリーミングする。
+    """
+    member_query = select(MemberModel.id).where(MemberModel.id == member_id)
+    member_result = await db.execute(member_query)
+    if member_result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+    
+    try:
+        after = parse_downline_after(decode_cursor(cursor, 2))
+    except (InvalidCursor, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    query = downline_nodes_query(tree, member_id, max_depth, after)
+    
+    if format == "ndjson":
+        return StreamingResponse(_stream_downline(db, query), media_type="application/x-ndjson")
+    
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].depth, rows[-1].id)
+    
+    return DownlinePage(
+        member_id=member_id,
+        tree=tree,
+        nodes=[DownlineNode.from_orm(row) for row in rows],
+        next_cursor=next_cursor
+    )
+
+
+async def _stream_downline(db: AsyncSession, query):
+    """ダウンラインをNDJSONで逐次出力（サーバーサイドカーソル）"""
+    result = await db.stream(query.execution_options(yield_per=DOWNLINE_STREAM_BATCH_SIZE))
+    async for rows in result.partitions():
+        yield "".join(
+            json.dumps(dict(row._mapping), ensure_ascii=False) + "\n" for row in rows
+        )
+
+
 @router.post("/", response_model=Member)
 async def create_member(
     member_data: MemberCreate,
@@ -153,8 +313,17 @@ async def create_member(
     )
     
     db.add(member)
+    await db.flush()
+    
+    # Genealogy index (sponsor / upline)
+    await index_new_member(db, member)
+    
+    # Dashboard rollups
+    await record_member_registered(db, member.status, member.registration_date)
+    
     await db.commit()
-    await db.refresh(member)
+    await response_cache.invalidate(CACHE_TAG_MEMBERS, CACHE_TAG_DASHBOARD)
+    member = await _load_member(db, member.id)
     
     return Member.from_orm(member)
 
@@ -177,9 +346,23 @@ async def update_member(
     
     # Update fields
     update_data = member_data.dict(exclude_unset=True)
+    old_status = member.status
+    changed_parents = {
+        field: update_data[field]
+        for field in ("sponsor_id", "upline_id")
+        if field in update_data and update_data[field] != getattr(member, field)
+    }
     for field, value in update_data.items():
         setattr(member, field, value)
     
+    # Genealogy index (sponsor / upline)
+    if changed_parents:
+        try:
+            await reindex_member_parents(db, member, changed_parents)
+        except ValueError as e:
+            await db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
+    
     # Handle status change dates
     if 'status' in update_data:
         now = datetime.utcnow()
@@ -190,9 +373,13 @@ async def update_member(
         elif update_data['status'] == MemberStatus.WITHDRAWN.value:
             member.withdrawal_date = now
             member.is_active = False
+        
+        # Dashboard rollups
+        await record_member_status_change(db, old_status, member.status)
     
     await db.commit()
-    await db.refresh(member)
+    await response_cache.invalidate(CACHE_TAG_MEMBERS, CACHE_TAG_DASHBOARD)
+    member = await _load_member(db, member.id)
     
     return Member.from_orm(member)
 
@@ -213,10 +400,12 @@ async def delete_member(
         raise HTTPException(status_code=404, detail="Member not found")
     
     # Soft delete by setting status to withdrawn
+    await record_member_status_change(db, member.status, MemberStatus.WITHDRAWN.value)
     member.status = MemberStatus.WITHDRAWN.value
     member.withdrawal_date = datetime.utcnow()
     member.is_active = False
     
     await db.commit()
+    await response_cache.invalidate(CACHE_TAG_MEMBERS, CACHE_TAG_DASHBOARD)
     
     return {"message": "Member deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,306 @@
+"""
+IROAS BOSS System - Response Cache
+参照系APIのレスポンスキャッシュ（Redis + プロセス内LRUフォールバック）
+
+シリアライズ済みのレスポンス（JSON）をルート・クエリパラメータ単位で保存する。
+無効化はタグのバージョン番号で行い、登録・更新処理から invalidate(タグ) を
+呼ぶとそのタグを持つエントリはすべて次回参照時にミスになる（キーの走査・削除は
+しない）。Redis に接続できない間はプロセス内LRUを短いTTLで使う。
+"""
+
+import functools
+import hashlib
+import json
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import redis.asyncio as redis
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+
+# キャッシュタグ
+CACHE_TAG_MEMBERS = "members"
+CACHE_TAG_DASHBOARD = "dashboard"
+
+# Redis 応答待ちの上限（秒）。超えた場合は停止とみなしてフォールバックする
+REDIS_TIMEOUT_SECONDS = 0.2
+
+
+@dataclass
+class CacheStats:
+    """キャッシュのヒット・ミス件数"""
+    hits: int = 0
+    misses: int = 0
+    local_hits: int = 0
+    local_misses: int = 0
+    stores: int = 0
+    invalidations: int = 0
+    redis_errors: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.local_hits + self.local_misses
+        return {
+            **asdict(self),
+            "hit_ratio": round((self.hits + self.local_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+class LocalLRU:
+    """プロセス内LRU（保持バイト数で上限を設ける）"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[int, ...], bytes]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, versions: Tuple[int, ...]) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, entry_versions, body = entry
+        if expires_at < time.monotonic() or entry_versions != versions:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: str, versions: Tuple[int, ...], body: bytes, ttl: float) -> None:
+        if len(body) > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, versions, body)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[2])
+
+
+class RedisConnection:
+    """
+    Redis 接続（停止を検知したら retry_seconds の間は使わない）
+    応答待ちは REDIS_TIMEOUT_SECONDS まで。呼び出し側は RedisError / OSError を
+    捕捉して failed() を呼び、client() が None の間はフォールバックする。
+    """
+
+    def __init__(self, url: str, retry_seconds: int, name: str):
+        self.url = url
+        self.retry_seconds = retry_seconds
+        self.name = name
+        self._redis: Optional[redis.Redis] = None
+        self._down_until = 0.0
+
+    @property
+    def down(self) -> bool:
+        return time.monotonic() < self._down_until
+
+    def client(self) -> Optional[redis.Redis]:
+        if self.down:
+            return None
+        if self._redis is None:
+            self._redis = redis.from_url(
+                self.url,
+                socket_timeout=REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+            )
+        return self._redis
+
+    def failed(self, error: Exception) -> None:
+        if not self.down:
+            logger.warning(f"{self.name}: Redis unavailable, using in-process cache ({error!r})")
+        self._down_until = time.monotonic() + self.retry_seconds
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+class ResponseCache:
+    """
+    レスポンスキャッシュ
+    Redis のエントリは「タグバージョン（カンマ区切り）\\n本文」の形式で保存し、
+    参照時はエントリとタグバージョンを1往復のパイプラインで取得して比較する。
+    """
+
+    def __init__(self, url: str, prefix: str, local_max_bytes: int, local_ttl: int, retry_seconds: int):
+        self.prefix = prefix
+        self.local_ttl = local_ttl
+        self.stats = CacheStats()
+        self.local = LocalLRU(local_max_bytes)
+        self.redis = RedisConnection(url, retry_seconds, "response cache")
+        self._local_versions: Dict[str, int] = defaultdict(int)
+        # Redis 停止中に行った無効化（復旧後に反映する）
+        self._pending_tags: Set[str] = set()
+
+    def key(self, namespace: str, params: Dict[str, Any]) -> str:
+        """ルート名 + クエリパラメータ -> キャッシュキー"""
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()[:20]
+        return f"{self.prefix}:{namespace}:{digest}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def _client(self) -> Optional[redis.Redis]:
+        return self.redis.client()
+
+    def _redis_failed(self, error: Exception) -> None:
+        self.stats.redis_errors += 1
+        self.redis.failed(error)
+
+    async def lookup(self, key: str, tags: Sequence[str]) -> Tuple[Optional[bytes], Tuple[int, ...], bool]:
+        """
+        キャッシュ参照
+        戻り値は (本文 or None, 参照時点のタグバージョン, Redis を使ったか)。
+        ミス時は同じバージョンを store に渡す（計算中に無効化された結果を新しい版として保存しない）。
+        """
+        client = self._client()
+        if client is not None and self._pending_tags:
+            await self.invalidate()
+            client = self._client()
+        if client is not None:
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    pipe.get(key)
+                    pipe.mget([self._tag_key(tag) for tag in tags])
+                    entry, raw_versions = await pipe.execute()
+            except (redis.RedisError, OSError) as e:
+                self._redis_failed(e)
+            else:
+                versions = tuple(int(v or 0) for v in raw_versions)
+                if entry is not None:
+                    header, _, body = entry.partition(b"\n")
+                    if header.decode() == ",".join(map(str, versions)):
+                        self.stats.hits += 1
+                        return body, versions, True
+                self.stats.misses += 1
+                return None, versions, True
+
+        versions = tuple(self._local_versions[tag] for tag in tags)
+        body = self.local.get(key, versions)
+        if body is not None:
+            self.stats.local_hits += 1
+        else:
+            self.stats.local_misses += 1
+        return body, versions, False
+
+    async def store(self, key: str, versions: Tuple[int, ...], body: bytes, ttl: int, use_redis: bool) -> None:
+        """キャッシュ保存"""
+        self.stats.stores += 1
+        if use_redis:
+            client = self._client()
+            if client is not None:
+                try:
+                    await client.set(key, ",".join(map(str, versions)).encode() + b"\n" + body, ex=ttl)
+                    return
+                except (redis.RedisError, OSError) as e:
+                    self._redis_failed(e)
+            return
+        self.local.set(key, versions, body, min(ttl, self.local_ttl))
+
+    async def invalidate(self, *tags: str) -> None:
+        """
+        タグの無効化（バージョンを進める）
+        Redis に反映できなかったタグは保持し、次回の接続時に反映する。
+        """
+        if tags:
+            self.stats.invalidations += 1
+        for tag in tags:
+            self._local_versions[tag] += 1
+        self._pending_tags.update(tags)
+        client = self._client()
+        if client is None or not self._pending_tags:
+            return
+        pending = sorted(self._pending_tags)
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for tag in pending:
+                    pipe.incr(self._tag_key(tag))
+                await pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            self._redis_failed(e)
+        else:
+            self._pending_tags.difference_update(pending)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """統計情報"""
+        return {
+            **self.stats.as_dict(),
+            "backend": "local" if self.redis.down else "redis",
+            "local_entries": len(self.local),
+            "local_bytes": self.local.size,
+        }
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+
+response_cache = ResponseCache(
+    url=settings.REDIS_URL,
+    prefix=settings.CACHE_KEY_PREFIX,
+    local_max_bytes=settings.CACHE_LOCAL_MAX_BYTES,
+    local_ttl=settings.CACHE_LOCAL_TTL,
+    retry_seconds=settings.CACHE_REDIS_RETRY_SECONDS,
+)
+
+
+def _serialize(result: Any) -> bytes:
+    """エンドポイントの戻り値 -> JSON（response_model のシリアライズと同じ形式）"""
+    if isinstance(result, BaseModel):
+        return result.model_dump_json(by_alias=True).encode()
+    return json.dumps(jsonable_encoder(result), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def cached(namespace: str, tags: Sequence[str], ttl: Optional[int] = None):
+    """
+    参照系エンドポイントのレスポンスキャッシュ
+    キーは namespace と引数（DBセッション以外）から作る。応答には X-Cache: HIT/MISS を付ける。
+
+        @router.get("/stats", response_model=MemberStats)
+        @cached("members.stats", tags=[CACHE_TAG_MEMBERS])
+        async def get_member_stats(db: AsyncSession = Depends(get_db)): ...
+    """
+    tags: List[str] = list(tags)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not settings.CACHE_ENABLED:
+                return await func(*args, **kwargs)
+
+            params = {name: value for name, value in kwargs.items() if not isinstance(value, AsyncSession)}
+            key = response_cache.key(namespace, params)
+            body, versions, use_redis = await response_cache.lookup(key, tags)
+            if body is not None:
+                return Response(body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            body = _serialize(result)
+            await response_cache.store(key, versions, body, ttl or settings.CACHE_DEFAULT_TTL, use_redis)
+            return Response(body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+        return wrapper
+
+    return decorator
\ No newline at end of file
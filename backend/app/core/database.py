@@ -1,31 +1,62 @@
 """
 IROAS BOSS System - Database Configuration
 SQLAlchemyデータベース設定
+
+- get_db: プライマリ（更新・更新直後の読み込み）
+- get_read_db: 参照用（集計・エクスポート・組織図）。DATABASE_READ_URL（レプリカ）、
+  未設定の場合はプライマリに接続する別の接続プールで、重い参照が更新用の接続を
+  使い切らないようにする。接続は読み取り専用で、1文ごとに
+  DB_READ_STATEMENT_TIMEOUT_MS の上限を設ける。レプリカの場合は遅延があるため、
+  更新直後の値を返す必要がある処理や、更新時にタグで無効化するレスポンスキャッシュ
+  （@cached）の参照には使わない（無効化直後に古い値を TTL の間キャッシュしてしまう）。
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, column, create_engine, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from app.core.config import settings
+from app.core.profiling import install_query_profiling
 from app.models.base import Base
 
 
-# Convert sync URL to async for async operations
-async_database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+def _async_url(url: str) -> str:
+    """Convert sync URL to async for async operations"""
+    return url.replace("postgresql://", "postgresql+asyncpg://")
+
+
+async_database_url = _async_url(settings.DATABASE_URL)
 
 # Create async engine for app runtime
 engine = create_async_engine(
     async_database_url,
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
-    echo=settings.DEBUG,  # SQLクエリのログ出力
+    echo=settings.DB_ECHO,  # SQLクエリのログ出力
+)
+# Read engine（レプリカ、未設定ならプライマリへの別プール）
+read_engine = create_async_engine(
+    _async_url(settings.DATABASE_READ_URL or settings.DATABASE_URL),
+    pool_size=settings.DB_READ_POOL_SIZE,
+    max_overflow=settings.DB_READ_MAX_OVERFLOW,
+    echo=settings.DB_ECHO,
+    connect_args={
+        "server_settings": {
+            "default_transaction_read_only": "on",
+            "statement_timeout": str(settings.DB_READ_STATEMENT_TIMEOUT_MS),
+        }
+    },
 )
 
+# リクエストごとのSQL文数・DB時間、スロークエリログ
+install_query_profiling(engine)
+install_query_profiling(read_engine)
+
 # Create sync engine for Alembic migrations
 sync_engine = create_engine(
     settings.DATABASE_URL,
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
-    echo=settings.DEBUG,
+    echo=settings.DB_ECHO,
 )
 
 # Create session maker
@@ -35,6 +66,12 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 
 # Dependency to get DB session
 async def get_db() -> AsyncSession:
@@ -43,4 +80,27 @@ async def get_db() -> AsyncSession:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """Read-only database session dependency（レプリカ or 参照用プール）"""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def unnest_table(name: str, **columns):
+    """
+    列ごとの配列パラメータを unnest した導出テーブル
+    columns は 列名=(型, 値リスト)。行数によらずパラメータ数が一定のため、
+    VALUES と違って文のコンパイル結果がキャッシュされる。
+    """
+    return func.unnest(*[
+        bindparam(f"{name}_{key}", list(items), type_=ARRAY(type_))
+        for key, (type_, items) in columns.items()
+    ]).table_valued(*[
+        column(key, type_) for key, (type_, _) in columns.items()
+    ]).render_derived(name=name)
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+IROAS BOSS System - Metrics
+Prometheus メトリクス（API・DB接続プール・バッチ処理）
+
+- API: ルート（パスのテンプレート）ごとのリクエスト数・応答時間、処理中のリクエスト数
+- DB接続プール: 使用中・オーバーフロー中の接続数（収集時にプールから読む）
+- バッチ処理: 報酬計算・CSV取込/出力・消込の実行回数・所要時間・処理件数
+
+/metrics で公開する。スクリプトから実行したバッチ処理は、METRICS_PUSHGATEWAY_URL を
+設定した場合のみ終了時に Pushgateway へ送る（プロセスが短命で収集されないため）。
+uvicorn を複数ワーカーで動かす場合は PROMETHEUS_MULTIPROC_DIR を設定する
+（接続プールの値は /metrics に応答したワーカーのもの）。
+"""
+
+import functools
+import inspect
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    push_to_gateway,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+
+# ルートに一致しなかったリクエストのラベル（404 のパスでラベルが増えないようにする）
+UNMATCHED_ROUTE = "unmatched"
+
+HTTP_REQUESTS = Counter(
+    "boss_http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "boss_http_request_duration_seconds", "HTTP request latency (until the response body is sent)",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "boss_http_requests_in_progress", "HTTP requests being processed", ["method"],
+    multiprocess_mode="livesum",
+)
+
+JOB_RUNS = Counter(
+    "boss_job_runs_total", "Batch job runs", ["job", "status"]
+)
+JOB_DURATION = Histogram(
+    "boss_job_duration_seconds", "Batch job duration", ["job"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+JOB_ITEMS = Counter(
+    "boss_job_items_total", "Rows processed by batch jobs", ["job"]
+)
+JOB_LAST_SUCCESS = Gauge(
+    "boss_job_last_success_timestamp_seconds", "Unix time of the last successful run", ["job"],
+    multiprocess_mode="max",
+)
+
+
+class MetricsMiddleware:
+    """
+    リクエスト数・応答時間の記録（ASGI ミドルウェア）
+    ストリーミング応答は本文の送信完了までを応答時間とする。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            HTTP_REQUESTS.labels(method, route_path, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method, route_path).observe(time.perf_counter() - started)
+
+
+class PoolCollector:
+    """DB接続プールの状態（収集時に読む）"""
+
+    def __init__(self):
+        self.engines: Dict[str, AsyncEngine] = {}
+
+    def register(self, name: str, engine: AsyncEngine) -> None:
+        self.engines[name] = engine
+
+    def collect(self):
+        size = GaugeMetricFamily("boss_db_pool_size", "Configured pool size", labels=["pool"])
+        limit = GaugeMetricFamily(
+            "boss_db_pool_max_connections", "pool_size + max_overflow", labels=["pool"]
+        )
+        checked_out = GaugeMetricFamily(
+            "boss_db_pool_checked_out", "Connections in use", labels=["pool"]
+        )
+        checked_in = GaugeMetricFamily(
+            "boss_db_pool_checked_in", "Idle connections in the pool", labels=["pool"]
+        )
+        overflow = GaugeMetricFamily(
+            "boss_db_pool_overflow", "Connections opened beyond pool_size", labels=["pool"]
+        )
+        for name, engine in self.engines.items():
+            pool = engine.sync_engine.pool
+            if not hasattr(pool, "checkedout"):
+                continue  # NullPool など
+            size.add_metric([name], pool.size())
+            limit.add_metric([name], pool.size() + max(pool._max_overflow, 0))
+            checked_out.add_metric([name], pool.checkedout())
+            checked_in.add_metric([name], pool.checkedin())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        return [size, limit, checked_out, checked_in, overflow]
+
+
+pool_collector = PoolCollector()
+REGISTRY.register(pool_collector)
+
+# プロセスごとの値を収集時に読むコレクター（マルチプロセス時も /metrics に含める）
+_process_collectors: List[Any] = [pool_collector]
+
+
+class SnapshotCollector:
+    """snapshot()（キャッシュ・パスワードハッシュの統計）の数値項目をゲージとして公開"""
+
+    def __init__(self, prefix: str, snapshot: Callable[[], Dict[str, Any]]):
+        self.prefix = prefix
+        self.snapshot = snapshot
+
+    def collect(self):
+        for key, value in self.snapshot().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield GaugeMetricFamily(f"{self.prefix}_{key}", f"{self.prefix} {key}", value=value)
+
+
+def register_snapshot(prefix: str, snapshot: Callable[[], Dict[str, Any]]) -> None:
+    """統計情報の公開（main で登録する）"""
+    collector = SnapshotCollector(prefix, snapshot)
+    REGISTRY.register(collector)
+    _process_collectors.append(collector)
+
+
+def tracked_job(job: str, items: Optional[Callable[[Any], int]] = None):
+    """
+    バッチ処理の実行回数・所要時間の記録
+    items は戻り値 -> 処理件数。非同期ジェネレーター（ストリーミング出力）にも使え、
+    その場合は最後まで読まれるまで（途中で切断された場合は error）を1回とする。
+
+        @tracked_job("payment_reconciliation", items=lambda summary: summary.lines)
+        async def reconcile_results(...): ...
+    """
+    def record(started: float, status: str) -> None:
+        JOB_RUNS.labels(job, status).inc()
+        JOB_DURATION.labels(job).observe(time.perf_counter() - started)
+        if status == "success":
+            JOB_LAST_SUCCESS.labels(job).set_to_current_time()
+
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def generator_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                status = "error"
+                try:
+                    async for chunk in func(*args, **kwargs):
+                        yield chunk
+                    status = "success"
+                finally:
+                    record(started, status)
+            return generator_wrapper
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            status = "error"
+            try:
+                result = await func(*args, **kwargs)
+                if items is not None:
+                    JOB_ITEMS.labels(job).inc(items(result))
+                status = "success"
+                return result
+            finally:
+                record(started, status)
+        return wrapper
+
+    return decorator
+
+
+def render_metrics() -> tuple:
+    """/metrics の本文と Content-Type"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        for collector in _process_collectors:
+            registry.register(collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def push_job_metrics(job: str) -> None:
+    """スクリプト終了時のメトリクス送信（METRICS_PUSHGATEWAY_URL 未設定なら何もしない）"""
+    if not settings.METRICS_PUSHGATEWAY_URL:
+        return
+    try:
+        push_to_gateway(settings.METRICS_PUSHGATEWAY_URL, job=job, registry=REGISTRY)
+    except OSError as e:
+        logger.warning(f"metrics: failed to push to {settings.METRICS_PUSHGATEWAY_URL} ({e!r})")
\ No newline at end of file
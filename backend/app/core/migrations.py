@@ -0,0 +1,88 @@
+"""
+IROAS BOSS System - Migration Check
+起動時のマイグレーション確認（DB のリビジョンが Alembic の head と一致するか）
+
+テーブルの作成・変更は alembic upgrade head で行い、起動時は alembic_version を
+1回読んで head と比べるだけにする（ワーカーごとにテーブル定義を照会しない・
+マイグレーションの実行と競合しない）。alembic の読み込みは重いため、head は
+alembic/versions のリビジョンファイルから直接読む（script.py.mako の形式）。
+"""
+
+import ast
+import glob
+import os
+from typing import Dict, Iterable, Optional, Set
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+VERSIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic", "versions"
+)
+
+
+class SchemaRevisionMismatch(RuntimeError):
+    """DB のリビジョンが head と一致しない（alembic upgrade head が必要）"""
+
+
+def _revision_identifiers(path: str) -> Dict[str, object]:
+    """リビジョンファイルの revision / down_revision（モジュール直下の代入）"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    identifiers = {}
+    for node in tree.body:
+        if isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                    identifiers[target.id] = ast.literal_eval(node.value)
+    return identifiers
+
+
+def _as_set(value: Optional[Iterable[str]]) -> Set[str]:
+    if value is None:
+        return set()
+    if isinstance(value, str):
+        return {value}
+    return set(value)
+
+
+def expected_heads(versions_dir: str = VERSIONS_DIR) -> Set[str]:
+    """リビジョンファイルの head（どのリビジョンの down_revision にもなっていないもの）"""
+    revisions: Set[str] = set()
+    parents: Set[str] = set()
+    for path in glob.glob(os.path.join(versions_dir, "*.py")):
+        identifiers = _revision_identifiers(path)
+        if "revision" not in identifiers:
+            continue
+        revisions.add(identifiers["revision"])
+        parents |= _as_set(identifiers.get("down_revision"))
+    return revisions - parents
+
+
+async def current_revisions(engine: AsyncEngine) -> Set[str]:
+    """DB の alembic_version（未作成なら空）"""
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except ProgrammingError:
+            return set()
+        return set(result.scalars())
+
+
+async def check_migrations(engine: AsyncEngine) -> None:
+    """DB が head まで移行済みか確認する（移行されていなければ SchemaRevisionMismatch）"""
+    heads = expected_heads()
+    if not heads:
+        logger.warning(f"migration check skipped: no Alembic revisions in {VERSIONS_DIR}")
+        return
+    current = await current_revisions(engine)
+    if current != heads:
+        raise SchemaRevisionMismatch(
+            f"database revision {sorted(current) or 'none'} does not match Alembic head {sorted(heads)}; "
+            "run `alembic upgrade head`"
+        )
+    logger.info(f"database schema at Alembic head {sorted(heads)}")
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+IROAS BOSS System - Pagination Utilities
+キーセットページネーション用カーソル
+"""
+
+import base64
+import json
+from typing import Any, List, Optional
+
+
+class InvalidCursor(ValueError):
+    """不正なカーソル"""
+
+
+def encode_cursor(*values: Any) -> str:
+    """ソートキーの値を不透明なカーソル文字列に変換"""
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """カーソル文字列をソートキーの値に戻す（未指定なら None）"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Invalid cursor")
+    return values
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+IROAS BOSS System - Password Hashing
+パスワードのハッシュ化・検証（bcrypt）
+
+bcrypt は1回あたり数百ミリ秒かかるため、イベントループではなく専用のスレッドプールで
+実行する（bcrypt は実行中 GIL を解放する）。同時実行数はスレッド数まで、実行待ちは
+PASSWORD_HASH_MAX_QUEUE 件までで、超えた場合は PasswordHashingBusy を送出する。
+コスト（PASSWORD_BCRYPT_ROUNDS）を変更した場合、既存のハッシュは次回ログイン時に
+verify() が返す新しいハッシュで置き換える。
+passlib の CryptContext（bcrypt バックエンドの読み込み）は初回の使用時に作る。
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+class PasswordHashingBusy(Exception):
+    """ハッシュ処理の実行待ちが上限に達した"""
+
+
+@dataclass
+class HashingStats:
+    """ハッシュ処理の件数・待ち状況"""
+    calls: int = 0
+    rejected: int = 0
+    rehashed: int = 0
+    in_flight: int = 0
+    waiting: int = 0
+    max_waiting: int = 0
+    wait_seconds: float = 0.0  # 実行待ち時間の合計
+    hash_seconds: float = 0.0  # 実行時間の合計
+
+
+class PasswordHasher:
+    """bcrypt の実行（専用スレッドプール + 実行待ちの上限）"""
+
+    def __init__(self, rounds: int, workers: int, max_queue: int):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.stats = HashingStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = asyncio.Semaphore(workers)
+
+    @functools.cached_property
+    def context(self) -> "CryptContext":
+        from passlib.context import CryptContext
+
+        # 設定と異なるコストのハッシュは needs_update（verify_and_update で再ハッシュ）
+        return CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=self.rounds,
+            bcrypt__min_rounds=self.rounds,
+            bcrypt__max_rounds=self.rounds,
+        )
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._slots.locked() and self.stats.waiting >= self.max_queue:
+            self.stats.rejected += 1
+            raise PasswordHashingBusy(f"{self.stats.waiting} password hashes already queued")
+
+        self.stats.calls += 1
+        queued = time.perf_counter()
+        self.stats.waiting += 1
+        self.stats.max_waiting = max(self.stats.max_waiting, self.stats.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.stats.waiting -= 1
+
+        started = time.perf_counter()
+        self.stats.wait_seconds += started - queued
+        self.stats.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+        finally:
+            self.stats.in_flight -= 1
+            self.stats.hash_seconds += time.perf_counter() - started
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        """パスワードハッシュ化"""
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        パスワード検証
+        戻り値は (一致したか, 再ハッシュ後の値 or None)。コストが設定と異なる
+        ハッシュに一致した場合、呼び出し側は2つ目の値で保存し直す。
+        """
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed)
+        if new_hash is not None:
+            self.stats.rehashed += 1
+        return valid, new_hash
+
+    def snapshot(self) -> Dict[str, Any]:
+        """統計情報"""
+        return {
+            **asdict(self.stats),
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+IROAS BOSS System - Principal Cache
+認証済みユーザー（プリンシパル）のキャッシュ
+
+アクセストークンには ID・氏名・権限・有効フラグを含め、通常はトークンの内容だけで
+認証する（リクエストごとに users を引かない）。ユーザーの無効化・権限変更時は
+revoke() で失効時刻を記録し、それ以前に発行されたトークンは DB の最新の状態で認証する。
+
+記録はプロセス内LRU（短いTTL）+ Redis の2段。Redis のエントリ（失効時刻と、その後に
+DB から読んだプリンシパル）はトークンの有効期間だけ保持する。他プロセスでの失効は
+プロセス内LRUのTTL以内に反映される。Redis に接続できない間は失効を確認できないため
+トークンの内容は使わず、DB から読んだプリンシパルをプロセス内LRUに短時間保持する。
+"""
+
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.cache import LocalLRU, RedisConnection
+from app.core.config import settings
+
+
+# トークンに含めるプリンシパルの項目（クレーム名 -> 属性名）
+PRINCIPAL_CLAIMS = {"uid": "id", "sub": "email", "name": "full_name", "role": "role", "active": "is_active"}
+
+
+@dataclass(frozen=True)
+class Principal:
+    """認証済みユーザー"""
+    id: int
+    email: str
+    full_name: str
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        return cls(
+            id=user.id, email=user.email, full_name=user.full_name, role=user.role, is_active=user.is_active
+        )
+
+    @classmethod
+    def from_claims(cls, payload: Dict[str, Any]) -> Optional["Principal"]:
+        """トークンのクレーム -> プリンシパル（項目が揃っていない旧形式のトークンは None）"""
+        if any(claim not in payload for claim in PRINCIPAL_CLAIMS):
+            return None
+        return cls(**{name: payload[claim] for claim, name in PRINCIPAL_CLAIMS.items()})
+
+    def claims(self) -> Dict[str, Any]:
+        return {claim: getattr(self, name) for claim, name in PRINCIPAL_CLAIMS.items()}
+
+
+@dataclass
+class PrincipalStats:
+    """認証の経路ごとの件数"""
+    claims: int = 0       # トークンの内容で認証
+    cached: int = 0       # キャッシュ済みのプリンシパルで認証
+    db_loads: int = 0     # DB から読んだ
+    revocations: int = 0
+    redis_errors: int = 0
+
+
+class PrincipalCache:
+    """プリンシパルと失効時刻のキャッシュ"""
+
+    def __init__(self, url: str, prefix: str, ttl: int, local_ttl: int, local_max_bytes: int,
+                 token_ttl: int, retry_seconds: int):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.token_ttl = token_ttl
+        self.stats = PrincipalStats()
+        self.local = LocalLRU(local_max_bytes)
+        self.redis = RedisConnection(url, retry_seconds, "principal cache")
+
+    def _key(self, subject: str) -> str:
+        return f"{self.prefix}:{subject}"
+
+    def _redis_failed(self, error: Exception) -> None:
+        self.stats.redis_errors += 1
+        self.redis.failed(error)
+
+    async def _redis_entry(self, key: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Redis のエントリ（戻り値は (エントリ or None, Redis に接続できたか)）"""
+        client = self.redis.client()
+        if client is None:
+            return None, False
+        try:
+            body = await client.get(key)
+        except (redis.RedisError, OSError) as e:
+            self._redis_failed(e)
+            return None, False
+        return (json.loads(body) if body is not None else {}), True
+
+    async def _store(self, key: str, entry: Dict[str, Any], use_redis: bool) -> None:
+        body = json.dumps(entry).encode()
+        self.local.set(key, (), body, self.local_ttl)
+        if not use_redis:
+            return
+        client = self.redis.client()
+        if client is None:
+            return
+        # 失効の記録はトークンの有効期間だけ残す
+        ttl = self.token_ttl if entry.get("revoked_at") else self.ttl
+        try:
+            await client.set(key, body, ex=ttl)
+        except (redis.RedisError, OSError) as e:
+            self._redis_failed(e)
+
+    async def resolve(
+        self,
+        payload: Dict[str, Any],
+        load: Callable[[], Awaitable[Optional[Principal]]],
+    ) -> Optional[Principal]:
+        """
+        デコード済みトークン -> プリンシパル
+        トークンが最後の失効より後に発行されていればクレームを使い、そうでなければ
+        キャッシュ済みのプリンシパル、なければ load()（DB）の結果を使う。
+        """
+        key = self._key(payload["sub"])
+        claims = Principal.from_claims(payload)
+        issued_at = payload.get("iat", 0)
+
+        use_redis = False
+        body = self.local.get(key, ())
+        if body is not None:
+            entry = json.loads(body)
+        else:
+            entry, use_redis = await self._redis_entry(key)
+            if entry is None:
+                # 失効を確認できないため、現時点で失効したものとして扱う
+                entry = {"revoked_at": int(time.time())}
+            elif use_redis:
+                self.local.set(key, (), json.dumps(entry).encode(), self.local_ttl)
+
+        if claims is not None and issued_at > entry.get("revoked_at", 0):
+            self.stats.claims += 1
+            return claims
+        if entry.get("principal"):
+            self.stats.cached += 1
+            return Principal(**entry["principal"])
+
+        self.stats.db_loads += 1
+        principal = await load()
+        if principal is not None:
+            await self._store(key, {**entry, "principal": asdict(principal)}, use_redis)
+        return principal
+
+    async def revoke(self, subject: str) -> None:
+        """
+        失効（ユーザーの無効化・権限変更時にコミット後に呼ぶ）
+        これより前に発行されたトークンは次回から DB の状態で認証する。
+        """
+        self.stats.revocations += 1
+        await self._store(self._key(subject), {"revoked_at": int(time.time())}, use_redis=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """統計情報"""
+        return {
+            **asdict(self.stats),
+            "backend": "local" if self.redis.down else "redis",
+            "local_entries": len(self.local),
+        }
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+
+principal_cache = PrincipalCache(
+    url=settings.REDIS_URL,
+    prefix=f"{settings.CACHE_KEY_PREFIX}:principal",
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL,
+    local_max_bytes=settings.PRINCIPAL_CACHE_LOCAL_MAX_BYTES,
+    token_ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    retry_seconds=settings.CACHE_REDIS_RETRY_SECONDS,
+)
\ No newline at end of file
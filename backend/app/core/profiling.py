@@ -0,0 +1,194 @@
+"""
+IROAS BOSS System - Query Profiling
+実行されたSQL文の計測（N+1 クエリの検出・リクエストごとのDB時間・スロークエリログ）
+
+install_query_profiling() でエンジンのイベントに計測処理を登録する。
+- リクエストごとのSQL文数・DB時間を集計し、本番以外では応答ヘッダー
+  （X-DB-Time / X-DB-Queries / Server-Timing）で返す（QueryProfilingMiddleware）
+- DB_SLOW_QUERY_SECONDS 以上かかった文をパラメータ付きでログに出し、
+  別の接続で EXPLAIN（ANALYZE なし）した実行計画も出す
+"""
+
+import asyncio
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Union
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+
+class QueryCounter:
+    """
+    ブロック内でエンジンが実行したSQL文を数える
+
+        with QueryCounter(engine) as queries:
+            await get_member(member_id, db=db)
+        assert queries.count == 1
+
+    エンジン単位で数えるため、同じエンジンを使う並行処理の文も含まれる。
+    """
+
+    def __init__(self, engine: Union[Engine, AsyncEngine]):
+        self.engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+
+@dataclass
+class RequestProfile:
+    """1リクエストで実行したSQL文の数・合計時間"""
+    path: str = ""
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+# EXPLAIN 実行中（EXPLAIN 自体を計測・スロークエリ判定の対象にしない）
+_explaining: ContextVar[bool] = ContextVar("explaining", default=False)
+
+# 実行計画を出す文（DDL・トランザクション制御などは対象外）
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+_MAX_LOGGED_PARAMETERS = 1000  # ログに出すパラメータの最大文字数
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """処理中のリクエストの計測値（リクエスト外では None）"""
+    return _request_profile.get()
+
+
+class SlowQueryLog:
+    """
+    スロークエリのログ出力
+    同じ文の実行計画は DB_SLOW_QUERY_EXPLAIN_INTERVAL 秒に1回だけ出す。
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self._explained: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def record(self, statement: str, parameters: Any, elapsed: float, executemany: bool) -> None:
+        profile = _request_profile.get()
+        where = f" [{profile.path}]" if profile is not None else ""
+        logged_parameters = repr(parameters)
+        if len(logged_parameters) > _MAX_LOGGED_PARAMETERS:
+            logged_parameters = logged_parameters[:_MAX_LOGGED_PARAMETERS] + "..."
+        logger.warning(
+            f"slow query ({elapsed * 1000:.1f} ms){where}: {statement} | parameters: {logged_parameters}"
+        )
+        if settings.DB_SLOW_QUERY_EXPLAIN and not executemany and self._should_explain(statement):
+            self._schedule_explain(statement, parameters)
+
+    def _should_explain(self, statement: str) -> bool:
+        if not _EXPLAINABLE.match(statement):
+            return False
+        now = time.monotonic()
+        last = self._explained.get(statement)
+        if last is not None and now - last < settings.DB_SLOW_QUERY_EXPLAIN_INTERVAL:
+            return False
+        if len(self._explained) >= 1000:
+            self._explained.clear()
+        self._explained[statement] = now
+        return True
+
+    def _schedule_explain(self, statement: str, parameters: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # イベントループ外（同期エンジン）
+        # 実行中のトランザクションを汚さないよう、別の接続で応答後に実行する
+        task = loop.create_task(self._explain(statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, statement: str, parameters: Any) -> None:
+        _explaining.set(True)
+        _request_profile.set(None)
+        try:
+            async with self.engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                plan = "\n".join(row[0] for row in result)
+        except Exception as e:
+            logger.warning(f"slow query: EXPLAIN failed ({e!r})")
+            return
+        logger.warning(f"slow query plan: {statement}\n{plan}")
+
+
+def install_query_profiling(engine: AsyncEngine) -> SlowQueryLog:
+    """エンジンにリクエストごとの計測・スロークエリログを登録する"""
+    slow_log = SlowQueryLog(engine)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _explaining.get():
+            return
+        elapsed = time.perf_counter() - context._query_started
+        profile = _request_profile.get()
+        if profile is not None:
+            profile.queries += 1
+            profile.db_seconds += elapsed
+        if elapsed >= settings.DB_SLOW_QUERY_SECONDS:
+            slow_log.record(statement, parameters, elapsed, executemany)
+
+    return slow_log
+
+
+class QueryProfilingMiddleware:
+    """
+    リクエストごとのSQL文数・DB時間の計測（ASGI ミドルウェア）
+    本番以外では応答ヘッダーに出す。ヘッダーは応答の開始時点の値のため、
+    ストリーミング応答で本文の生成中に実行した文は含まれない。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.expose_headers = settings.ENVIRONMENT != "production"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(path=scope["path"])
+        token = _request_profile.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                db_ms = profile.db_seconds * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-time", f"{db_ms:.1f}".encode()))
+                headers.append((b"x-db-queries", str(profile.queries).encode()))
+                headers.append((
+                    b"server-timing", f'db;dur={db_ms:.1f};desc="{profile.queries} queries"'.encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_profile.reset(token)
\ No newline at end of file
@@ -1,16 +1,20 @@
 # Database models
 from .member import Member
-from .organization import Organization  
 from .payment import Payment, PaymentResult
 from .reward import Reward, RewardCalculation
-from .system import SystemSettings
+from .genealogy import MemberTreePath
+from .dashboard import MonthlyStats
+from .user import User
+from .job import Job
 
 __all__ = [
     "Member",
-    "Organization",
     "Payment", 
     "PaymentResult",
     "Reward",
     "RewardCalculation", 
-    "SystemSettings"
+    "MemberTreePath",
+    "MonthlyStats",
+    "User",
+    "Job"
 ]
\ No newline at end of file
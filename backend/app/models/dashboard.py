@@ -0,0 +1,58 @@
+"""
+IROAS BOSS System - Dashboard Rollup Model
+ダッシュボード用 月次集計テーブル
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import Date, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class MonthlyStats(Base):
+    """
+    月次集計テーブル（1ヶ月1行、月はJST基準）
+    フロー項目はその月に発生した件数・金額、在高項目はその月の最終更新時点の値。
+    決済・会員ステータスの変更時に差分で更新し、全件の再集計はバックフィルで行う。
+    在高項目の NULL は未集計（バックフィル以前の月）を表す。
+    """
+    __tablename__ = "monthly_stats"
+
+    month: Mapped[date] = mapped_column(Date, primary_key=True, comment="対象月（月初日）")
+
+    # フロー（当月発生分）
+    sales_amount: Mapped[Decimal] = mapped_column(
+        Numeric(15, 2), nullable=False, default=0, comment="売上（決済完了額）"
+    )
+    payment_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment="決済完了件数"
+    )
+    reward_payout_amount: Mapped[Decimal] = mapped_column(
+        Numeric(15, 2), nullable=False, default=0, comment="報酬支払額（振込データ作成分）"
+    )
+    new_members: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment="新規登録数"
+    )
+    withdrawals: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment="退会数"
+    )
+
+    # 在高（月末・最終更新時点）
+    total_members: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment="在籍会員数（退会者を除く）"
+    )
+    active_members: Mapped[Optional[int]] = mapped_column(Integer, comment="アクティブ会員数")
+    suspended_members: Mapped[Optional[int]] = mapped_column(Integer, comment="休会会員数")
+    withdrawn_members: Mapped[Optional[int]] = mapped_column(Integer, comment="退会会員数")
+    pending_members: Mapped[Optional[int]] = mapped_column(Integer, comment="承認待ち会員数")
+
+    @property
+    def revenue(self) -> Decimal:
+        """収益（売上 - 報酬支払額）"""
+        return (self.sales_amount or Decimal(0)) - (self.reward_payout_amount or Decimal(0))
+
+    def __repr__(self) -> str:
+        return f"<MonthlyStats(month={self.month}, sales={self.sales_amount}, members={self.total_members})>"
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+IROAS BOSS System - Genealogy Model
+会員ツリー祖先インデックス（クロージャテーブル）
+"""
+
+from sqlalchemy import String, Integer, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from enum import Enum as PyEnum
+
+from .base import Base
+
+
+class TreeType(PyEnum):
+    """ツリー種別"""
+    SPONSOR = "sponsor"    # 紹介ツリー（sponsor_id）
+    UPLINE = "upline"      # バイナリーツリー（upline_id）
+
+
+class MemberTreePath(Base):
+    """
+    会員ツリーパステーブル
+    祖先・子孫の全組み合わせを保持する（自分自身は depth=0）。
+    """
+    __tablename__ = "member_tree_paths"
+    
+    tree_type: Mapped[str] = mapped_column(
+        String(10), primary_key=True, comment="ツリー種別"
+    )
+    ancestor_id: Mapped[int] = mapped_column(
+        ForeignKey("members.id"), primary_key=True, comment="祖先会員ID"
+    )
+    descendant_id: Mapped[int] = mapped_column(
+        ForeignKey("members.id"), primary_key=True, comment="子孫会員ID"
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False, comment="階層差")
+    
+    __table_args__ = (
+        # ダウンライン取得（深さ順・範囲スキャン）
+        Index("ix_member_tree_paths_downline", "tree_type", "ancestor_id", "depth", "descendant_id"),
+        # アップライン取得
+        Index("ix_member_tree_paths_upline", "tree_type", "descendant_id", "depth"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<MemberTreePath({self.tree_type}: {self.ancestor_id} -> {self.descendant_id}, depth={self.depth})>"
\ No newline at end of file
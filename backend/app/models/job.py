@@ -0,0 +1,83 @@
+"""
+IROAS BOSS System - Job Model
+バックグラウンドジョブ（報酬計算・振込データ作成・消込）
+"""
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Integer, Boolean, DateTime, Text, JSON, Index, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+from enum import Enum as PyEnum
+
+from .base import Base
+
+
+class JobStatus(PyEnum):
+    """ジョブステータス"""
+    QUEUED = "queued"          # 実行待ち
+    RUNNING = "running"        # 実行中
+    SUCCEEDED = "succeeded"    # 完了
+    FAILED = "failed"          # 失敗
+    CANCELLED = "cancelled"    # キャンセル
+
+
+# 実行待ち・実行中（同じジョブを重複して登録しない）
+ACTIVE_JOB_STATUSES = (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+
+
+class Job(Base):
+    """
+    ジョブテーブル（ワーカーのキューを兼ねる）
+    ワーカーは queued の行を FOR UPDATE SKIP LOCKED で取得して実行する。
+    """
+    __tablename__ = "jobs"
+    
+    # 基本情報
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, comment="ジョブID")
+    job_type: Mapped[str] = mapped_column(String(50), nullable=False, comment="ジョブ種別")
+    idempotency_key: Mapped[str] = mapped_column(
+        String(255), nullable=False, comment="重複実行防止キー（報酬対象月など）"
+    )
+    params: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict, comment="パラメータ")
+    submitted_by: Mapped[Optional[str]] = mapped_column(String(255), comment="登録したユーザー")
+    
+    # 実行状況
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default=JobStatus.QUEUED.value, comment="ステータス"
+    )
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="進捗（%）")
+    rows_processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="処理件数")
+    cancel_requested: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, comment="キャンセル要求"
+    )
+    worker_id: Mapped[Optional[str]] = mapped_column(String(100), comment="実行中のワーカー")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="実行回数")
+    
+    # 結果
+    result: Mapped[Optional[dict]] = mapped_column(JSON, comment="実行結果サマリー")
+    error: Mapped[Optional[str]] = mapped_column(Text, comment="エラー内容")
+    
+    # 日時
+    queued_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), comment="登録日時"
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), comment="開始日時")
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), comment="終了日時")
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), comment="ワーカーの最終応答日時"
+    )
+    
+    __table_args__ = (
+        # ワーカーの取得（実行待ちを登録順に）
+        Index("ix_jobs_status_id", "status", "id"),
+        Index("ix_jobs_type_key", "job_type", "idempotency_key"),
+        # 同じジョブ（種別 + キー）は同時に1つだけ実行待ち・実行中にできる
+        Index(
+            "uq_jobs_active_key", "job_type", "idempotency_key",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<Job(id={self.id}, type={self.job_type}, key={self.idempotency_key}, status={self.status})>"
\ No newline at end of file
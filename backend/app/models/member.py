@@ -5,7 +5,7 @@ IROAS BOSS System - Member Model
 
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import String, Integer, DateTime, Boolean, Text, Numeric, ForeignKey
+from sqlalchemy import String, Integer, DateTime, Boolean, Text, Numeric, ForeignKey, Computed, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from enum import Enum as PyEnum
 
@@ -20,6 +20,19 @@ class MemberStatus(PyEnum):
     PENDING = "pending"        # 承認待ち
 
 
+# 検索用テキストの生成式（services/member_search.normalize_search_text と同じ正規化）
+# NFKC で半角カナ・全角英数を統一し、ひらがなはカタカナに寄せて小文字化する。
+_HIRAGANA = "".join(chr(code) for code in range(0x3041, 0x3097))
+_KATAKANA = "".join(chr(code + 0x60) for code in range(0x3041, 0x3097))
+SEARCH_TEXT_EXPRESSION = (
+    "lower(translate(normalize("
+    "coalesce(member_code, '') || ' ' || coalesce(family_name, '') || coalesce(given_name, '') || ' ' || "
+    "coalesce(family_name_kana, '') || coalesce(given_name_kana, '') || ' ' || "
+    "coalesce(email, '') || ' ' || replace(coalesce(phone, ''), '-', ''), NFKC), "
+    f"'{_HIRAGANA}', '{_KATAKANA}'))"
+)
+
+
 class Member(Base):
     """会員マスタテーブル"""
     __tablename__ = "members"
@@ -79,7 +92,9 @@ class Member(Base):
     )
     
     # 決済情報
+    bank_code: Mapped[Optional[str]] = mapped_column(String(4), comment="金融機関コード")
     bank_name: Mapped[Optional[str]] = mapped_column(String(50), comment="銀行名")
+    branch_code: Mapped[Optional[str]] = mapped_column(String(3), comment="支店コード")
     branch_name: Mapped[Optional[str]] = mapped_column(String(50), comment="支店名")
     account_type: Mapped[Optional[str]] = mapped_column(String(10), comment="口座種別")
     account_number: Mapped[Optional[str]] = mapped_column(String(20), comment="口座番号")
@@ -96,24 +111,48 @@ class Member(Base):
     # メモ・備考
     notes: Mapped[Optional[str]] = mapped_column(Text, comment="備考")
     
+    # 検索用（会員番号・氏名・カナ・メール・電話番号の正規化済み連結）
+    search_text: Mapped[Optional[str]] = mapped_column(
+        Text, Computed(SEARCH_TEXT_EXPRESSION, persisted=True), comment="検索用テキスト"
+    )
+    
+    __table_args__ = (
+        # 部分一致検索（pg_trgm）
+        Index(
+            "ix_members_search_text_trgm", "search_text",
+            postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        # 2文字以下の検索語は氏名・カナの完全一致で引く（btree_gin）
+        Index(
+            "ix_members_names_gin", "family_name", "given_name", "family_name_kana", "given_name_kana",
+            postgresql_using="gin",
+        ),
+        # 会員一覧の並び順（登録日の新しい順）・キーセットページネーション
+        Index("ix_members_registration_date_id", "registration_date", "id"),
+    )
+    
     # リレーション
+    # 非同期セッションでは暗黙の遅延ロードができないため、SQL が必要な遅延ロードは
+    # 例外にする（raise_on_sql）。参照する場合はクエリ側で selectinload / joinedload を指定する。
     sponsor: Mapped[Optional["Member"]] = relationship(
-        "Member", remote_side=[id], foreign_keys=[sponsor_id], back_populates="sponsored_members"
+        "Member", remote_side=[id], foreign_keys=[sponsor_id], back_populates="sponsored_members",
+        lazy="raise_on_sql"
     )
     sponsored_members: Mapped[List["Member"]] = relationship(
-        "Member", back_populates="sponsor", foreign_keys=[sponsor_id]
+        "Member", back_populates="sponsor", foreign_keys=[sponsor_id], lazy="raise_on_sql"
     )
     
     upline: Mapped[Optional["Member"]] = relationship(
-        "Member", remote_side=[id], foreign_keys=[upline_id], back_populates="downline_members"
+        "Member", remote_side=[id], foreign_keys=[upline_id], back_populates="downline_members",
+        lazy="raise_on_sql"
     )
     downline_members: Mapped[List["Member"]] = relationship(
-        "Member", back_populates="upline", foreign_keys=[upline_id]
+        "Member", back_populates="upline", foreign_keys=[upline_id], lazy="raise_on_sql"
     )
     
     # 他テーブルとのリレーション
-    payments = relationship("Payment", back_populates="member")
-    rewards = relationship("Reward", back_populates="member")
+    payments = relationship("Payment", back_populates="member", lazy="raise_on_sql")
+    rewards = relationship("Reward", back_populates="member", lazy="raise_on_sql")
     
     @property
     def full_name(self) -> str:
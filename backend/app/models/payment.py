@@ -5,7 +5,7 @@ IROAS BOSS System - Payment Models
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Integer, DateTime, Boolean, Text, Numeric, ForeignKey, JSON
+from sqlalchemy import String, Integer, DateTime, Boolean, Text, Numeric, ForeignKey, JSON, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from enum import Enum as PyEnum
 from decimal import Decimal
@@ -36,7 +36,7 @@ class Payment(Base):
     # 基本情報
     id: Mapped[int] = mapped_column(Integer, primary_key=True, comment="決済ID")
     member_id: Mapped[int] = mapped_column(
-        ForeignKey("members.id"), nullable=False, comment="会員ID"
+        ForeignKey("members.id"), nullable=False, index=True, comment="会員ID"
     )
     
     # 決済情報
@@ -86,14 +86,23 @@ class Payment(Base):
     )
     
     # 追加データ（JSON形式）
-    metadata: Mapped[Optional[dict]] = mapped_column(
-        JSON, comment="メタデータ"
+    # "metadata" は Declarative API の予約語のため属性名のみ変更（カラム名は維持）
+    payment_metadata: Mapped[Optional[dict]] = mapped_column(
+        "metadata", JSON, comment="メタデータ"
     )
     
     # リレーション
     member = relationship("Member", back_populates="payments")
     payment_results = relationship("PaymentResult", back_populates="payment")
     
+    __table_args__ = (
+        # 処理中の決済（未決済件数・振替結果の消込）
+        Index(
+            "ix_payments_pending", "member_id", "amount",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+    
     def __repr__(self) -> str:
         return f"<Payment(id={self.id}, member_id={self.member_id}, amount={self.amount}, status={self.status})>"
 
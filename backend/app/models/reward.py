@@ -98,7 +98,7 @@ class Reward(Base):
         String(100), comment="GMO振込ID"
     )
     gmo_batch_id: Mapped[Optional[str]] = mapped_column(
-        String(100), comment="GMOバッチID"
+        String(100), index=True, comment="GMOバッチID"
     )
     
     # 備考
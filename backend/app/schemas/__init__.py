@@ -1,12 +1,12 @@
 # Pydantic schemas
 from .member import Member, MemberCreate, MemberUpdate, MemberInDB
-from .payment import Payment, PaymentCreate, PaymentUpdate
-from .reward import Reward, RewardCreate, RewardCalculation
 from .dashboard import DashboardStats, ChartData
+from .auth import Token, UserRegister, UserUpdate
+from .job import Job, JobList, JobSubmit
 
 __all__ = [
     "Member", "MemberCreate", "MemberUpdate", "MemberInDB",
-    "Payment", "PaymentCreate", "PaymentUpdate", 
-    "Reward", "RewardCreate", "RewardCalculation",
-    "DashboardStats", "ChartData"
+    "DashboardStats", "ChartData",
+    "Token", "UserRegister", "UserUpdate",
+    "Job", "JobList", "JobSubmit"
 ]
\ No newline at end of file
@@ -4,7 +4,7 @@ IROAS BOSS System - Authentication Schemas
 """
 
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 class UserLogin(BaseModel):
@@ -21,6 +21,13 @@ class UserRegister(BaseModel):
     role: str = "admin"
 
 
+class UserUpdate(BaseModel):
+    """ユーザー更新（管理者のみ）"""
+    full_name: Optional[str] = None
+    role: Optional[str] = Field(None, pattern=r'^(admin|operator|viewer)$')
+    is_active: Optional[bool] = None
+
+
 class Token(BaseModel):
     """トークン"""
     access_token: str
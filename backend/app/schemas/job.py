@@ -0,0 +1,49 @@
+"""
+IROAS BOSS System - Job Schemas
+バックグラウンドジョブ用Pydanticスキーマ
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class JobSubmit(BaseModel):
+    """ジョブ登録"""
+    job_type: str = Field(
+        ..., description="reward_close / reward_recalculate / gmo_transfer_export / payment_reconciliation"
+    )
+    reward_period: Optional[str] = Field(None, description="報酬対象月 (YYYY-MM)")
+    member_ids: Optional[List[int]] = Field(None, description="変更のあった会員ID（reward_recalculate）")
+    transfer_date: Optional[date] = Field(None, description="振込日（gmo_transfer_export）")
+    path: Optional[str] = Field(None, description="取込ファイル（UPLOAD_DIR 内。payment_reconciliation）")
+    rerun: bool = Field(False, description="同じ対象の成功済みジョブがあっても再実行する")
+
+
+class Job(BaseModel):
+    """ジョブ"""
+    id: int
+    job_type: str
+    idempotency_key: str
+    params: Dict[str, Any]
+    submitted_by: Optional[str]
+    status: str
+    progress: int
+    rows_processed: int
+    cancel_requested: bool
+    worker_id: Optional[str]
+    attempts: int
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    queued_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    heartbeat_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class JobList(BaseModel):
+    """ジョブ一覧（新しい順）"""
+    jobs: List[Job]
\ No newline at end of file
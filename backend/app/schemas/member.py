@@ -7,6 +7,7 @@ from typing import Optional, List
 from datetime import datetime, date
 from pydantic import BaseModel, EmailStr, Field, validator
 from decimal import Decimal
+from typing_extensions import TypedDict
 
 
 class MemberBase(BaseModel):
@@ -28,12 +29,14 @@ class MemberCreate(MemberBase):
     member_code: str = Field(..., min_length=3, max_length=20)
     sponsor_id: Optional[int] = None
     upline_id: Optional[int] = None
-    binary_position: Optional[str] = Field(None, regex=r'^[LR]$')
+    binary_position: Optional[str] = Field(None, pattern=r'^[LR]$')
     
     # 銀行口座情報（オプション）
+    bank_code: Optional[str] = Field(None, pattern=r'^\d{4}$')
     bank_name: Optional[str] = Field(None, max_length=50)
+    branch_code: Optional[str] = Field(None, pattern=r'^\d{3}$')
     branch_name: Optional[str] = Field(None, max_length=50)
-    account_type: Optional[str] = Field(None, regex=r'^(普通|当座)$')
+    account_type: Optional[str] = Field(None, pattern=r'^(普通|当座)$')
     account_number: Optional[str] = Field(None, max_length=20)
     account_holder: Optional[str] = Field(None, max_length=100)
 
@@ -51,13 +54,20 @@ class MemberUpdate(BaseModel):
     city: Optional[str] = Field(None, max_length=50)
     address_line: Optional[str] = Field(None, max_length=200)
     
+    # 組織情報
+    sponsor_id: Optional[int] = None
+    upline_id: Optional[int] = None
+    binary_position: Optional[str] = Field(None, pattern=r'^[LR]$')
+    
     # ステータス更新
-    status: Optional[str] = Field(None, regex=r'^(active|suspended|withdrawn|pending)$')
+    status: Optional[str] = Field(None, pattern=r'^(active|suspended|withdrawn|pending)$')
     
     # 銀行口座情報
+    bank_code: Optional[str] = Field(None, pattern=r'^\d{4}$')
     bank_name: Optional[str] = Field(None, max_length=50)
+    branch_code: Optional[str] = Field(None, pattern=r'^\d{3}$')
     branch_name: Optional[str] = Field(None, max_length=50)
-    account_type: Optional[str] = Field(None, regex=r'^(普通|当座)$')
+    account_type: Optional[str] = Field(None, pattern=r'^(普通|当座)$')
     account_number: Optional[str] = Field(None, max_length=20)
     account_holder: Optional[str] = Field(None, max_length=100)
     
@@ -65,12 +75,20 @@ class MemberUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+class MemberBulkUpdateItem(MemberUpdate):
+    """会員一括更新の1件"""
+    id: int
+
+
 class MemberSponsor(BaseModel):
     """スポンサー情報（簡略版）"""
     id: int
     member_code: str
     full_name: str
 
+    class Config:
+        from_attributes = True
+
 
 class Member(MemberBase):
     """会員情報（レスポンス用）"""
@@ -92,7 +110,9 @@ class Member(MemberBase):
     total_rewards: Optional[Decimal] = Field(default=0)
     
     # 銀行口座情報
+    bank_code: Optional[str] = None
     bank_name: Optional[str]
+    branch_code: Optional[str] = None
     branch_name: Optional[str] 
     account_type: Optional[str]
     account_number: Optional[str]
@@ -129,9 +149,87 @@ class MemberInDB(Member):
 class MemberList(BaseModel):
     """会員一覧"""
     members: List[Member]
-    total: int
+    total: Optional[int]  # count=none の場合は None
+    total_estimated: bool = False  # count=estimated の場合は True（実行計画の推定行数）
     page: int
     size: int
+    next_cursor: Optional[str] = None  # 次ページのカーソル（検索時・最終ページは None）
+
+
+class MemberSummary(TypedDict, total=False):
+    """
+    会員一覧の行（列を絞った版）
+    view=summary / fields= 指定時に使う。指定されなかった列はキーごと含まない。
+    """
+    id: int
+    member_code: str
+    family_name: str
+    given_name: str
+    family_name_kana: Optional[str]
+    given_name_kana: Optional[str]
+    email: str
+    phone: Optional[str]
+    status: str
+    is_active: bool
+    organization_level: int
+    binary_position: Optional[str]
+    registration_date: datetime
+    activation_date: Optional[datetime]
+    suspension_date: Optional[datetime]
+    withdrawal_date: Optional[datetime]
+    total_sales: Optional[Decimal]
+    total_rewards: Optional[Decimal]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+class MemberSummaryList(BaseModel):
+    """会員一覧（列を絞った版）"""
+    members: List[MemberSummary]
+    total: Optional[int]
+    total_estimated: bool = False
+    page: int
+    size: int
+    next_cursor: Optional[str] = None
+
+
+class MemberBulkItemResult(BaseModel):
+    """会員一括登録・更新の1件ごとの結果"""
+    index: int  # リクエスト配列内の位置
+    status: str  # created / updated / error
+    id: Optional[int] = None
+    member_code: Optional[str] = None
+    error: Optional[str] = None
+
+
+class MemberBulkResult(BaseModel):
+    """会員一括登録・更新の結果"""
+    succeeded: int
+    failed: int
+    results: List[MemberBulkItemResult]
+
+
+class DownlineNode(BaseModel):
+    """ダウンライン会員（組織図用）"""
+    id: int
+    member_code: str
+    family_name: str
+    given_name: str
+    status: str
+    binary_position: Optional[str]
+    parent_id: Optional[int]
+    depth: int
+
+    class Config:
+        from_attributes = True
+
+
+class DownlinePage(BaseModel):
+    """ダウンライン（幅優先・キーセットページング）"""
+    member_id: int
+    tree: str
+    nodes: List[DownlineNode]
+    next_cursor: Optional[str] = None
 
 
 class MemberStats(BaseModel):
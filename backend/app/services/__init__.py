@@ -0,0 +1 @@
+# Service layer (business logic shared by API endpoints and batch jobs)
\ No newline at end of file
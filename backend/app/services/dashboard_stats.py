@@ -0,0 +1,386 @@
+"""
+IROAS BOSS System - Dashboard Rollups
+ダッシュボード用 月次集計の差分更新・バックフィル・読み出し
+
+決済の消込・報酬振込データ作成・会員登録/ステータス変更の各処理から
+record_* を呼び、monthly_stats の該当月の行を差分で更新する（commit は
+呼び出し側で行うため、元の更新と同じトランザクションで反映される）。
+ダッシュボードは monthly_stats を主キーの範囲で読むだけで、payments・members
+の全件走査は rebuild_monthly_stats（バックフィル）でのみ行う。
+
+未決済件数は決済の作成・返金など増減の経路が多く差分では追えないため、
+集計せずに当月分を処理中決済の部分インデックス（ix_payments_pending）から数える。
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.dashboard import MonthlyStats
+from app.models.member import Member, MemberStatus
+from app.models.payment import Payment, PaymentStatus
+from app.models.reward import Reward
+from app.services.master_data import JST
+
+
+# 会員ステータス -> 在高列
+STATUS_COLUMNS = {
+    MemberStatus.ACTIVE.value: "active_members",
+    MemberStatus.SUSPENDED.value: "suspended_members",
+    MemberStatus.WITHDRAWN.value: "withdrawn_members",
+    MemberStatus.PENDING.value: "pending_members",
+}
+
+# 新しい月の行を作るときに前月から引き継ぐ列
+STOCK_COLUMNS = ("total_members", *STATUS_COLUMNS.values())
+
+FLOW_COLUMNS = ("sales_amount", "payment_count", "reward_payout_amount", "new_members", "withdrawals")
+
+# バックフィル時の INSERT 件数単位
+BACKFILL_BATCH_SIZE = 1000
+
+
+def month_start(value: Optional[date] = None) -> date:
+    """日付・日時 -> 対象月（JSTの月初日）。naive な日時は UTC とみなす"""
+    if value is None:
+        value = datetime.now(timezone.utc)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        value = value.astimezone(JST)
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """月初日に月数を加算"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _sql_month(value):
+    """SQL側の対象月（timestamptz は JST に変換してから月初に切り捨て）"""
+    if isinstance(value.type, Date):
+        return func.date_trunc("month", value).cast(Date)
+    return func.date_trunc("month", func.timezone("Asia/Tokyo", value)).cast(Date)
+
+
+# ---------------------------------------------------------------------------
+# 差分更新
+# ---------------------------------------------------------------------------
+
+async def _ensure_month(db: AsyncSession, month: date) -> None:
+    """対象月の行を作成（在高は直近の前月行から引き継ぐ）"""
+    carried = select(
+        literal(month, Date),
+        *[getattr(MonthlyStats, name) for name in STOCK_COLUMNS],
+    ).where(
+        MonthlyStats.month < month
+    ).order_by(MonthlyStats.month.desc()).limit(1)
+
+    await db.execute(
+        pg_insert(MonthlyStats)
+        .from_select(["month", *STOCK_COLUMNS], carried)
+        .on_conflict_do_nothing(index_elements=["month"])
+    )
+    # 最初の1行目（前月行がない場合）
+    await db.execute(
+        pg_insert(MonthlyStats)
+        .values(month=month)
+        .on_conflict_do_nothing(index_elements=["month"])
+    )
+
+
+async def _apply_deltas(db: AsyncSession, deltas: Dict[date, Dict[str, Any]]) -> None:
+    """
+    月ごとの差分を加算
+    同時実行時のデッドロックを避けるため、行は常に月の昇順で更新する。
+    """
+    for month in sorted(deltas):
+        values = {
+            name: func.coalesce(getattr(MonthlyStats, name), 0) + delta
+            for name, delta in deltas[month].items()
+            if delta
+        }
+        if not values:
+            continue
+        statement = (
+            update(MonthlyStats)
+            .where(MonthlyStats.month == month)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        if (await db.execute(statement)).rowcount == 0:
+            await _ensure_month(db, month)
+            await db.execute(statement)
+
+
+def _status_deltas(status: Optional[str], sign: int) -> Dict[str, int]:
+    """ステータス別在高・在籍会員数の増減"""
+    deltas = {}
+    if status in STATUS_COLUMNS:
+        deltas[STATUS_COLUMNS[status]] = sign
+    if status != MemberStatus.WITHDRAWN.value:
+        deltas["total_members"] = sign
+    return deltas
+
+
+async def record_member_registered(
+    db: AsyncSession,
+    status: str,
+    registered_at: Optional[datetime] = None,
+) -> None:
+    """会員登録の反映（新規登録数は登録月、在高は当月）"""
+    await record_members_registered(db, [(status, registered_at)])
+
+
+async def record_members_registered(
+    db: AsyncSession,
+    members: Iterable[Tuple[str, Optional[datetime]]],
+) -> None:
+    """会員登録（複数件）の反映。members は (ステータス, 登録日時)"""
+    current_month = month_start()
+    deltas: Dict[date, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for status, registered_at in members:
+        deltas[month_start(registered_at)]["new_members"] += 1
+        for name, delta in _status_deltas(status, 1).items():
+            deltas[current_month][name] += delta
+    await _apply_deltas(db, deltas)
+
+
+async def record_member_status_change(
+    db: AsyncSession,
+    old_status: Optional[str],
+    new_status: str,
+) -> None:
+    """会員ステータス変更の反映"""
+    await record_member_status_changes(db, [(old_status, new_status)])
+
+
+async def record_member_status_changes(
+    db: AsyncSession,
+    changes: Iterable[Tuple[Optional[str], str]],
+) -> None:
+    """会員ステータス変更（複数件）の反映。changes は (変更前, 変更後)"""
+    current: Dict[str, int] = defaultdict(int)
+    for old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        for status, sign in ((old_status, -1), (new_status, 1)):
+            for name, delta in _status_deltas(status, sign).items():
+                current[name] += delta
+        if new_status == MemberStatus.WITHDRAWN.value:
+            current["withdrawals"] += 1
+    await _apply_deltas(db, {month_start(): current})
+
+
+async def record_payments_settled(
+    db: AsyncSession,
+    settlements: Iterable[Tuple[datetime, Decimal, bool]],
+) -> None:
+    """
+    処理中決済の確定（完了・失敗）の反映
+    settlements は (処理日時, 金額, 成功か) 。売上は処理月に計上する。
+    """
+    deltas: Dict[date, Dict[str, Any]] = defaultdict(lambda: defaultdict(int))
+    for processed_at, amount, succeeded in settlements:
+        if succeeded:
+            month = deltas[month_start(processed_at)]
+            month["sales_amount"] += amount
+            month["payment_count"] += 1
+    if deltas:
+        await _apply_deltas(db, deltas)
+
+
+async def record_reward_payout(db: AsyncSession, paid_on: date, amount: Decimal) -> None:
+    """報酬振込データ作成分の反映（振込日の月）"""
+    await _apply_deltas(db, {month_start(paid_on): {"reward_payout_amount": amount}})
+
+
+# ---------------------------------------------------------------------------
+# バックフィル
+# ---------------------------------------------------------------------------
+
+async def _monthly_flows(db: AsyncSession) -> Dict[date, Dict[str, Any]]:
+    """payments・members・rewards から月別のフロー項目を集計"""
+    flows: Dict[date, Dict[str, Any]] = defaultdict(lambda: dict.fromkeys(FLOW_COLUMNS, 0))
+
+    month = _sql_month(Payment.payment_date)
+    result = await db.execute(
+        select(month, func.sum(Payment.amount), func.count())
+        .where(Payment.status == PaymentStatus.COMPLETED.value, Payment.payment_date.is_not(None))
+        .group_by(month)
+    )
+    for row_month, amount, count in result:
+        flows[row_month]["sales_amount"] = amount
+        flows[row_month]["payment_count"] = count
+
+    month = _sql_month(func.coalesce(Member.registration_date, Member.created_at))
+    result = await db.execute(select(month, func.count()).group_by(month))
+    for row_month, count in result:
+        flows[row_month]["new_members"] = count
+
+    month = _sql_month(func.coalesce(Member.withdrawal_date, Member.updated_at, Member.created_at))
+    result = await db.execute(
+        select(month, func.count())
+        .where(Member.status == MemberStatus.WITHDRAWN.value)
+        .group_by(month)
+    )
+    for row_month, count in result:
+        flows[row_month]["withdrawals"] = count
+
+    # 振込額は会員・バッチ単位の合計から振込手数料を差し引いた額
+    per_payee = select(
+        func.max(Reward.payment_scheduled_date).label("paid_on"),
+        (func.sum(Reward.net_amount + func.coalesce(Reward.carried_over_amount, 0))
+         - settings.GMO_TRANSFER_FEE).label("amount"),
+    ).where(
+        Reward.gmo_batch_id.is_not(None)
+    ).group_by(Reward.gmo_batch_id, Reward.member_id).subquery()
+    month = _sql_month(per_payee.c.paid_on)
+    result = await db.execute(
+        select(month, func.sum(per_payee.c.amount))
+        .where(per_payee.c.paid_on.is_not(None))
+        .group_by(month)
+    )
+    for row_month, amount in result:
+        flows[row_month]["reward_payout_amount"] = amount
+
+    return flows
+
+
+async def rebuild_monthly_stats(db: AsyncSession) -> int:
+    """
+    月次集計の再構築（全件集計）
+    フロー項目は全期間、在籍会員数は登録数・退会数の累計で再計算する。
+    ステータス別会員数は過去時点に遡れないため当月分のみ設定する。
+    commit は呼び出し側で行う。戻り値は作成した行数。
+    """
+    flows = await _monthly_flows(db)
+
+    result = await db.execute(select(Member.status, func.count()).group_by(Member.status))
+    status_counts = dict(result.all())
+
+    # 未来日付（予定日で記録された退会・振込など）は当月分として扱う
+    current = month_start()
+    for month in [month for month in flows if month > current]:
+        for name, value in flows.pop(month).items():
+            flows[current][name] += value
+    first = min([current, *flows])
+
+    rows = []
+    total_members = 0
+    month = first
+    while month <= current:
+        row = {"month": month, **flows.get(month, dict.fromkeys(FLOW_COLUMNS, 0))}
+        total_members += row["new_members"] - row["withdrawals"]
+        row["total_members"] = total_members
+        rows.append(row)
+        month = add_months(month, 1)
+
+    # 当月は現在の在高で確定（ステータスの不整合・登録日不明の会員も含める）
+    rows[-1]["total_members"] = sum(
+        count for status, count in status_counts.items() if status != MemberStatus.WITHDRAWN.value
+    )
+    for status, name in STATUS_COLUMNS.items():
+        rows[-1][name] = status_counts.get(status, 0)
+
+    table = MonthlyStats.__table__
+    await db.execute(delete(table))
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        batch = rows[start:start + BACKFILL_BATCH_SIZE]
+        await db.execute(insert(table), [
+            {name: row.get(name) for name in ("month", *FLOW_COLUMNS, *STOCK_COLUMNS)}
+            for row in batch
+        ])
+    return len(rows)
+
+
+# ---------------------------------------------------------------------------
+# 読み出し
+# ---------------------------------------------------------------------------
+
+@dataclass
+class MonthSnapshot:
+    """対象月の集計値（行がない月は直近の在高を引き継ぎフローは0）"""
+    month: date
+    sales_amount: Decimal
+    payment_count: int
+    reward_payout_amount: Decimal
+    new_members: int
+    withdrawals: int
+    total_members: int
+    active_members: Optional[int]
+    suspended_members: Optional[int]
+    withdrawn_members: Optional[int]
+    pending_members: Optional[int]
+    unpaid_count: Optional[int] = None  # 当月のみ（現在の件数）
+
+    @property
+    def revenue(self) -> Decimal:
+        """収益（売上 - 報酬支払額）"""
+        return self.sales_amount - self.reward_payout_amount
+
+
+def _snapshot(month: date, row: Optional[MonthlyStats]) -> MonthSnapshot:
+    if row is None:
+        return MonthSnapshot(month, Decimal(0), 0, Decimal(0), 0, 0, 0, None, None, None, None)
+    stocks = {name: getattr(row, name) for name in STOCK_COLUMNS}
+    if row.month == month:
+        flows = {name: getattr(row, name) for name in FLOW_COLUMNS}
+    else:
+        flows = {name: Decimal(0) if name.endswith("amount") else 0 for name in FLOW_COLUMNS}
+    return MonthSnapshot(month=month, **flows, **stocks)
+
+
+async def count_unpaid_payments(db: AsyncSession) -> int:
+    """現在の未決済（処理中）件数"""
+    return (await db.execute(
+        select(func.count()).select_from(Payment).where(Payment.status == PaymentStatus.PENDING.value)
+    )).scalar()
+
+
+async def get_monthly_snapshots(
+    db: AsyncSession,
+    months: int,
+    until: Optional[date] = None,
+) -> List[MonthSnapshot]:
+    """
+    直近 months ヶ月分の集計（古い順）
+    主キーの範囲読み1回。範囲の先頭より前の在高を引き継ぐため、開始月以前の
+    直近1行も合わせて読む。当月を含む場合は当月に現在の未決済件数を設定する。
+    """
+    until = month_start(until)
+    since = add_months(until, 1 - months)
+
+    before = select(MonthlyStats.month).where(
+        MonthlyStats.month <= since
+    ).order_by(MonthlyStats.month.desc()).limit(1).scalar_subquery()
+    result = await db.execute(
+        select(MonthlyStats)
+        .where(
+            MonthlyStats.month >= func.coalesce(before, since),
+            MonthlyStats.month <= until,
+        )
+        .order_by(MonthlyStats.month)
+    )
+    rows = list(result.scalars())
+
+    snapshots = []
+    latest = None
+    month = since
+    while month <= until:
+        while rows and rows[0].month <= month:
+            latest = rows.pop(0)
+        snapshots.append(_snapshot(month, latest))
+        month = add_months(month, 1)
+
+    if until == month_start():
+        snapshots[-1].unpaid_count = await count_unpaid_payments(db)
+    return snapshots
\ No newline at end of file
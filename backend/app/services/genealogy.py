@@ -0,0 +1,352 @@
+"""
+IROAS BOSS System - Genealogy Index
+会員ツリー祖先インデックスの維持・検索
+
+sponsor / upline の両ツリーについて、祖先・子孫の全組み合わせを
+member_tree_paths に保持する。ダウンライン・階層差・組織人数の問い合わせは
+再帰なしの範囲スキャン1回で完結する。
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, and_, any_, bindparam, delete, func, insert, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.database import unnest_table
+from app.models.genealogy import MemberTreePath, TreeType
+from app.models.member import Member
+
+
+# ツリー種別 -> 親を指すカラム名
+PARENT_COLUMNS = {
+    TreeType.SPONSOR.value: "sponsor_id",
+    TreeType.UPLINE.value: "upline_id",
+}
+
+# データ不整合（循環参照）時に再帰CTEが止まらないための上限
+MAX_TREE_DEPTH = 10000
+
+
+@dataclass
+class GenealogyCheckResult:
+    """整合性チェック結果"""
+    tree_type: str
+    expected_paths: int
+    stored_paths: int
+    missing: List[Tuple[int, int, int]] = field(default_factory=list)
+    unexpected: List[Tuple[int, int, int]] = field(default_factory=list)
+    missing_count: int = 0
+    unexpected_count: int = 0
+
+    @property
+    def is_consistent(self) -> bool:
+        return self.missing_count == 0 and self.unexpected_count == 0
+
+
+def downline_query(tree_type: str, ancestor_id: int, max_depth: Optional[int] = None):
+    """ダウンラインの子孫ID・深さ（自分自身は含まない）"""
+    query = select(MemberTreePath.descendant_id, MemberTreePath.depth).where(
+        MemberTreePath.tree_type == tree_type,
+        MemberTreePath.ancestor_id == ancestor_id,
+        MemberTreePath.depth > 0,
+    )
+    if max_depth is not None:
+        query = query.where(MemberTreePath.depth <= max_depth)
+    return query
+
+
+def parse_downline_after(values: Optional[Sequence[Any]]) -> Optional[Tuple[int, int]]:
+    """カーソルの値 -> キーセット（深さ, 会員ID）（整数以外は ValueError）"""
+    if values is None:
+        return None
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        raise ValueError("Invalid cursor")
+    depth, member_id = values
+    return depth, member_id
+
+
+def downline_nodes_query(
+    tree_type: str,
+    ancestor_id: int,
+    max_depth: Optional[int] = None,
+    after: Optional[Tuple[int, int]] = None,
+):
+    """
+    ダウンライン会員を幅優先順（深さ, 会員ID）で取得するクエリ
+    after には直前ページ最後の (depth, member_id) を渡す。
+    """
+    parent_column = getattr(Member, PARENT_COLUMNS[tree_type])
+    query = select(
+        Member.id,
+        Member.member_code,
+        Member.family_name,
+        Member.given_name,
+        Member.status,
+        Member.binary_position,
+        parent_column.label("parent_id"),
+        MemberTreePath.depth,
+    ).join(
+        Member, Member.id == MemberTreePath.descendant_id
+    ).where(
+        MemberTreePath.tree_type == tree_type,
+        MemberTreePath.ancestor_id == ancestor_id,
+        MemberTreePath.depth > 0,
+    )
+    if max_depth is not None:
+        query = query.where(MemberTreePath.depth <= max_depth)
+    if after is not None:
+        query = query.where(tuple_(MemberTreePath.depth, MemberTreePath.descendant_id) > tuple_(*after))
+    return query.order_by(MemberTreePath.depth, MemberTreePath.descendant_id)
+
+
+def upline_query(tree_type: str, descendant_id: int):
+    """アップラインの祖先ID・深さ（近い順、自分自身は含まない）"""
+    return select(MemberTreePath.ancestor_id, MemberTreePath.depth).where(
+        MemberTreePath.tree_type == tree_type,
+        MemberTreePath.descendant_id == descendant_id,
+        MemberTreePath.depth > 0,
+    ).order_by(MemberTreePath.depth)
+
+
+async def get_depth(db: AsyncSession, tree_type: str, ancestor_id: int, descendant_id: int) -> Optional[int]:
+    """ancestor から見た descendant の階層差（系列外なら None）"""
+    query = select(MemberTreePath.depth).where(
+        MemberTreePath.tree_type == tree_type,
+        MemberTreePath.ancestor_id == ancestor_id,
+        MemberTreePath.descendant_id == descendant_id,
+    )
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def get_organization_size(db: AsyncSession, tree_type: str, member_id: int) -> int:
+    """組織人数（本人を除くダウンライン数）"""
+    query = select(func.count()).select_from(downline_query(tree_type, member_id).subquery())
+    result = await db.execute(query)
+    return result.scalar()
+
+
+async def attach_member(db: AsyncSession, tree_type: str, member_id: int, parent_id: Optional[int]) -> None:
+    """新規会員のパスを追加（自分自身 + 親の全祖先）"""
+    await db.execute(insert(MemberTreePath).values(
+        tree_type=tree_type, ancestor_id=member_id, descendant_id=member_id, depth=0
+    ))
+    if parent_id is None:
+        return
+
+    parent_paths = select(
+        literal(tree_type),
+        MemberTreePath.ancestor_id,
+        literal(member_id),
+        MemberTreePath.depth + 1,
+    ).where(
+        MemberTreePath.tree_type == tree_type,
+        MemberTreePath.descendant_id == parent_id,
+    )
+    await db.execute(insert(MemberTreePath).from_select(
+        ["tree_type", "ancestor_id", "descendant_id", "depth"], parent_paths
+    ))
+
+
+async def attach_members(db: AsyncSession, tree_type: str, links: Sequence[Tuple[int, Optional[int]]]) -> None:
+    """
+    新規会員（複数件）のパスを追加
+    links は (会員ID, 親ID)。親は既にインデックスに登録済みであること。
+    """
+    if not links:
+        return
+    new_members = unnest_table(
+        "new_members",
+        member_id=(Integer, [member_id for member_id, _ in links]),
+        parent_id=(Integer, [parent_id for _, parent_id in links]),
+    )
+    self_paths = select(literal(tree_type), new_members.c.member_id, new_members.c.member_id, literal(0))
+    parent_paths = select(
+        literal(tree_type),
+        MemberTreePath.ancestor_id,
+        new_members.c.member_id,
+        MemberTreePath.depth + 1,
+    ).select_from(new_members).join(
+        MemberTreePath,
+        and_(MemberTreePath.tree_type == tree_type, MemberTreePath.descendant_id == new_members.c.parent_id),
+    )
+    await db.execute(insert(MemberTreePath).from_select(
+        ["tree_type", "ancestor_id", "descendant_id", "depth"], self_paths.union_all(parent_paths)
+    ))
+
+
+async def move_member(db: AsyncSession, tree_type: str, member_id: int, new_parent_id: Optional[int]) -> None:
+    """
+    会員（とそのサブツリー）を別の親の下へ移動
+    新しい親が自分のサブツリー内にある場合は ValueError。
+    """
+    if new_parent_id is not None:
+        if new_parent_id == member_id or await get_depth(db, tree_type, member_id, new_parent_id) is not None:
+            raise ValueError("Cannot move a member under its own downline")
+
+    subtree = select(MemberTreePath.descendant_id).where(
+        MemberTreePath.tree_type == tree_type,
+        MemberTreePath.ancestor_id == member_id,
+    )
+    old_ancestors = select(MemberTreePath.ancestor_id).where(
+        MemberTreePath.tree_type == tree_type,
+        MemberTreePath.descendant_id == member_id,
+        MemberTreePath.depth > 0,
+    )
+
+    # サブツリー外の祖先とのパスを削除
+    await db.execute(delete(MemberTreePath).where(
+        MemberTreePath.tree_type == tree_type,
+        MemberTreePath.descendant_id.in_(subtree),
+        MemberTreePath.ancestor_id.in_(old_ancestors),
+    ))
+
+    if new_parent_id is None:
+        return
+
+    # 新しい親の祖先（親自身を含む） × サブツリー
+    above = aliased(MemberTreePath)
+    below = aliased(MemberTreePath)
+    new_paths = select(
+        literal(tree_type),
+        above.ancestor_id,
+        below.descendant_id,
+        above.depth + below.depth + 1,
+    ).join(
+        below, and_(below.tree_type == tree_type, below.ancestor_id == member_id)
+    ).where(
+        above.tree_type == tree_type,
+        above.descendant_id == new_parent_id,
+    )
+    await db.execute(insert(MemberTreePath).from_select(
+        ["tree_type", "ancestor_id", "descendant_id", "depth"], new_paths
+    ))
+
+
+async def refresh_organization_levels(
+    db: AsyncSession,
+    member_id: Optional[int] = None,
+    member_ids: Optional[Sequence[int]] = None,
+) -> None:
+    """
+    組織レベル（sponsorツリー上の段数、最上位 = 1）を再計算
+    member_id / member_ids 指定時はそのサブツリーのみ更新する。
+    """
+    if member_id is not None:
+        member_ids = [member_id]
+    levels = select(
+        MemberTreePath.descendant_id.label("member_id"),
+        (func.max(MemberTreePath.depth) + 1).label("level"),
+    ).where(
+        MemberTreePath.tree_type == TreeType.SPONSOR.value,
+    ).group_by(MemberTreePath.descendant_id)
+
+    if member_ids is not None:
+        levels = levels.where(MemberTreePath.descendant_id.in_(
+            select(MemberTreePath.descendant_id).where(
+                MemberTreePath.tree_type == TreeType.SPONSOR.value,
+                MemberTreePath.ancestor_id == any_(bindparam("member_ids", list(member_ids), type_=ARRAY(Integer))),
+            )
+        ))
+
+    levels = levels.subquery()
+    await db.execute(
+        update(Member)
+        .where(Member.id == levels.c.member_id)
+        .values(organization_level=levels.c.level)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def index_new_member(db: AsyncSession, member: Member) -> None:
+    """新規会員をインデックスへ登録（会員は flush 済みであること）"""
+    await attach_member(db, TreeType.SPONSOR.value, member.id, member.sponsor_id)
+    await attach_member(db, TreeType.UPLINE.value, member.id, member.upline_id)
+    await refresh_organization_levels(db, member.id)
+
+
+async def index_new_members(db: AsyncSession, members: Sequence[Tuple[int, Optional[int], Optional[int]]]) -> None:
+    """
+    新規会員（複数件）をインデックスへ登録。members は (会員ID, sponsor_id, upline_id)
+    組織レベルは再計算しないため、登録時に紹介者のレベル + 1 を設定しておくこと。
+    """
+    await attach_members(db, TreeType.SPONSOR.value, [(member_id, sponsor_id) for member_id, sponsor_id, _ in members])
+    await attach_members(db, TreeType.UPLINE.value, [(member_id, upline_id) for member_id, _, upline_id in members])
+
+
+async def reindex_member_parents(db: AsyncSession, member: Member, changed: Dict[str, Optional[int]]) -> None:
+    """sponsor_id / upline_id 変更時のインデックス更新"""
+    if "sponsor_id" in changed:
+        await move_member(db, TreeType.SPONSOR.value, member.id, changed["sponsor_id"])
+        await refresh_organization_levels(db, member.id)
+    if "upline_id" in changed:
+        await move_member(db, TreeType.UPLINE.value, member.id, changed["upline_id"])
+
+
+def _expected_paths_cte(tree_type: str):
+    """members の親カラムから期待されるパスを再帰CTEで生成"""
+    paths = select(
+        Member.id.label("ancestor_id"),
+        Member.id.label("descendant_id"),
+        literal(0).label("depth"),
+    ).cte("expected_paths", recursive=True)
+
+    child = aliased(Member)
+    paths = paths.union_all(
+        select(
+            paths.c.ancestor_id,
+            child.id,
+            paths.c.depth + 1,
+        ).join(child, getattr(child, PARENT_COLUMNS[tree_type]) == paths.c.descendant_id)
+        .where(paths.c.depth < MAX_TREE_DEPTH)
+    )
+    return paths
+
+
+async def rebuild_genealogy(db: AsyncSession, tree_type: str) -> int:
+    """
+    指定ツリーのインデックスを members から全件再構築
+    commit は呼び出し側で行う。戻り値は作成したパス数。
+    """
+    paths = _expected_paths_cte(tree_type)
+    await db.execute(delete(MemberTreePath).where(MemberTreePath.tree_type == tree_type))
+    result = await db.execute(insert(MemberTreePath).from_select(
+        ["tree_type", "ancestor_id", "descendant_id", "depth"],
+        select(literal(tree_type), paths.c.ancestor_id, paths.c.descendant_id, paths.c.depth),
+    ))
+    if tree_type == TreeType.SPONSOR.value:
+        await refresh_organization_levels(db)
+    return result.rowcount
+
+
+async def check_genealogy(db: AsyncSession, tree_type: str, sample_size: int = 20) -> GenealogyCheckResult:
+    """インデックスと members の親カラムの整合性チェック"""
+    paths = _expected_paths_cte(tree_type)
+    expected = select(paths.c.ancestor_id, paths.c.descendant_id, paths.c.depth)
+    stored = select(
+        MemberTreePath.ancestor_id, MemberTreePath.descendant_id, MemberTreePath.depth
+    ).where(MemberTreePath.tree_type == tree_type)
+
+    missing = expected.except_(stored).subquery()
+    unexpected = stored.except_(expected).subquery()
+
+    expected_count = (await db.execute(select(func.count()).select_from(expected.subquery()))).scalar()
+    stored_count = (await db.execute(select(func.count()).select_from(stored.subquery()))).scalar()
+    missing_count = (await db.execute(select(func.count()).select_from(missing))).scalar()
+    unexpected_count = (await db.execute(select(func.count()).select_from(unexpected))).scalar()
+
+    missing_rows = (await db.execute(select(missing).limit(sample_size))).all() if missing_count else []
+    unexpected_rows = (await db.execute(select(unexpected).limit(sample_size))).all() if unexpected_count else []
+
+    return GenealogyCheckResult(
+        tree_type=tree_type,
+        expected_paths=expected_count,
+        stored_paths=stored_count,
+        missing=[tuple(row) for row in missing_rows],
+        unexpected=[tuple(row) for row in unexpected_rows],
+        missing_count=missing_count,
+        unexpected_count=unexpected_count,
+    )
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+IROAS BOSS System - GMO NetBank Transfer Export
+報酬支払用 GMOあおぞらネット銀行 総合振込CSVの作成
+
+支払対象の判定・gmo_batch_id の付与は集合演算の UPDATE で一括処理し、
+振込データは会員ごとに集計した結果をサーバーサイドカーソルで読みながら
+cp932 のCSVへ逐次書き出す（全件をメモリに載せない）。
+
+CSVレイアウト（1行1会員、ヘッダーなし）:
+    顧客番号(会員ID), 会員番号, 金融機関コード, 金融機関名(ｶﾅ), 支店コード,
+    預金種目, 口座番号, 受取人名(ｶﾅ), 振込金額
+"""
+
+import csv
+import time
+import unicodedata
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Optional
+
+from sqlalchemy import and_, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.metrics import tracked_job
+from app.models.member import Member
+from app.models.reward import Reward, RewardStatus
+from app.services.dashboard_stats import record_reward_payout
+from app.services.rewards.common import payout_date, period_bounds
+
+
+TRANSFER_FILE_ENCODING = "cp932"
+
+STREAM_PARTITION_SIZE = 10000
+
+# 口座種別 -> 預金種目コード
+ACCOUNT_TYPE_CODES = {"普通": 1, "当座": 2, "貯蓄": 4}
+
+# 支払対象として集計する報酬ステータス（締めで計算済みの報酬・差分再計算の調整行を含む。
+# 繰越分は次回以降に合算して支払う）。振込データに含めた報酬は承認済みにする
+PAYABLE_STATUSES = (
+    RewardStatus.CALCULATED.value,
+    RewardStatus.APPROVED.value,
+    RewardStatus.CARRIED_OVER.value,
+)
+
+
+def _build_halfwidth_table() -> Dict[str, str]:
+    """全角カタカナ -> 半角カナ（濁点・半濁点は2文字に分解）"""
+    table = {}
+    for code in range(0xFF66, 0xFF9E):
+        halfwidth = chr(code)
+        table[unicodedata.normalize("NFKC", halfwidth)] = halfwidth
+    for fullwidth, halfwidth in list(table.items()):
+        for mark, halfwidth_mark in (("゙", "ﾞ"), ("゚", "ﾟ")):
+            composed = unicodedata.normalize("NFC", fullwidth + mark)
+            if len(composed) == 1:
+                table[composed] = halfwidth + halfwidth_mark
+    table["ー"] = "-"
+    table["ヴ"] = "ｳﾞ"
+    return table
+
+
+_HALFWIDTH_KANA = str.maketrans(_build_halfwidth_table())
+_LARGE_KANA = str.maketrans("ァィゥェォッャュョヮヵヶ", "アイウエオツヤユヨワカケ")
+
+
+def to_bank_kana(value: Optional[str]) -> str:
+    """
+    振込データ用の半角カナに変換
+    ひらがな・全角カナは半角に、小書き文字は大書きに、長音は '-' にする。
+    """
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKC", value).upper()
+    value = "".join(chr(ord(ch) + 0x60) if "ぁ" <= ch <= "ゖ" else ch for ch in value)
+    value = value.replace("　", " ").translate(_LARGE_KANA)
+    return value.translate(_HALFWIDTH_KANA).strip()
+
+
+def _digits_or_raw(value: Optional[str]):
+    """数字のみの項目は先頭0を落として出力する（旧システムのCSVに合わせる）"""
+    value = (value or "").strip()
+    return int(value) if value.isdigit() else value
+
+
+def transfer_row(
+    member_id: int,
+    member_code: str,
+    bank_code: str,
+    bank_name: Optional[str],
+    branch_code: str,
+    account_type: Optional[str],
+    account_number: str,
+    account_holder: Optional[str],
+    family_name_kana: Optional[str],
+    given_name_kana: Optional[str],
+    amount: int,
+) -> list:
+    """振込データ1行"""
+    holder = account_holder or f"{family_name_kana or ''}{given_name_kana or ''}"
+    return [
+        member_id,
+        _digits_or_raw(member_code),
+        _digits_or_raw(bank_code),
+        to_bank_kana(bank_name),
+        _digits_or_raw(branch_code),
+        ACCOUNT_TYPE_CODES.get(account_type or "普通", 1),
+        account_number.strip(),
+        to_bank_kana(holder),
+        amount,
+    ]
+
+
+@dataclass
+class TransferExportSummary:
+    """振込データ作成結果サマリー"""
+    batch_id: str
+    transfer_date: date
+    output_path: str
+    payees: int
+    rewards_stamped: int
+    rewards_carried_over: int
+    missing_bank_account: int
+    total_amount: Decimal
+    transfer_fee: int
+    elapsed_seconds: float
+
+
+def _payable_condition(period_to: date, reward=Reward):
+    """振込対象となり得る報酬（未振込・計算済み/承認済み/繰越中・対象月以前）"""
+    return and_(
+        reward.gmo_batch_id.is_(None),
+        reward.status.in_(PAYABLE_STATUSES),
+        reward.reward_period <= period_to,
+    )
+
+
+def _payout_amount(reward=Reward):
+    """報酬1件の支払額（手取り額 + 繰越額）"""
+    return reward.net_amount + func.coalesce(reward.carried_over_amount, 0)
+
+
+def _bank_account_condition():
+    """振込先口座が揃っている会員"""
+    return and_(
+        Member.bank_code.is_not(None),
+        Member.branch_code.is_not(None),
+        Member.account_number.is_not(None),
+    )
+
+
+@tracked_job("gmo_transfer_export", items=lambda summary: summary.payees)
+async def export_transfer_file(
+    db: AsyncSession,
+    reward_period: date,
+    output_path: str,
+    batch_id: Optional[str] = None,
+    transfer_date: Optional[date] = None,
+) -> TransferExportSummary:
+    """
+    報酬振込データの作成
+    会員ごとの支払額（手取り額 + 繰越額）が最低支払額以上で、口座が登録済みの
+    会員の報酬に gmo_batch_id を付与してCSVへ出力する。それ以外は繰越にする。
+    commit は呼び出し側で行う（CSVの書き出しに失敗した場合は rollback すること）。
+    """
+    started = time.perf_counter()
+    _, period_to = period_bounds(reward_period)
+    transfer_date = transfer_date or payout_date(reward_period)
+    batch_id = batch_id or f"GMO-{period_to:%Y%m}-{datetime.utcnow():%Y%m%d%H%M%S}"
+    minimum_payout = Decimal(settings.MINIMUM_PAYOUT_AMOUNT)
+    transfer_fee = settings.GMO_TRANSFER_FEE
+
+    # 報酬計算の一括INSERT直後は統計情報が古く、会員別集計が入れ子ループで
+    # 繰り返し評価されるため、先に統計を更新しておく
+    await db.execute(text("ANALYZE rewards"))
+
+    payable = _payable_condition(period_to)
+
+    # UPDATE rewards の副問い合わせと相関しないよう別名で集計する
+    pending = aliased(Reward)
+    totals = select(
+        pending.member_id,
+        func.sum(_payout_amount(pending)).label("total"),
+    ).where(_payable_condition(period_to, pending)).group_by(pending.member_id).subquery()
+
+    reaching_minimum = select(totals.c.member_id).join(
+        Member, Member.id == totals.c.member_id
+    ).where(
+        totals.c.total >= minimum_payout,
+        totals.c.total > transfer_fee,
+    )
+    payees = reaching_minimum.where(_bank_account_condition())
+
+    missing_bank_account = (await db.execute(
+        select(func.count()).select_from(
+            reaching_minimum.where(~_bank_account_condition()).subquery()
+        )
+    )).scalar()
+
+    # 支払対象会員の報酬に一括でバッチIDを付与
+    stamped = await db.execute(
+        update(Reward)
+        .where(payable, Reward.member_id.in_(payees))
+        .values(
+            gmo_batch_id=batch_id,
+            status=RewardStatus.APPROVED.value,
+            is_payout_eligible=True,
+            payment_scheduled_date=transfer_date,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    # 残り（最低支払額未満・口座未登録）は繰越
+    carried = await db.execute(
+        update(Reward)
+        .where(payable)
+        .values(status=RewardStatus.CARRIED_OVER.value, is_payout_eligible=False)
+        .execution_options(synchronize_session=False)
+    )
+
+    query = select(
+        Member.id,
+        Member.member_code,
+        Member.bank_code,
+        Member.bank_name,
+        Member.branch_code,
+        Member.account_type,
+        Member.account_number,
+        Member.account_holder,
+        Member.family_name_kana,
+        Member.given_name_kana,
+        func.sum(_payout_amount()),
+    ).join(
+        Member, Member.id == Reward.member_id
+    ).where(
+        Reward.gmo_batch_id == batch_id
+    ).group_by(Member.id).order_by(Member.member_code)
+
+    payee_count = 0
+    total_amount = Decimal(0)
+    with open(output_path, "w", encoding=TRANSFER_FILE_ENCODING, errors="replace", newline="") as f:
+        writer = csv.writer(f, lineterminator="\r\n")
+        result = await db.stream(query.execution_options(yield_per=STREAM_PARTITION_SIZE))
+        async for partition in result.partitions(STREAM_PARTITION_SIZE):
+            rows = []
+            for *member_fields, total in partition:
+                payment = int(total) - transfer_fee
+                total_amount += payment
+                rows.append(transfer_row(*member_fields, payment))
+            writer.writerows(rows)
+            payee_count += len(rows)
+
+    await record_reward_payout(db, transfer_date, total_amount)
+
+    return TransferExportSummary(
+        batch_id=batch_id,
+        transfer_date=transfer_date,
+        output_path=output_path,
+        payees=payee_count,
+        rewards_stamped=stamped.rowcount,
+        rewards_carried_over=carried.rowcount,
+        missing_bank_account=missing_bank_account,
+        total_amount=total_amount,
+        transfer_fee=transfer_fee,
+        elapsed_seconds=time.perf_counter() - started,
+    )
\ No newline at end of file
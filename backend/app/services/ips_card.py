@@ -0,0 +1,146 @@
+"""
+IROAS BOSS System - IPS Card Billing
+IPSカード決済の一括請求ファイル作成・結果取込
+
+請求ファイル（IPScard_convert_*.csv）は処理中のクレジットカード決済を
+サーバーサイドカーソルで読みながら逐次書き出す。結果ファイル
+（IPScardresult_*.csv）は payment_reconciliation の一括消込で反映する。
+"""
+
+import csv
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import tracked_job
+from app.models.member import Member
+from app.models.payment import Payment, PaymentMethod, PaymentStatus
+from app.services.master_data import normalize_member_code
+from app.services.payment_reconciliation import (
+    ReconciliationSummary,
+    ResultLine,
+    parse_amount,
+    reconcile_results,
+)
+
+
+IPS_FILE_ENCODING = "cp932"
+
+# 請求ファイル1列目の処理区分（3: 売上）
+IPS_PROCESS_SALE = "3"
+
+# 店舗側オーダー番号の桁数（会員番号を0埋め）
+IPS_ORDER_NUMBER_WIDTH = 11
+
+IPS_CURRENCY = "JPY"
+
+STREAM_PARTITION_SIZE = 10000
+
+
+@dataclass
+class IpsExportSummary:
+    """請求ファイル作成結果サマリー"""
+    output_path: str
+    payments: int
+    total_amount: Decimal
+    elapsed_seconds: float
+
+
+def order_number(member_code: str) -> str:
+    """会員番号 -> 店舗側オーダー番号（11桁0埋め）"""
+    member_code = member_code.strip()
+    if member_code.isdigit():
+        member_code = str(int(member_code))
+    return member_code.zfill(IPS_ORDER_NUMBER_WIDTH)
+
+
+def billing_query(due_before: Optional[datetime] = None):
+    """
+    請求対象の決済（処理中のクレジットカード決済）
+    オーダー番号は会員単位のため、1会員につき最も古い1件のみを対象とする。
+    """
+    query = select(
+        Member.member_code,
+        Payment.amount,
+    ).join(
+        Member, Member.id == Payment.member_id
+    ).where(
+        Payment.status == PaymentStatus.PENDING.value,
+        Payment.payment_method == PaymentMethod.CREDIT_CARD.value,
+    ).distinct(
+        Payment.member_id
+    ).order_by(
+        Payment.member_id, Payment.due_date.asc().nulls_last(), Payment.id
+    )
+    if due_before is not None:
+        query = query.where(Payment.due_date < due_before)
+    return query
+
+
+@tracked_job("ips_card_export", items=lambda summary: summary.payments)
+async def export_ips_convert_file(
+    db: AsyncSession,
+    output_path: str,
+    due_before: Optional[datetime] = None,
+) -> IpsExportSummary:
+    """IPSカード請求ファイルの作成（読み取りのみ）"""
+    started = time.perf_counter()
+    payments = 0
+    total_amount = Decimal(0)
+
+    with open(output_path, "w", encoding=IPS_FILE_ENCODING, newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+        query = billing_query(due_before).execution_options(yield_per=STREAM_PARTITION_SIZE)
+        result = await db.stream(query)
+        async for partition in result.partitions(STREAM_PARTITION_SIZE):
+            writer.writerows(
+                (IPS_PROCESS_SALE, order_number(member_code), int(amount), IPS_CURRENCY)
+                for member_code, amount in partition
+            )
+            payments += len(partition)
+            total_amount += sum((amount for _, amount in partition), Decimal(0))
+
+    return IpsExportSummary(
+        output_path=output_path,
+        payments=payments,
+        total_amount=total_amount,
+        elapsed_seconds=time.perf_counter() - started,
+    )
+
+
+def parse_ips_result_file(path: str) -> Iterator[ResultLine]:
+    """
+    IPSカード決済結果CSV（IPScardresult_*.csv）の読み込み
+    列: IPS決済番号, 検索種別, 店舗側オーダー番号, 電話番号, メールアドレス,
+        金額(税込), 送料, 処理結果コード, 決済結果(OK/NG)
+    """
+    with open(path, encoding=IPS_FILE_ENCODING, newline="") as f:
+        reader = csv.DictReader(f)
+        for line_number, row in enumerate(reader, start=2):
+            succeeded = (row.get("決済結果") or "").strip().upper() == "OK"
+            error_code = (row.get("処理結果コード") or "").strip() or None
+            yield ResultLine(
+                line_number=line_number,
+                member_code=normalize_member_code(row.get("店舗側オーダー番号")),
+                amount=parse_amount(row.get("金額(税込)")),
+                succeeded=succeeded,
+                external_transaction_id=(row.get("IPS決済番号") or "").strip() or None,
+                error_code=None if succeeded else error_code,
+                error_message=None if succeeded else "IPS決済結果NG",
+            )
+
+
+async def ingest_ips_result_file(db: AsyncSession, path: str) -> ReconciliationSummary:
+    """IPSカード決済結果の取込（commit は呼び出し側で行う）"""
+    return await reconcile_results(
+        db,
+        parse_ips_result_file(path),
+        source=path,
+        process_type="ips_card",
+        payment_method=PaymentMethod.CREDIT_CARD.value,
+    )
\ No newline at end of file
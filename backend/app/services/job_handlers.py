@@ -0,0 +1,192 @@
+"""
+IROAS BOSS System - Job Handlers
+バックグラウンドジョブの種別ごとの処理
+
+- reward_close: 月次報酬計算（バイナリー + ユニレベル）。キーは報酬対象月
+- reward_recalculate: 締め後の変更会員（返金・休会など）の差分再計算。キーは報酬対象月 +
+  変更会員のIDのハッシュ
+- gmo_transfer_export: 報酬振込データ（GMOあおぞらネット銀行）の作成。キーは報酬対象月
+- payment_reconciliation: 口座振替結果CSVの消込。キーはファイル名（UPLOAD_DIR 内）
+
+同じキーで成功済みのジョブは再実行しない（rerun 指定時を除く）。報酬計算は計算済みの
+報酬を置き換えるため再実行しても結果は同じ。ただし承認・支払・繰越済みの報酬がある月は
+置き換えられない（二重払いになる）ため reward_close は登録・実行せず、締め後の変更は
+reward_recalculate で差額を追加する。振込データは未振込の報酬のみを対象にする。
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from datetime import date, datetime
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import CACHE_TAG_DASHBOARD
+from app.core.config import settings
+from app.models.reward import Reward, RewardStatus, RewardType
+from app.services.jobs import JobContext, JobDefinition
+from app.services.payment_reconciliation import ingest_transfer_result_file, parse_transfer_result_file
+
+
+def _summary(summary: Any) -> Dict[str, Any]:
+    """サービスの結果サマリー -> JSON（Decimal・日付は文字列）"""
+    return json.loads(json.dumps(asdict(summary), default=str))
+
+
+def _parse_period(value: Any) -> date:
+    """'YYYY-MM' 形式の報酬対象月"""
+    if not value:
+        raise ValueError("reward_period is required")
+    try:
+        return datetime.strptime(str(value), "%Y-%m").date()
+    except ValueError:
+        raise ValueError("reward_period must be YYYY-MM")
+
+
+def _period_params(params: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    period = _parse_period(params.get("reward_period"))
+    return {"reward_period": f"{period:%Y-%m}"}, f"{period:%Y-%m}"
+
+
+# 月次報酬計算で置き換える報酬種別
+CLOSE_REWARD_TYPES = (RewardType.BINARY_BONUS.value, RewardType.UNILEVEL_BONUS.value)
+
+
+async def _check_period_open(db: AsyncSession, params: Dict[str, Any]) -> None:
+    """承認・支払・繰越済みの報酬がある月は月次報酬計算をやり直さない"""
+    period = _parse_period(params.get("reward_period"))
+    finalized = (await db.execute(
+        select(Reward.id).where(
+            Reward.reward_period == period,
+            Reward.reward_type.in_(CLOSE_REWARD_TYPES),
+            Reward.status.not_in((RewardStatus.CALCULATED.value, RewardStatus.CANCELLED.value)),
+        ).limit(1)
+    )).first()
+    if finalized is not None:
+        raise ValueError(
+            f"rewards for {period:%Y-%m} are already approved or paid; "
+            "use reward_recalculate with the changed member_ids instead"
+        )
+
+
+async def run_reward_close(db: AsyncSession, context: JobContext) -> Dict[str, Any]:
+    """月次報酬計算（登録後に承認された場合に備えて実行時にも確認する）"""
+    # 報酬計算（numpy）は API の起動時に読み込まない
+    from app.services.rewards.binary import calculate_binary_bonus
+    from app.services.rewards.unilevel import calculate_unilevel_bonus
+
+    period = _parse_period(context.params["reward_period"])
+    await _check_period_open(db, context.params)
+    await context.progress(0)
+    binary = await calculate_binary_bonus(db, period, executor=context.executor)
+    await context.progress(50, binary.rewards_created)
+    unilevel = await calculate_unilevel_bonus(db, period)
+    await context.progress(100, binary.rewards_created + unilevel.rewards_created)
+    return {"binary": _summary(binary), "unilevel": _summary(unilevel)}
+
+
+def _recalculation_params(params: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    prepared, key = _period_params(params)
+    try:
+        member_ids = sorted({int(member_id) for member_id in params.get("member_ids") or ()})
+    except (TypeError, ValueError):
+        raise ValueError("member_ids must be a list of member IDs")
+    if not member_ids:
+        raise ValueError("member_ids is required")
+    digest = hashlib.sha1(",".join(map(str, member_ids)).encode()).hexdigest()[:12]
+    prepared["member_ids"] = member_ids
+    return prepared, f"{key}:{digest}"
+
+
+async def run_reward_recalculate(db: AsyncSession, context: JobContext) -> Dict[str, Any]:
+    """変更会員の影響範囲だけの報酬再計算（差額を調整行として追加）"""
+    from app.services.rewards.incremental import recalculate_rewards
+
+    period = _parse_period(context.params["reward_period"])
+    await context.progress(0)
+    summary = await recalculate_rewards(db, period, context.params["member_ids"])
+    await context.progress(100, summary.adjustments_created)
+    return _summary(summary)
+
+
+def _transfer_params(params: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    prepared, key = _period_params(params)
+    if params.get("transfer_date"):
+        prepared["transfer_date"] = date.fromisoformat(str(params["transfer_date"])).isoformat()
+    return prepared, key
+
+
+async def run_gmo_transfer_export(db: AsyncSession, context: JobContext) -> Dict[str, Any]:
+    """報酬振込データの作成（JOB_OUTPUT_DIR に出力。失敗時は出力したファイルを消す）"""
+    from app.services.gmo_transfer import export_transfer_file
+    from app.services.rewards.common import payout_date
+
+    period = _parse_period(context.params["reward_period"])
+    transfer_date = (
+        date.fromisoformat(context.params["transfer_date"])
+        if context.params.get("transfer_date") else payout_date(period)
+    )
+    os.makedirs(settings.JOB_OUTPUT_DIR, exist_ok=True)
+    output_path = os.path.join(
+        settings.JOB_OUTPUT_DIR, f"TrnsMakeCSV_{transfer_date:%Y%m%d}_job{context.job_id}.csv"
+    )
+
+    await context.progress(0)
+    try:
+        summary = await export_transfer_file(db, period, output_path, transfer_date=transfer_date)
+        await context.progress(100, summary.payees)
+    except BaseException:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+    return _summary(summary)
+
+
+def _upload_path(name: Any) -> str:
+    """UPLOAD_DIR 内のファイル（ディレクトリ外を指すパスは不可）"""
+    upload_dir = os.path.realpath(settings.UPLOAD_DIR)
+    path = os.path.realpath(os.path.join(upload_dir, str(name or "")))
+    if not name or not path.startswith(upload_dir + os.sep):
+        raise ValueError("path must name a file in the upload directory")
+    if not os.path.isfile(path):
+        raise ValueError(f"file not found: {name}")
+    return path
+
+
+def _reconciliation_params(params: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    path = _upload_path(params.get("path"))
+    name = os.path.relpath(path, os.path.realpath(settings.UPLOAD_DIR))
+    return {"path": name}, name
+
+
+async def run_payment_reconciliation(db: AsyncSession, context: JobContext) -> Dict[str, Any]:
+    """口座振替結果CSVの消込（進捗はファイルの行数に対する処理済みの行数）"""
+    path = _upload_path(context.params["path"])
+    total = sum(1 for _ in parse_transfer_result_file(path))
+
+    async def progress(lines: int) -> None:
+        await context.progress(lines * 100 / total if total else 100, lines)
+
+    await context.progress(0)
+    summary = await ingest_transfer_result_file(db, path, progress=progress)
+    return _summary(summary)
+
+
+JOB_DEFINITIONS: Dict[str, JobDefinition] = {
+    "reward_close": JobDefinition(
+        run=run_reward_close, prepare=_period_params, invalidates=(CACHE_TAG_DASHBOARD,),
+        check=_check_period_open,
+    ),
+    "reward_recalculate": JobDefinition(
+        run=run_reward_recalculate, prepare=_recalculation_params, invalidates=(CACHE_TAG_DASHBOARD,)
+    ),
+    "gmo_transfer_export": JobDefinition(
+        run=run_gmo_transfer_export, prepare=_transfer_params, invalidates=(CACHE_TAG_DASHBOARD,)
+    ),
+    "payment_reconciliation": JobDefinition(
+        run=run_payment_reconciliation, prepare=_reconciliation_params, invalidates=(CACHE_TAG_DASHBOARD,)
+    ),
+}
\ No newline at end of file
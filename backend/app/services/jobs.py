@@ -0,0 +1,341 @@
+"""
+IROAS BOSS System - Background Jobs
+バックグラウンドジョブの登録・実行（DB のジョブテーブルをキューとして使う）
+
+- 登録: submit_job()。同じ種別・キー（報酬対象月など）のジョブが実行待ち・実行中・
+  完了済みならそれを返す（完了済みを再実行する場合は rerun=True）
+- 実行: JobWorker が queued の行を FOR UPDATE SKIP LOCKED で取得し、ハンドラーを
+  専用のセッションで実行する。成功時はジョブの完了と処理結果を同じトランザクションで
+  コミットし、失敗・キャンセル時は処理結果をすべて rollback する
+- 進捗・キャンセル: ハンドラーは JobContext.progress() で進捗を記録する（別の
+  トランザクションで即時に反映）。キャンセル要求は次の progress() で JobCancelled になる
+- 応答の途絶えた実行中ジョブ（ワーカーの停止）は JOB_STALE_SECONDS 後に失敗にする。
+  ジョブ行の更新は実行中かつ自ワーカーの行に限るため、失敗にされた後で元のワーカーが
+  完了させることはない（次の進捗記録で中断し、処理結果は rollback する）
+- 報酬計算の並列実行（REWARD_CALCULATION_WORKERS > 1）には、ワーカーが起動している間
+  同じプロセスプールを使う（JobContext.executor。締めのたびにプロセスを起動しない）
+"""
+
+import asyncio
+import os
+import socket
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.models.job import ACTIVE_JOB_STATUSES, Job, JobStatus
+
+
+class JobCancelled(Exception):
+    """キャンセル要求により中断した"""
+
+
+class JobNotCancellable(Exception):
+    """終了済みのジョブはキャンセルできない"""
+
+
+class JobLost(Exception):
+    """ジョブが実行中でなくなった（応答途絶で失敗にされた）"""
+
+
+@dataclass
+class JobDefinition:
+    """ジョブ種別ごとの処理"""
+    run: Callable[[AsyncSession, "JobContext"], Awaitable[Dict[str, Any]]]
+    prepare: Callable[[Dict[str, Any]], Tuple[Dict[str, Any], str]]  # 入力 -> (パラメータ, 重複実行防止キー)
+    invalidates: Sequence[str] = ()  # 完了時に無効化するレスポンスキャッシュのタグ
+    check: Optional[Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]] = None  # 登録前の確認（不可なら ValueError）
+
+
+async def submit_job(
+    db: AsyncSession,
+    job_type: str,
+    params: Dict[str, Any],
+    idempotency_key: str,
+    rerun: bool = False,
+    submitted_by: Optional[str] = None,
+) -> Tuple[Job, bool]:
+    """
+    ジョブ登録（戻り値は (ジョブ, 新規に登録したか)）
+    同じ種別・キーの実行待ち・実行中のジョブ、rerun でなければ完了済みのジョブも
+    そのまま返す。commit は呼び出し側で行う。
+    """
+    reusable = ACTIVE_JOB_STATUSES if rerun else ACTIVE_JOB_STATUSES + (JobStatus.SUCCEEDED.value,)
+    existing_query = select(Job).where(
+        Job.job_type == job_type,
+        Job.idempotency_key == idempotency_key,
+        Job.status.in_(reusable),
+    ).order_by(Job.id.desc()).limit(1)
+
+    existing = (await db.execute(existing_query)).scalar_one_or_none()
+    if existing is not None:
+        return existing, False
+
+    job = Job(job_type=job_type, idempotency_key=idempotency_key, params=params, submitted_by=submitted_by)
+    try:
+        async with db.begin_nested():
+            db.add(job)
+    except IntegrityError:
+        # 同時に登録された同じジョブ（uq_jobs_active_key）
+        existing = (await db.execute(existing_query)).scalar_one_or_none()
+        if existing is None:
+            raise
+        return existing, False
+    return job, True
+
+
+async def request_cancel(db: AsyncSession, job: Job) -> Job:
+    """
+    キャンセル
+    実行待ちはその場でキャンセルし、実行中はキャンセルを要求する（ワーカーが次の
+    進捗記録の時点で中断し、処理結果を rollback する）。commit は呼び出し側で行う。
+    """
+    if job.status == JobStatus.QUEUED.value:
+        job.status = JobStatus.CANCELLED.value
+        job.cancel_requested = True
+        job.finished_at = func.now()
+    elif job.status == JobStatus.RUNNING.value:
+        job.cancel_requested = True
+    else:
+        raise JobNotCancellable(f"job {job.id} is already {job.status}")
+    await db.flush()
+    await db.refresh(job)
+    return job
+
+
+class JobContext:
+    """実行中のジョブ（ハンドラーに渡す）"""
+
+    def __init__(
+        self,
+        job: Job,
+        session_factory: async_sessionmaker,
+        worker_id: Optional[str] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.job_id = job.id
+        self.params = dict(job.params or {})
+        self.session_factory = session_factory
+        self.worker_id = worker_id or job.worker_id
+        self.executor = executor  # 並列計算用のプロセスプール（ない場合は None）
+        self.cancel_requested = False
+        self.lost = False
+
+    async def _touch(self, **values: Any) -> None:
+        """ジョブ行の更新（別のトランザクション）とキャンセル要求の確認"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Job)
+                .where(running_on(self.job_id, self.worker_id))
+                .values(heartbeat_at=func.now(), **values)
+                .returning(Job.cancel_requested)
+            )
+            cancel_requested = result.scalar_one_or_none()
+            await db.commit()
+        if cancel_requested is None:
+            self.lost = True
+        self.cancel_requested = self.cancel_requested or bool(cancel_requested)
+
+    async def progress(self, percent: Optional[float] = None, rows: Optional[int] = None) -> None:
+        """進捗の記録（キャンセルが要求されていれば JobCancelled）"""
+        values = {}
+        if percent is not None:
+            values["progress"] = int(max(0, min(100, percent)))
+        if rows is not None:
+            values["rows_processed"] = rows
+        await self._touch(**values)
+        self.checkpoint()
+
+    def checkpoint(self) -> None:
+        if self.lost:
+            raise JobLost(f"job {self.job_id} is no longer running on {self.worker_id}")
+        if self.cancel_requested:
+            raise JobCancelled(f"job {self.job_id} was cancelled")
+
+
+def running_on(job_id: int, worker_id: Optional[str]):
+    """自ワーカーで実行中のジョブ行（失敗にされた・他のワーカーが取得した行は更新しない）"""
+    return and_(
+        Job.id == job_id,
+        Job.status == JobStatus.RUNNING.value,
+        Job.worker_id == worker_id,
+    )
+
+
+class JobWorker:
+    """ジョブの取得・実行（1ワーカーにつき1件ずつ）"""
+
+    def __init__(
+        self,
+        definitions: Dict[str, JobDefinition],
+        session_factory: async_sessionmaker,
+        worker_id: Optional[str] = None,
+        poll_interval: float = settings.JOB_POLL_INTERVAL,
+        heartbeat_seconds: float = settings.JOB_HEARTBEAT_SECONDS,
+        stale_seconds: float = settings.JOB_STALE_SECONDS,
+        process_workers: int = settings.REWARD_CALCULATION_WORKERS,
+    ):
+        self.definitions = definitions
+        self.session_factory = session_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds
+        self.process_workers = process_workers
+        self.executor: Optional[Executor] = None
+
+    async def run(self, stop: Optional[asyncio.Event] = None, once: bool = False) -> int:
+        """
+        実行待ちのジョブを順に実行する（戻り値は実行した件数）
+        once の場合は実行待ちがなくなった時点で終わる。stop がセットされると
+        実行中のジョブの終了後に終わる。
+        """
+        stop = stop or asyncio.Event()
+        executed = 0
+        # プロセスは最初の並列計算の時点で起動し、以降のジョブでも使い回す
+        if self.process_workers > 1:
+            self.executor = ProcessPoolExecutor(max_workers=self.process_workers, mp_context=get_context("spawn"))
+        try:
+            while not stop.is_set():
+                await self.fail_stale_jobs()
+                job = await self.claim()
+                if job is None:
+                    if once:
+                        break
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self.execute(job)
+                executed += 1
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+        return executed
+
+    async def claim(self) -> Optional[Job]:
+        """実行待ちのジョブを1件取得して実行中にする"""
+        next_job = select(Job.id).where(
+            Job.status == JobStatus.QUEUED.value
+        ).order_by(Job.id).limit(1).with_for_update(skip_locked=True).scalar_subquery()
+
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == next_job)
+                .values(
+                    status=JobStatus.RUNNING.value,
+                    worker_id=self.worker_id,
+                    attempts=Job.attempts + 1,
+                    started_at=func.now(),
+                    heartbeat_at=func.now(),
+                )
+                .returning(Job)
+            )
+            job = result.scalar_one_or_none()
+            await db.commit()
+        return job
+
+    async def fail_stale_jobs(self) -> int:
+        """応答の途絶えた実行中ジョブを失敗にする"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Job)
+                .where(
+                    Job.status == JobStatus.RUNNING.value,
+                    Job.heartbeat_at < func.now() - timedelta(seconds=self.stale_seconds),
+                )
+                .values(
+                    status=JobStatus.FAILED.value,
+                    error="worker stopped responding",
+                    finished_at=func.now(),
+                )
+                .returning(Job.id)
+            )
+            stale = result.scalars().all()
+            await db.commit()
+        for job_id in stale:
+            logger.warning(f"job {job_id}: worker stopped responding, marked as failed")
+        return len(stale)
+
+    async def _heartbeat(self, context: JobContext) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await context._touch()
+            except Exception as e:
+                logger.warning(f"job {context.job_id}: heartbeat failed ({e!r})")
+
+    async def _finish(self, job_id: int, status: str, error: Optional[str] = None) -> bool:
+        """実行中のジョブを終了にする（失敗にされた後なら更新せず False）"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Job)
+                .where(running_on(job_id, self.worker_id))
+                .values(status=status, error=error, finished_at=func.now(), heartbeat_at=func.now())
+            )
+            await db.commit()
+        if result.rowcount == 0:
+            logger.warning(f"job {job_id}: no longer running on {self.worker_id}, {status} not recorded")
+            return False
+        return True
+
+    async def execute(self, job: Job) -> str:
+        """ジョブ1件の実行（戻り値は終了時のステータス）"""
+        definition = self.definitions.get(job.job_type)
+        if definition is None:
+            await self._finish(job.id, JobStatus.FAILED.value, f"unknown job type: {job.job_type}")
+            return JobStatus.FAILED.value
+
+        logger.info(f"job {job.id}: {job.job_type} {job.idempotency_key} started on {self.worker_id}")
+        context = JobContext(job, self.session_factory, self.worker_id, self.executor)
+        heartbeat = asyncio.create_task(self._heartbeat(context))
+        try:
+            async with self.session_factory() as db:
+                result = await definition.run(db, context)
+                await context.progress()
+                # 処理結果とジョブの完了を同じトランザクションでコミットする
+                completed = await db.execute(
+                    update(Job)
+                    .where(running_on(job.id, self.worker_id))
+                    .values(
+                        status=JobStatus.SUCCEEDED.value,
+                        progress=100,
+                        result=result,
+                        finished_at=func.now(),
+                        heartbeat_at=func.now(),
+                    )
+                )
+                if completed.rowcount == 0:
+                    raise JobLost(f"job {job.id} is no longer running on {self.worker_id}")
+                await db.commit()
+        except JobLost:
+            # 応答途絶で失敗にされた（同じジョブが再登録されている可能性がある）ため結果は捨てる
+            logger.warning(f"job {job.id}: marked as failed while running, results rolled back")
+            return JobStatus.FAILED.value
+        except JobCancelled:
+            logger.info(f"job {job.id}: cancelled")
+            await self._finish(job.id, JobStatus.CANCELLED.value)
+            return JobStatus.CANCELLED.value
+        except Exception as e:
+            logger.exception(f"job {job.id}: {job.job_type} failed")
+            await self._finish(job.id, JobStatus.FAILED.value, repr(e))
+            return JobStatus.FAILED.value
+        finally:
+            heartbeat.cancel()
+
+        logger.info(f"job {job.id}: {job.job_type} {job.idempotency_key} succeeded")
+        if definition.invalidates:
+            await response_cache.invalidate(*definition.invalidates)
+        return JobStatus.SUCCEEDED.value
\ No newline at end of file
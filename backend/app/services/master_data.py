@@ -0,0 +1,183 @@
+"""
+IROAS BOSS System - Legacy Master Data Layout
+旧BOSSシステム会員マスタCSV（master_data.CSV）のレイアウト定義と変換
+"""
+
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+
+# 旧システムのCSVエンコーディング
+MASTER_DATA_ENCODING = "cp932"
+
+# 会員番号の桁数（振替結果CSV等と同じ0埋め7桁に揃える）
+MEMBER_CODE_WIDTH = 7
+
+JST = timezone(timedelta(hours=9))
+
+_MOBILE_PHONE = re.compile(r"^0[789]0")
+
+MASTER_DATA_COLUMNS: List[str] = [
+    "登録日", "会員番号", "ｶﾅ", "氏名", "資格", "電話番号", "携帯番号", "都道府県", "退会日", "入力日",
+    "変更日", "会員カード名義", "送付先区分", "書類送付先区分", "郵便物送付", "郵便番号", "住所2", "住所3",
+    "建物名", "FAX", "銀行名", "支店名", "口座番号", "記号", "番号", "口座種別", "当月資格", "計算資格",
+    "当月プラン", "翌月プラン", "特殊会員区分", "口座名義", "登録区分", "性別", "法人名", "法人名カナ",
+    "生年月日", "Eメール", "特別送付先郵便番号", "特別送付先住所1", "特別送付先住所2", "特別送付先住所3",
+    "特別送付先電話番号", "特別送付先携帯電話番号", "特別送付先FAX", "直上者", "直上者名", "紹介者ID",
+    "紹介者", "翌月資格", "登録ポジション数", "ユーザータイプ", "注意事項", "AS状態", "AS支払区分",
+    "AS開始日", "振替開始日", "提出日", "AS口座", "時間指定コード", "初回PW", "変更PW", "説明者ID",
+    "説明者氏名", "上位者指定ID", "指定上位者氏名", "年齢",
+]
+
+
+def normalize_member_code(value: Optional[str]) -> Optional[str]:
+    """会員番号を0埋め7桁に正規化（空・0は None、桁数の揃っていない0埋めも吸収）"""
+    value = (value or "").strip()
+    if not value.isdigit() or int(value) == 0:
+        return None
+    return str(int(value)).zfill(MEMBER_CODE_WIDTH)
+
+
+def parse_legacy_date(value: Optional[str]) -> Optional[datetime]:
+    """'2016/7/27' / '2016/7/27 11:11' 形式の日付（JST）"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    for fmt in ("%Y/%m/%d %H:%M", "%Y/%m/%d %H:%M:%S", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=JST)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value}")
+
+
+def split_name(value: str) -> Tuple[str, str]:
+    """氏名を姓・名に分割（区切りがない場合は名を '-' とする）"""
+    parts = unicodedata.normalize("NFKC", value or "").strip().split(" ", 1)
+    if len(parts) == 2 and parts[1].strip():
+        return parts[0], parts[1].strip()
+    return parts[0], "-"
+
+
+def _blank_to_none(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+
+def parse_header(header: List[str]) -> List[str]:
+    """ヘッダー行（', ' 区切りで前後に空白あり）の列名を正規化"""
+    return [name.strip() for name in header]
+
+
+def row_to_member_fields(row: Dict[str, str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    CSV1行を会員データに変換
+    戻り値: (MemberCreate で検証するフィールド, それ以外の取込用フィールド)
+    """
+    family_name, given_name = split_name(row.get("氏名", ""))
+    family_name_kana, given_name_kana = (None, None)
+    if _blank_to_none(row.get("ｶﾅ")):
+        family_name_kana, given_name_kana = split_name(row["ｶﾅ"])
+
+    account_number = _blank_to_none(row.get("口座番号"))
+    if account_number is None and _blank_to_none(row.get("記号")):
+        # ゆうちょ銀行は記号・番号
+        account_number = f"{row['記号'].strip()}-{(row.get('番号') or '').strip()}"
+
+    address_line = " ".join(
+        part for part in (_blank_to_none(row.get("住所3")), _blank_to_none(row.get("建物名"))) if part
+    ) or None
+
+    create_fields = {
+        "member_code": normalize_member_code(row.get("会員番号")),
+        "family_name": family_name,
+        "given_name": given_name,
+        "family_name_kana": family_name_kana,
+        "given_name_kana": given_name_kana,
+        "email": _blank_to_none(row.get("Eメール")),
+        "phone": _blank_to_none(row.get("携帯番号")) or _blank_to_none(row.get("電話番号")),
+        "postal_code": _blank_to_none(row.get("郵便番号")),
+        "prefecture": _blank_to_none(row.get("都道府県")),
+        "city": _blank_to_none(row.get("住所2")),
+        "address_line": address_line,
+        "bank_name": _blank_to_none(row.get("銀行名")),
+        "branch_name": _blank_to_none(row.get("支店名")),
+        "account_type": _blank_to_none(row.get("口座種別")),
+        "account_number": account_number,
+        "account_holder": _blank_to_none(row.get("口座名義")),
+    }
+
+    withdrawal_date = parse_legacy_date(row.get("退会日"))
+    extra_fields = {
+        "registration_date": parse_legacy_date(row.get("登録日")) or parse_legacy_date(row.get("入力日")),
+        "withdrawal_date": withdrawal_date,
+        "status": "withdrawn" if withdrawal_date else "active",
+        "is_active": withdrawal_date is None,
+        "notes": _blank_to_none(row.get("注意事項")),
+        "sponsor_code": normalize_member_code(row.get("紹介者ID")),
+        "upline_code": normalize_member_code(row.get("直上者")),
+    }
+    return create_fields, extra_fields
+
+
+def format_legacy_date(value: Optional[datetime], with_time: bool = False) -> str:
+    """日時 -> '2016/7/27' / '2016/7/27 11:11' 形式（JST、None は空文字）"""
+    if value is None:
+        return ""
+    if value.tzinfo is not None:
+        value = value.astimezone(JST)
+    formatted = f"{value.year}/{value.month}/{value.day}"
+    if with_time:
+        formatted += f" {value.hour:02d}:{value.minute:02d}"
+    return formatted
+
+
+def _join_name(family: Optional[str], given: Optional[str]) -> str:
+    """姓・名 -> 氏名（split_name で名がない場合の '-' は出力しない）"""
+    return " ".join(part for part in (family, given) if part and part != "-")
+
+
+def member_to_row(member: Mapping[str, Any]) -> List[str]:
+    """
+    会員データ -> CSV1行（MASTER_DATA_COLUMNS の順、row_to_member_fields の逆変換）
+    member には会員の各カラムと sponsor_code / sponsor_name / upline_code / upline_name を渡す。
+    旧システムにしかない項目（資格・プラン等）は空欄。
+    """
+    row = dict.fromkeys(MASTER_DATA_COLUMNS, "")
+
+    account_number = member["account_number"] or ""
+    if re.fullmatch(r"\d+-\d+", account_number):
+        # ゆうちょ銀行は記号・番号
+        row["記号"], row["番号"] = account_number.split("-")
+    else:
+        row["口座番号"] = account_number
+
+    phone = member["phone"] or ""
+    row["携帯番号" if _MOBILE_PHONE.match(phone) else "電話番号"] = phone
+
+    row.update({
+        "登録日": format_legacy_date(member["registration_date"]),
+        "会員番号": member["member_code"],
+        "ｶﾅ": _join_name(member["family_name_kana"], member["given_name_kana"]),
+        "氏名": _join_name(member["family_name"], member["given_name"]),
+        "都道府県": member["prefecture"] or "",
+        "退会日": format_legacy_date(member["withdrawal_date"]),
+        "入力日": format_legacy_date(member["created_at"], with_time=True),
+        "変更日": format_legacy_date(member["updated_at"], with_time=True),
+        "郵便番号": member["postal_code"] or "",
+        "住所2": member["city"] or "",
+        "住所3": member["address_line"] or "",
+        "銀行名": member["bank_name"] or "",
+        "支店名": member["branch_name"] or "",
+        "口座種別": member["account_type"] or "",
+        "口座名義": member["account_holder"] or "",
+        "Eメール": member["email"] or "",
+        "直上者": member["upline_code"] or "",
+        "直上者名": member["upline_name"] or "",
+        "紹介者ID": member["sponsor_code"] or "",
+        "紹介者": member["sponsor_name"] or "",
+        "注意事項": member["notes"] or "",
+    })
+    return list(row.values())
\ No newline at end of file
@@ -0,0 +1,316 @@
+"""
+IROAS BOSS System - Member Bulk Operations
+会員の一括登録・一括更新
+
+1件ずつ検証し、不正な行があっても残りの行は処理して行ごとの結果を返す。
+会員番号・メールの一意性と紹介者・直上者の存在はバッチ全体を1回のクエリで
+確認する。行は列ごとの配列パラメータを unnest して渡し、登録は
+INSERT ... SELECT ... ON CONFLICT DO NOTHING、更新は変更項目の組み合わせごとの
+UPDATE ... FROM で反映する。
+commit は呼び出し側で行う。
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Integer, String, any_, bindparam, case, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import unnest_table
+from app.models.genealogy import TreeType
+from app.models.member import Member, MemberStatus
+from app.schemas.member import MemberBulkItemResult, MemberBulkResult, MemberBulkUpdateItem, MemberCreate
+from app.services.dashboard_stats import record_member_status_changes, record_members_registered
+from app.services.genealogy import index_new_members, move_member, refresh_organization_levels
+
+
+RESULT_CREATED = "created"
+RESULT_UPDATED = "updated"
+RESULT_ERROR = "error"
+
+# ステータス -> 変更時に現在日時を設定する日付カラム（update_member と同じ）
+STATUS_DATE_COLUMNS = {
+    MemberStatus.ACTIVE.value: "activation_date",
+    MemberStatus.SUSPENDED.value: "suspension_date",
+    MemberStatus.WITHDRAWN.value: "withdrawal_date",
+}
+
+
+class _Results:
+    """行ごとの結果（リクエスト配列の順）"""
+
+    def __init__(self, size: int):
+        self.items: List[Optional[MemberBulkItemResult]] = [None] * size
+
+    def ok(self, index: int, status: str, member_id: int, member_code: Optional[str] = None) -> None:
+        self.items[index] = MemberBulkItemResult(index=index, status=status, id=member_id, member_code=member_code)
+
+    def fail(self, index: int, error: str, member_id: Optional[int] = None, member_code: Optional[str] = None) -> None:
+        self.items[index] = MemberBulkItemResult(
+            index=index, status=RESULT_ERROR, id=member_id, member_code=member_code, error=error
+        )
+
+    def report(self) -> MemberBulkResult:
+        failed = sum(1 for item in self.items if item.status == RESULT_ERROR)
+        return MemberBulkResult(succeeded=len(self.items) - failed, failed=failed, results=self.items)
+
+
+def _validate(
+    items: Sequence[Any],
+    schema: Type[BaseModel],
+    results: _Results,
+) -> List[Tuple[int, BaseModel]]:
+    """各行をスキーマで検証（エラーの行は results に記録して除く）"""
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            results.fail(
+                index, message,
+                member_id=item.get("id") if isinstance(item, dict) and isinstance(item.get("id"), int) else None,
+                member_code=item.get("member_code") if isinstance(item, dict) else None,
+            )
+    return valid
+
+
+async def _lookup(db: AsyncSession, column, type_, values: Iterable[Any]) -> Dict[Any, int]:
+    """column の値 -> 会員ID（存在するもののみ）を1クエリで取得"""
+    values = list(set(values))
+    if not values:
+        return {}
+    result = await db.execute(
+        select(column, Member.id).where(column == any_(bindparam("lookup_values", values, type_=ARRAY(type_))))
+    )
+    return {value: member_id for value, member_id in result.all()}
+
+
+async def _parent_levels(db: AsyncSession, data_items: Iterable[Dict[str, Any]]) -> Dict[int, int]:
+    """紹介者・直上者として指定された会員ID -> 組織レベル（存在するもののみ）"""
+    parent_ids = list({
+        data[name]
+        for data in data_items
+        for name in ("sponsor_id", "upline_id")
+        if data.get(name) is not None
+    })
+    if not parent_ids:
+        return {}
+    result = await db.execute(
+        select(Member.id, Member.organization_level)
+        .where(Member.id == any_(bindparam("parent_ids", parent_ids, type_=ARRAY(Integer))))
+    )
+    return dict(result.all())
+
+
+def _missing_parent(data: Dict[str, Any], parents: Dict[int, int]) -> Optional[str]:
+    """存在しない紹介者・直上者を指していればエラーメッセージ"""
+    if data.get("sponsor_id") is not None and data["sponsor_id"] not in parents:
+        return "Sponsor not found"
+    if data.get("upline_id") is not None and data["upline_id"] not in parents:
+        return "Upline not found"
+    return None
+
+
+async def bulk_create_members(db: AsyncSession, items: Sequence[Any]) -> MemberBulkResult:
+    """
+    会員一括登録
+    登録内容は create_member と同じ（ステータス pending、登録日時は現在）。
+    会員番号・メールが既存またはリクエスト内で重複する行（後に出現した方）、
+    存在しない紹介者・直上者を指す行はエラーとする。
+    """
+    results = _Results(len(items))
+    candidates: List[Tuple[int, Dict[str, Any]]] = []
+    seen_codes = set()
+    seen_emails = set()
+    for index, member in _validate(items, MemberCreate, results):
+        if member.member_code in seen_codes:
+            results.fail(index, "Duplicate member code in request", member_code=member.member_code)
+        elif member.email in seen_emails:
+            results.fail(index, "Duplicate email in request", member_code=member.member_code)
+        else:
+            seen_codes.add(member.member_code)
+            seen_emails.add(member.email)
+            candidates.append((index, member.dict()))
+
+    existing_codes = await _lookup(db, Member.member_code, String, (data["member_code"] for _, data in candidates))
+    existing_emails = await _lookup(db, Member.email, String, (data["email"] for _, data in candidates))
+    parents = await _parent_levels(db, (data for _, data in candidates))
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    indexes: Dict[str, int] = {}
+    for index, data in candidates:
+        member_code = data["member_code"]
+        if member_code in existing_codes:
+            results.fail(index, "Member code already exists", member_code=member_code)
+        elif data["email"] in existing_emails:
+            results.fail(index, "Email already exists", member_code=member_code)
+        elif error := _missing_parent(data, parents):
+            results.fail(index, error, member_code=member_code)
+        else:
+            indexes[member_code] = index
+            rows.append({
+                **data,
+                "registration_date": now,
+                "status": MemberStatus.PENDING.value,
+                "is_active": True,
+                # 組織レベルは紹介者の1段下（index_new_members では再計算しない）
+                "organization_level": parents[data["sponsor_id"]] + 1 if data["sponsor_id"] is not None else 1,
+                "total_sales": 0,
+                "total_rewards": 0,
+            })
+
+    created: Dict[str, int] = {}
+    if rows:
+        # 列ごとの配列を unnest して INSERT ... SELECT 1文で投入する
+        columns = Member.__table__.c
+        new_rows = unnest_table("new_rows", **{
+            name: (columns[name].type, [row[name] for row in rows]) for name in rows[0]
+        })
+        result = await db.execute(
+            insert(Member.__table__)
+            .from_select(list(rows[0]), select(*new_rows.c))
+            .on_conflict_do_nothing()
+            .returning(columns.member_code, columns.id)
+        )
+        created = dict(result.all())
+
+    new_members = []
+    for row in rows:
+        index = indexes[row["member_code"]]
+        member_id = created.get(row["member_code"])
+        if member_id is None:
+            # 確認後に他のリクエストが同じ会員番号・メールで登録した
+            results.fail(index, "Member code or email already exists", member_code=row["member_code"])
+            continue
+        results.ok(index, RESULT_CREATED, member_id, row["member_code"])
+        new_members.append((member_id, row["sponsor_id"], row["upline_id"]))
+
+    if new_members:
+        await index_new_members(db, new_members)
+        await record_members_registered(db, [(MemberStatus.PENDING.value, now)] * len(new_members))
+    return results.report()
+
+
+async def _apply_updates(db: AsyncSession, changes: List[Tuple[int, Dict[str, Any]]], now: datetime) -> None:
+    """
+    変更内容を反映（変更項目の組み合わせごとに UPDATE 1回）
+    status を含む場合は update_member と同じくステータスに応じた日付を現在日時にし、
+    withdrawn なら is_active を false にする。
+    """
+    groups: Dict[Tuple[str, ...], List[Tuple[int, Dict[str, Any]]]] = defaultdict(list)
+    for member_id, data in changes:
+        if data:
+            groups[tuple(sorted(data))].append((member_id, data))
+
+    columns = Member.__table__.c
+    for fields, group in groups.items():
+        rows = unnest_table(
+            "changes",
+            member_id=(Integer, [member_id for member_id, _ in group]),
+            **{name: (columns[name].type, [data[name] for _, data in group]) for name in fields},
+        )
+        values = {name: rows.c[name] for name in fields}
+        if "status" in fields:
+            for status, date_column in STATUS_DATE_COLUMNS.items():
+                values[date_column] = case((rows.c.status == status, now), else_=getattr(Member, date_column))
+            values["is_active"] = case(
+                (rows.c.status == MemberStatus.WITHDRAWN.value, False), else_=Member.is_active
+            )
+        await db.execute(
+            update(Member)
+            .where(Member.id == rows.c.member_id)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def bulk_update_members(db: AsyncSession, items: Sequence[Any]) -> MemberBulkResult:
+    """
+    会員一括更新
+    各行は id と更新する項目のみを含める（update_member と同じく指定した項目だけ更新）。
+    紹介者・直上者の変更は会員ツリーのインデックスも移動する（自分のダウンライン配下への
+    移動はエラー）。
+    """
+    results = _Results(len(items))
+    columns = Member.__table__.c
+    requested: List[Tuple[int, int, Dict[str, Any]]] = []
+    seen_ids = set()
+    for index, item in _validate(items, MemberBulkUpdateItem, results):
+        data = item.dict(exclude_unset=True)
+        member_id = data.pop("id")
+        not_null = sorted(name for name, value in data.items() if value is None and not columns[name].nullable)
+        if member_id in seen_ids:
+            results.fail(index, "Duplicate id in request", member_id=member_id)
+        elif not_null:
+            results.fail(index, f"{', '.join(not_null)}: may not be null", member_id=member_id)
+        else:
+            seen_ids.add(member_id)
+            requested.append((index, member_id, data))
+
+    current = {
+        row.id: row
+        for row in (await db.execute(
+            select(Member.id, Member.member_code, Member.status, Member.sponsor_id, Member.upline_id)
+            .where(Member.id == any_(bindparam("member_ids", list(seen_ids), type_=ARRAY(Integer))))
+        )).all()
+    } if seen_ids else {}
+    email_owners = await _lookup(db, Member.email, String, (
+        data["email"] for _, _, data in requested if data.get("email") is not None
+    ))
+    parents = await _parent_levels(db, (data for _, _, data in requested))
+
+    accepted: List[Tuple[int, int, Dict[str, Any]]] = []
+    seen_emails = set()
+    for index, member_id, data in requested:
+        member = current.get(member_id)
+        email = data.get("email")
+        if member is None:
+            results.fail(index, "Member not found", member_id=member_id)
+        elif email is not None and (email in seen_emails or email_owners.get(email, member_id) != member_id):
+            results.fail(index, "Email already exists", member_id=member_id, member_code=member.member_code)
+        elif error := _missing_parent(data, parents):
+            results.fail(index, error, member_id=member_id, member_code=member.member_code)
+        else:
+            if email is not None:
+                seen_emails.add(email)
+            accepted.append((index, member_id, data))
+
+    # 紹介者・直上者の変更（まれなため1件ずつ。失敗した行はセーブポイントで取り消す）
+    changes: List[Tuple[int, Dict[str, Any]]] = []
+    sponsor_moved = []
+    for index, member_id, data in accepted:
+        member = current[member_id]
+        changed_parents = {
+            name: data[name]
+            for name in ("sponsor_id", "upline_id")
+            if name in data and data[name] != getattr(member, name)
+        }
+        if changed_parents:
+            try:
+                async with db.begin_nested():
+                    if "sponsor_id" in changed_parents:
+                        await move_member(db, TreeType.SPONSOR.value, member_id, changed_parents["sponsor_id"])
+                    if "upline_id" in changed_parents:
+                        await move_member(db, TreeType.UPLINE.value, member_id, changed_parents["upline_id"])
+            except ValueError as e:
+                results.fail(index, str(e), member_id=member_id, member_code=member.member_code)
+                continue
+            if "sponsor_id" in changed_parents:
+                sponsor_moved.append(member_id)
+        changes.append((member_id, data))
+        results.ok(index, RESULT_UPDATED, member_id, member.member_code)
+
+    await _apply_updates(db, changes, datetime.now(timezone.utc))
+    if sponsor_moved:
+        await refresh_organization_levels(db, member_ids=sponsor_moved)
+    await record_member_status_changes(db, [
+        (current[member_id].status, data["status"]) for member_id, data in changes if "status" in data
+    ])
+    return results.report()
\ No newline at end of file
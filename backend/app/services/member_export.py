@@ -0,0 +1,138 @@
+"""
+IROAS BOSS System - Member Export
+会員一覧のエクスポート（旧システム master_data.CSV と同じ列構成の CSV / Excel）
+
+会員をサーバーサイドカーソルで一定件数ずつ読み、その分だけ変換して出力する
+（会員数によらずメモリ使用量は一定）。CSV は cp932 で逐次返す。Excel は
+openpyxl の write-only ブック（行は一時ファイルに書き出される）に追記し、
+最後に一時ファイルへ保存してから分割して返す。
+"""
+
+import asyncio
+import csv
+import io
+import tempfile
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.metrics import tracked_job
+from app.models.member import Member
+from app.services.master_data import MASTER_DATA_COLUMNS, MASTER_DATA_ENCODING, member_to_row
+from app.services.member_search import member_filters
+
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_XLSX = "xlsx"
+
+EXPORT_MEDIA_TYPES = {
+    EXPORT_FORMAT_CSV: "text/csv; charset=Shift_JIS",
+    EXPORT_FORMAT_XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+STREAM_PARTITION_SIZE = 5000
+
+# Excel 保存後の一時ファイルを返す単位
+XLSX_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def _full_name(member):
+    """氏名（名が '-' の場合は姓のみ）"""
+    return func.concat_ws(" ", member.family_name, func.nullif(member.given_name, "-"))
+
+
+def export_query(query: Optional[str] = None, status: Optional[str] = None):
+    """エクスポート対象（会員一覧と同じ絞り込み、登録日順）"""
+    sponsor = aliased(Member)
+    upline = aliased(Member)
+    return select(
+        Member.member_code,
+        Member.family_name,
+        Member.given_name,
+        Member.family_name_kana,
+        Member.given_name_kana,
+        Member.email,
+        Member.phone,
+        Member.postal_code,
+        Member.prefecture,
+        Member.city,
+        Member.address_line,
+        Member.bank_name,
+        Member.branch_name,
+        Member.account_type,
+        Member.account_number,
+        Member.account_holder,
+        Member.registration_date,
+        Member.withdrawal_date,
+        Member.created_at,
+        Member.updated_at,
+        Member.notes,
+        sponsor.member_code.label("sponsor_code"),
+        _full_name(sponsor).label("sponsor_name"),
+        upline.member_code.label("upline_code"),
+        _full_name(upline).label("upline_name"),
+    ).outerjoin(
+        sponsor, sponsor.id == Member.sponsor_id
+    ).outerjoin(
+        upline, upline.id == Member.upline_id
+    ).where(
+        *member_filters(query, status)
+    ).order_by(Member.registration_date, Member.id)
+
+
+async def _row_batches(db: AsyncSession, query: Optional[str], status: Optional[str]) -> AsyncIterator[List[List[str]]]:
+    """CSV行をサーバーサイドカーソルのパーティション単位で返す"""
+    statement = export_query(query, status).execution_options(yield_per=STREAM_PARTITION_SIZE)
+    result = await db.stream(statement)
+    async for partition in result.partitions(STREAM_PARTITION_SIZE):
+        yield [member_to_row(row._mapping) for row in partition]
+
+
+@tracked_job("member_export_csv")
+async def stream_csv(
+    db: AsyncSession,
+    query: Optional[str] = None,
+    status: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    """cp932 CSV（ヘッダーは旧システムと同じ ', ' 区切り）"""
+    yield (", ".join(MASTER_DATA_COLUMNS) + "\r\n").encode(MASTER_DATA_ENCODING)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    async for rows in _row_batches(db, query, status):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode(MASTER_DATA_ENCODING, errors="replace")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _append_rows(sheet, rows: List[List[str]]) -> None:
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    for row in rows:
+        # 空欄は None（セル自体を出力しない）。Excel に書けない制御文字（備考欄など）は除く
+        sheet.append([ILLEGAL_CHARACTERS_RE.sub("", value) if value else None for value in row])
+
+
+@tracked_job("member_export_xlsx")
+async def stream_xlsx(
+    db: AsyncSession,
+    query: Optional[str] = None,
+    status: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    """Excel（1シート、1行目は列名）。ブックの組み立てと保存はスレッドで行う"""
+    # openpyxl（numpy を含む）は読み込みに時間がかかるため、初回の出力時に読み込む
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("members")
+    sheet.append(MASTER_DATA_COLUMNS)
+    async for rows in _row_batches(db, query, status):
+        await asyncio.to_thread(_append_rows, sheet, rows)
+
+    with tempfile.TemporaryFile() as f:
+        await asyncio.to_thread(workbook.save, f)
+        f.seek(0)
+        while chunk := await asyncio.to_thread(f.read, XLSX_READ_CHUNK_SIZE):
+            yield chunk
\ No newline at end of file
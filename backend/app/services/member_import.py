@@ -0,0 +1,295 @@
+"""
+IROAS BOSS System - Member Import
+旧システム会員マスタCSVの一括取込
+
+CSVをcp932でストリーミングしながらバッチ単位で MemberCreate 検証し、
+複数行 INSERT ... ON CONFLICT DO NOTHING で投入する。バッチごとにcommitと
+チェックポイント保存を行うため、中断しても続きから再開できる。
+"""
+
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from pydantic import ValidationError
+from sqlalchemy import String, column, or_, select, text, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.metrics import tracked_job
+from app.models.genealogy import TreeType
+from app.models.member import Member
+from app.schemas.member import MemberCreate
+from app.services.dashboard_stats import rebuild_monthly_stats
+from app.services.genealogy import rebuild_genealogy
+from app.services.master_data import (
+    MASTER_DATA_ENCODING,
+    parse_header,
+    row_to_member_fields,
+)
+
+
+# 1行あたり約20パラメータ。asyncpg のパラメータ上限（32767）に収まるサイズ
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass
+class ImportReport:
+    """取込結果レポート"""
+    source: str
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_skipped: int = 0      # 既存（会員番号・メール重複）
+    rows_failed: int = 0       # 検証エラー
+    rows_resumed: int = 0      # チェックポイントにより読み飛ばした行
+    parents_linked: int = 0
+    elapsed_seconds: float = 0.0
+    error_report_path: Optional[str] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return (self.rows_read - self.rows_resumed) / self.elapsed_seconds
+
+
+def _read_rows(path: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """CSVを1行ずつ読み込む（行番号はヘッダーを1行目とする）"""
+    with open(path, encoding=MASTER_DATA_ENCODING, newline="") as f:
+        reader = csv.reader(f)
+        header = parse_header(next(reader))
+        for line_number, values_ in enumerate(reader, start=2):
+            yield line_number, dict(zip(header, values_))
+
+
+def _load_checkpoint(checkpoint_path: Optional[str], source: str) -> int:
+    """処理済み行数を取得"""
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("source") != os.path.abspath(source):
+        return 0
+    return int(checkpoint.get("rows_done", 0))
+
+
+def _save_checkpoint(checkpoint_path: Optional[str], source: str, rows_done: int) -> None:
+    if not checkpoint_path:
+        return
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"source": os.path.abspath(source), "rows_done": rows_done}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _validate_batch(
+    batch: List[Tuple[int, Dict[str, str]]],
+) -> Tuple[List[Dict[str, Any]], List[Tuple[int, Optional[str], str]]]:
+    """バッチ内の行を検証し、INSERT用データとエラー一覧に振り分ける"""
+    valid: List[Dict[str, Any]] = []
+    errors: List[Tuple[int, Optional[str], str]] = []
+    for line_number, row in batch:
+        member_code = row.get("会員番号")
+        try:
+            create_fields, extra_fields = row_to_member_fields(row)
+            member_data = MemberCreate(**create_fields)
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            errors.append((line_number, member_code, message))
+            continue
+        except ValueError as e:
+            errors.append((line_number, member_code, str(e)))
+            continue
+
+        extra_fields.pop("sponsor_code")
+        extra_fields.pop("upline_code")
+        valid.append({
+            **member_data.dict(exclude={"sponsor_id", "upline_id"}),
+            **extra_fields,
+            "registration_date": extra_fields["registration_date"] or datetime.utcnow(),
+            "organization_level": 1,
+            "total_sales": 0,
+            "total_rewards": 0,
+            "_line_number": line_number,
+        })
+    return valid, errors
+
+
+async def _insert_batch(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """複数行INSERT（重複は無視）。挿入されなかった行を返す"""
+    if not rows:
+        return []
+    # バッチ内で同じ会員番号が重複する場合は最初の行だけを投入し、以降の行は既存扱い
+    # （ON CONFLICT で捨てられても RETURNING からは区別できないため、投入前に除く）
+    line_numbers: Dict[str, int] = {}
+    duplicates: List[Dict[str, Any]] = []
+    unique_rows: List[Dict[str, Any]] = []
+    for row in rows:
+        line_number = row.pop("_line_number")
+        if row["member_code"] in line_numbers:
+            duplicates.append({"line_number": line_number, "member_code": row["member_code"]})
+            continue
+        line_numbers[row["member_code"]] = line_number
+        unique_rows.append(row)
+    rows = unique_rows
+    # ORMのバルク経路を通さず、テーブルに対して executemany（insertmanyvalues）で投入する。
+    # 文のコンパイル結果はキャッシュされ、RETURNING は複数行 VALUES ごとにまとめて返る。
+    members = Member.__table__
+    result = await db.execute(
+        insert(members).on_conflict_do_nothing().returning(members.c.member_code),
+        rows,
+    )
+    inserted = set(result.scalars().all())
+    skipped = [
+        {"line_number": line_numbers[row["member_code"]], "member_code": row["member_code"]}
+        for row in rows if row["member_code"] not in inserted
+    ]
+    return sorted(skipped + duplicates, key=lambda row: row["line_number"])
+
+
+def _parse_parent_codes(row: Dict[str, str]) -> Optional[Dict[str, Optional[str]]]:
+    """会員番号・紹介者・直上者の会員番号（変換エラーの行は None）"""
+    try:
+        create_fields, extra_fields = row_to_member_fields(row)
+    except ValueError:
+        return None
+    return {
+        "member_code": create_fields["member_code"],
+        "sponsor_code": extra_fields["sponsor_code"],
+        "upline_code": extra_fields["upline_code"],
+    }
+
+
+async def _link_parents(db: AsyncSession, path: str, batch_size: int) -> int:
+    """
+    紹介者・直上者の会員番号を sponsor_id / upline_id に解決
+    全会員の投入後に2パス目として実行する（未設定の行のみ更新）。
+    取込対象外の会員番号を指す場合は親なしのまま残す。
+    """
+    linked = 0
+    rows = (row for _, row in _read_rows(path))
+    while True:
+        batch = []
+        for row in islice(rows, batch_size):
+            link = _parse_parent_codes(row)
+            if link and (link["sponsor_code"] or link["upline_code"]):
+                batch.append(link)
+        if not batch:
+            break
+
+        links = values(
+            column("member_code", String),
+            column("sponsor_code", String),
+            column("upline_code", String),
+            name="links",
+        ).data([(link["member_code"], link["sponsor_code"], link["upline_code"]) for link in batch])
+
+        sponsor = aliased(Member)
+        upline = aliased(Member)
+        resolved = select(
+            links.c.member_code,
+            sponsor.id.label("sponsor_id"),
+            upline.id.label("upline_id"),
+        ).outerjoin(
+            sponsor, sponsor.member_code == links.c.sponsor_code
+        ).outerjoin(
+            upline, upline.member_code == links.c.upline_code
+        ).where(
+            or_(sponsor.id.is_not(None), upline.id.is_not(None))
+        ).subquery()
+
+        result = await db.execute(
+            update(Member)
+            .where(Member.member_code == resolved.c.member_code)
+            .where(Member.sponsor_id.is_(None), Member.upline_id.is_(None))
+            .values(sponsor_id=resolved.c.sponsor_id, upline_id=resolved.c.upline_id)
+            .execution_options(synchronize_session=False)
+        )
+        linked += result.rowcount
+    return linked
+
+
+@tracked_job("member_import", items=lambda report: report.rows_read)
+async def import_master_data(
+    db: AsyncSession,
+    path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    checkpoint_path: Optional[str] = None,
+    error_report_path: Optional[str] = None,
+    resume: bool = True,
+) -> ImportReport:
+    """
+    会員マスタCSVの一括取込
+    バッチごとにcommitする。取込後に紹介者・直上者を解決し、
+    会員ツリーのインデックスとダッシュボードの月次集計を再構築する。
+    """
+    started = time.perf_counter()
+    report = ImportReport(source=path, error_report_path=error_report_path)
+    rows_done = _load_checkpoint(checkpoint_path, path) if resume else 0
+
+    error_file = None
+    error_writer = None
+    if error_report_path:
+        error_file = open(error_report_path, "a" if rows_done else "w", encoding="utf-8-sig", newline="")
+        error_writer = csv.writer(error_file)
+        if not rows_done:
+            error_writer.writerow(["行番号", "会員番号", "エラー"])
+
+    try:
+        rows = _read_rows(path)
+        if rows_done:
+            report.rows_resumed = sum(1 for _ in islice(rows, rows_done))
+            report.rows_read = report.rows_resumed
+
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            valid, errors = _validate_batch(batch)
+            skipped = await _insert_batch(db, valid)
+            await db.commit()
+
+            rows_done += len(batch)
+            _save_checkpoint(checkpoint_path, path, rows_done)
+
+            report.rows_read += len(batch)
+            report.rows_failed += len(errors)
+            report.rows_skipped += len(skipped)
+            report.rows_imported += len(valid) - len(skipped)
+            if error_writer:
+                error_writer.writerows(errors)
+                error_writer.writerows(
+                    (row["line_number"], row["member_code"], "member_code or email already exists")
+                    for row in skipped
+                )
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"master_data import: {report.rows_read:,} rows read, "
+                f"{report.rows_imported:,} imported ({(report.rows_read - report.rows_resumed) / elapsed:,.0f} rows/s)"
+            )
+    finally:
+        if error_file:
+            error_file.close()
+
+    # 大量投入直後は統計情報が古く、会員番号での結合が全件走査になりやすい
+    await db.execute(text("ANALYZE members"))
+    report.parents_linked = await _link_parents(db, path, batch_size)
+    for tree_type in TreeType:
+        await rebuild_genealogy(db, tree_type.value)
+    # 登録月が過去に散らばるため、差分ではなく月次集計を再構築する
+    await rebuild_monthly_stats(db)
+    await db.commit()
+
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
\ No newline at end of file
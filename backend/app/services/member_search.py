@@ -0,0 +1,273 @@
+"""
+IROAS BOSS System - Member Search
+会員検索（pg_trgm による部分一致 + 関連度順）・会員一覧のページング
+
+検索対象は members.search_text（会員番号・氏名・カナ・メール・電話番号を
+正規化して連結した生成列）。検索語も同じ正規化をかけてから空白で分割し、
+すべての語を含む会員を GIN トライグラム索引で引く。トライグラムが作れない
+2文字以下の語（「田中」など）は氏名・カナの完全一致（btree_gin 索引）で引く。
+
+一覧は (登録日, 会員ID) の降順で、OFFSET に加えてキーセット（カーソル）で
+ページングできる。件数は exact / estimated（実行計画の推定行数）/
+cached（レスポンスキャッシュに保存した件数）/ none から選ぶ。
+fields を指定すると ORM エンティティではなく指定列だけを SELECT し、
+行（タプル）から直接 dict を作る（一覧グリッドのように表示列が少ない場合用）。
+エンティティで返す場合、リレーション（スポンサーなど）は呼び出し側が options で
+ローダーを指定する（Member のリレーションは遅延ロード不可）。
+"""
+
+import json
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import and_, case, func, literal, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import CACHE_TAG_MEMBERS, response_cache
+from app.core.config import settings
+from app.models.member import Member
+
+
+# pg_trgm の索引が効く最短の検索語
+MIN_TRIGRAM_TERM_LENGTH = 3
+
+# 検索語の上限（これ以上は無視する）
+MAX_SEARCH_TERMS = 5
+
+# 件数の求め方
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+COUNT_CACHED = "cached"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATED, COUNT_CACHED, COUNT_NONE)
+
+# 一覧で列を絞って返せる項目（schemas.member.MemberSummary のキー）
+# 口座情報・住所・備考は会員詳細でのみ返す
+LIST_FIELDS = (
+    "id", "member_code", "family_name", "given_name", "family_name_kana", "given_name_kana",
+    "email", "phone", "status", "is_active", "organization_level", "binary_position",
+    "registration_date", "activation_date", "suspension_date", "withdrawal_date",
+    "total_sales", "total_rewards", "created_at", "updated_at",
+)
+
+# view=summary の列（会員管理ページの一覧グリッドに表示する項目）
+SUMMARY_FIELDS = (
+    "id", "member_code", "family_name", "given_name", "family_name_kana", "given_name_kana",
+    "email", "phone", "status", "registration_date", "total_sales", "total_rewards",
+)
+
+_HIRAGANA_TO_KATAKANA = str.maketrans({chr(code): chr(code + 0x60) for code in range(0x3041, 0x3097)})
+_PHONE_LIKE = re.compile(r"^[0-9-]+$")
+
+
+def normalize_search_text(value: Optional[str]) -> str:
+    """
+    検索用の正規化（models.member.SEARCH_TEXT_EXPRESSION と同じ）
+    NFKC（半角カナ -> 全角、全角英数 -> 半角）、ひらがな -> カタカナ、小文字化。
+    """
+    if not value:
+        return ""
+    return unicodedata.normalize("NFKC", value).translate(_HIRAGANA_TO_KATAKANA).lower()
+
+
+def search_terms(query: Optional[str]) -> List[Tuple[str, str]]:
+    """検索文字列 -> (正規化済みの語, 入力どおりの語) のリスト"""
+    terms = []
+    seen = set()
+    for raw in (query or "").replace("　", " ").split():
+        term = normalize_search_text(raw)
+        if _PHONE_LIKE.match(term):
+            term = term.replace("-", "")
+        if term and term not in seen:
+            seen.add(term)
+            terms.append((term, raw))
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _term_condition(term: str, raw: str):
+    """検索語1つの条件"""
+    if len(term) >= MIN_TRIGRAM_TERM_LENGTH:
+        return Member.search_text.like(f"%{_escape_like(term)}%", escape="\\")
+
+    candidates = sorted({term, raw, unicodedata.normalize("NFKC", raw)})
+    return or_(*[
+        column == candidate
+        for column in (Member.family_name, Member.given_name, Member.family_name_kana, Member.given_name_kana)
+        for candidate in candidates
+    ])
+
+
+def search_condition(query: Optional[str]):
+    """検索文字列 -> WHERE 条件（検索語がない場合は None）"""
+    terms = search_terms(query)
+    if not terms:
+        return None
+    return and_(*[_term_condition(term, raw) for term, raw in terms])
+
+
+def search_rank(query: Optional[str]):
+    """
+    関連度（大きいほど上位）
+    会員番号の完全一致 > 氏名の完全一致 > 検索語と search_text の word_similarity。
+    """
+    terms = search_terms(query)
+    if not terms:
+        return literal(0)
+    joined = "".join(term for term, _ in terms)
+    return (
+        case((Member.member_code == joined, 2), else_=0)
+        + case((func.lower(Member.family_name + Member.given_name) == joined, 1), else_=0)
+        + func.word_similarity(" ".join(term for term, _ in terms), Member.search_text)
+    )
+
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    fields パラメータ（カンマ区切り）-> 列名のタプル（未指定なら None）
+    id は常に先頭に含める。LIST_FIELDS にない列名は ValueError。
+    """
+    if value is None:
+        return None
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(LIST_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id", *names]))
+
+
+@dataclass
+class MemberPage:
+    """会員一覧の1ページ（fields 指定時の members は列名 -> 値の dict）"""
+    members: List[Union[Member, Dict[str, Any]]]
+    total: Optional[int]
+    total_estimated: bool = False
+    next_after: Optional[Tuple[datetime, int]] = None  # 次ページのキーセット（登録日, 会員ID）
+
+
+def parse_after(values: Optional[Sequence[Any]]) -> Optional[Tuple[datetime, int]]:
+    """カーソルの値 -> キーセット（不正な値は ValueError）"""
+    if values is None:
+        return None
+    registration_date, member_id = values
+    return datetime.fromisoformat(registration_date), int(member_id)
+
+
+def member_filters(query: Optional[str], status: Optional[str]) -> list:
+    """一覧・エクスポート共通の絞り込み条件"""
+    conditions = []
+    if status:
+        conditions.append(Member.status == status)
+    condition = search_condition(query)
+    if condition is not None:
+        conditions.append(condition)
+    return conditions
+
+
+async def _exact_count(db: AsyncSession, conditions: list) -> int:
+    return (await db.execute(select(func.count()).select_from(Member).where(*conditions))).scalar()
+
+
+async def _estimated_count(db: AsyncSession, conditions: list) -> int:
+    """
+    実行計画の推定行数（テーブル統計から求めるため走査しない）
+    検索語は SQL に埋め込まず、接続のドライバーのパラメーターとして渡す。
+    """
+    conn = await db.connection()
+    compiled = select(Member.id).where(*conditions).compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _cached_count(db: AsyncSession, query: Optional[str], status: Optional[str], conditions: list) -> int:
+    """
+    正確な件数をレスポンスキャッシュに保存して再利用
+    会員の登録・更新時の members タグ無効化で破棄される。
+    """
+    key = response_cache.key("members.count", {"search": query, "status": status})
+    body, versions, use_redis = await response_cache.lookup(key, [CACHE_TAG_MEMBERS])
+    if body is not None:
+        return int(body)
+    total = await _exact_count(db, conditions)
+    await response_cache.store(key, versions, str(total).encode(), settings.MEMBER_COUNT_CACHE_TTL, use_redis)
+    return total
+
+
+async def search_members(
+    db: AsyncSession,
+    query: Optional[str] = None,
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None,
+    count: str = COUNT_EXACT,
+    fields: Optional[Sequence[str]] = None,
+    options: Sequence[Any] = (),
+) -> MemberPage:
+    """
+    会員一覧・検索
+    after（キーセット）指定時は skip を無視し、その会員より後ろのページを返す。
+    キーセットは並び順が (登録日, 会員ID) の一覧のみで、検索時（関連度順）は使えない。
+    count=exact の件数は別の count(*) で求める（ページ取得は索引順の LIMIT のまま）。
+    fields（LIST_FIELDS の列名）指定時は該当列だけを取得し、members を dict で返す。
+    options はエンティティ取得時のローダー（selectinload(Member.sponsor) など）。
+    """
+    conditions = member_filters(query, status)
+    searching = search_condition(query) is not None
+    if after is not None and searching:
+        raise ValueError("cursor pagination is not supported with search")
+
+    order_by = [Member.registration_date.desc(), Member.id.desc()]
+    if searching:
+        order_by.insert(0, search_rank(query).desc())
+
+    if fields is None:
+        names = None
+        columns = [Member]
+    else:
+        # 指定列の後ろにキーセット用の列を足す（重複は除く）
+        names = list(dict.fromkeys([*fields, "registration_date", "id"]))
+        columns = [getattr(Member, name) for name in names]
+
+    statement = select(*columns).where(*conditions).order_by(*order_by).limit(limit + 1)
+    if names is None and options:
+        statement = statement.options(*options)
+    if after is not None:
+        statement = statement.where(tuple_(Member.registration_date, Member.id) < tuple_(*after))
+    else:
+        statement = statement.offset(skip)
+    rows = (await db.execute(statement)).all()
+
+    next_after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if not searching:
+            next_after = (rows[-1].registration_date, rows[-1].id) if names else (
+                rows[-1].Member.registration_date, rows[-1].Member.id
+            )
+
+    if names is None:
+        members = [row.Member for row in rows]
+    else:
+        width = len(fields)
+        members = [dict(zip(fields, row[:width])) for row in rows]
+    page = MemberPage(members=members, total=None, next_after=next_after)
+    if count == COUNT_EXACT:
+        page.total = await _exact_count(db, conditions)
+    elif count == COUNT_ESTIMATED:
+        page.total = await _estimated_count(db, conditions)
+        page.total_estimated = True
+    elif count == COUNT_CACHED:
+        page.total = await _cached_count(db, query, status, conditions)
+    return page
\ No newline at end of file
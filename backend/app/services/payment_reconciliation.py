@@ -0,0 +1,297 @@
+"""
+IROAS BOSS System - Payment Reconciliation
+決済結果ファイルの一括消込
+
+結果ファイルを1行ずつ読みながらチャンク単位で処理する。チャンクごとに
+会員番号・金額から未処理の決済を1回の集合演算で引き当て、PaymentResult の
+一括INSERTと Payment.status の一括UPDATEを行う。チャンクの行は列ごとの配列
+パラメータとして渡し、unnest で展開する（文はチャンクサイズによらず一定）。commit は呼び出し側で行い、
+ファイル全体を1トランザクションで反映する。
+"""
+
+import csv
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import DateTime, Integer, Numeric, String, and_, func, insert, literal, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import unnest_table
+from app.core.metrics import tracked_job
+from app.models.member import Member
+from app.models.payment import Payment, PaymentMethod, PaymentResult, PaymentStatus
+from app.services.dashboard_stats import record_payments_settled
+from app.services.master_data import normalize_member_code, parse_legacy_date
+
+
+RESULT_FILE_ENCODING = "cp932"
+
+RECONCILE_CHUNK_SIZE = 5000
+
+# サマリーに保持する未消込行の件数上限
+UNMATCHED_SAMPLE_SIZE = 100
+
+RESULT_SUCCESS = "success"
+RESULT_FAILURE = "failure"
+
+
+@dataclass
+class ResultLine:
+    """結果ファイル1行（ファイル形式に依存しない形）"""
+    line_number: int
+    member_code: Optional[str]
+    amount: Optional[Decimal]
+    succeeded: bool
+    processed_at: Optional[datetime] = None
+    external_transaction_id: Optional[str] = None
+    error_code: Optional[str] = None
+    error_message: Optional[str] = None
+
+
+@dataclass
+class ReconciliationSummary:
+    """消込結果サマリー"""
+    source: str
+    lines: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    unmatched: int = 0
+    succeeded_amount: Decimal = Decimal(0)
+    failed_amount: Decimal = Decimal(0)
+    unmatched_lines: List[Tuple[int, Optional[str], str]] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def add_unmatched(self, line: ResultLine, reason: str) -> None:
+        self.unmatched += 1
+        if len(self.unmatched_lines) < UNMATCHED_SAMPLE_SIZE:
+            self.unmatched_lines.append((line.line_number, line.member_code, reason))
+
+
+def parse_amount(value: Optional[str]) -> Optional[Decimal]:
+    """金額列（カンマ区切り可、不正値は None）"""
+    try:
+        return Decimal((value or "").replace(",", "").strip())
+    except InvalidOperation:
+        return None
+
+
+def parse_transfer_result_file(path: str) -> Iterator[ResultLine]:
+    """
+    口座振替結果CSV（105024_TrnsCSV_*.csv）の読み込み
+    列: 振替データNo, 振替月, 口座データNo, 会員番号, 銀行コード, 銀行名, 支店コード,
+        預金種別, 口座番号, 口座名義, 振替金額, 状態, 結果, エラー
+    """
+    with open(path, encoding=RESULT_FILE_ENCODING, newline="") as f:
+        reader = csv.DictReader(f)
+        for line_number, row in enumerate(reader, start=2):
+            error = (row.get("エラー") or "").strip()
+            yield ResultLine(
+                line_number=line_number,
+                member_code=normalize_member_code(row.get("会員番号")),
+                amount=parse_amount(row.get("振替金額")),
+                succeeded=(row.get("結果") or "").strip() == "振替成功",
+                processed_at=parse_legacy_date(row.get("振替月")),
+                external_transaction_id=(row.get("振替データNo") or "").strip() or None,
+                error_message=None if error in ("", "エラーなし") else error,
+            )
+
+
+async def _match_payments(
+    db: AsyncSession,
+    lines: List[ResultLine],
+    payment_method: Optional[str],
+) -> Dict[int, int]:
+    """
+    結果行 -> 未処理の決済ID を1クエリで引き当てる
+    同一会員・同一金額の結果行（行番号順）と処理中決済（支払期限, ID順）にそれぞれ
+    順位を付け、同じ順位どうしを対応させる（同じ決済を複数行に引き当てない）。
+    """
+    results = unnest_table(
+        "results",
+        line_number=(Integer, [line.line_number for line in lines]),
+        member_code=(String, [line.member_code for line in lines]),
+        amount=(Numeric, [line.amount for line in lines]),
+    )
+
+    ranked_lines = select(
+        results.c.line_number,
+        Member.id.label("member_id"),
+        results.c.amount,
+        func.row_number().over(
+            partition_by=(Member.id, results.c.amount),
+            order_by=results.c.line_number,
+        ).label("rank"),
+    ).join(
+        Member, Member.member_code == results.c.member_code
+    ).subquery("ranked_lines")
+
+    pending = select(
+        Payment.id,
+        Payment.member_id,
+        Payment.amount,
+        func.row_number().over(
+            partition_by=(Payment.member_id, Payment.amount),
+            order_by=(Payment.due_date.asc().nulls_last(), Payment.id),
+        ).label("rank"),
+    ).where(
+        Payment.status == PaymentStatus.PENDING.value,
+        tuple_(Payment.member_id, Payment.amount).in_(
+            select(ranked_lines.c.member_id, ranked_lines.c.amount)
+        ),
+    )
+    if payment_method:
+        pending = pending.where(Payment.payment_method == payment_method)
+    ranked_payments = pending.subquery("ranked_payments")
+
+    query = select(
+        ranked_lines.c.line_number,
+        ranked_payments.c.id,
+    ).join(
+        ranked_payments,
+        and_(
+            ranked_payments.c.member_id == ranked_lines.c.member_id,
+            ranked_payments.c.amount == ranked_lines.c.amount,
+            ranked_payments.c.rank == ranked_lines.c.rank,
+        ),
+    )
+
+    result = await db.execute(query)
+    return dict(result.all())
+
+
+async def _apply_chunk(
+    db: AsyncSession,
+    lines: List[ResultLine],
+    summary: ReconciliationSummary,
+    process_type: str,
+    payment_method: Optional[str],
+    processed_at: datetime,
+) -> None:
+    """チャンク単位の消込"""
+    candidates = []
+    for line in lines:
+        if line.member_code is None or line.amount is None:
+            summary.add_unmatched(line, "invalid member code or amount")
+        else:
+            candidates.append(line)
+    if not candidates:
+        return
+
+    matches = await _match_payments(db, candidates, payment_method)
+
+    settled: List[Tuple[ResultLine, int]] = []
+    for line in candidates:
+        payment_id = matches.get(line.line_number)
+        if payment_id is None:
+            summary.add_unmatched(line, "no pending payment for member and amount")
+            continue
+        settled.append((line, payment_id))
+        if line.succeeded:
+            summary.succeeded += 1
+            summary.succeeded_amount += line.amount
+        else:
+            summary.failed += 1
+            summary.failed_amount += line.amount
+
+    if not settled:
+        return
+
+    changes = unnest_table(
+        "changes",
+        payment_id=(Integer, [payment_id for _, payment_id in settled]),
+        payment_status=(String, [
+            PaymentStatus.COMPLETED.value if line.succeeded else PaymentStatus.FAILED.value
+            for line, _ in settled
+        ]),
+        result_status=(String, [RESULT_SUCCESS if line.succeeded else RESULT_FAILURE for line, _ in settled]),
+        processed_at=(DateTime(timezone=True), [line.processed_at or processed_at for line, _ in settled]),
+        amount=(Numeric, [line.amount for line, _ in settled]),
+        external_transaction_id=(String, [line.external_transaction_id for line, _ in settled]),
+        error_code=(String, [line.error_code for line, _ in settled]),
+        error_message=(String, [line.error_message for line, _ in settled]),
+    )
+
+    await db.execute(insert(PaymentResult).from_select(
+        [
+            "payment_id", "process_date", "process_type", "result_status", "result_amount",
+            "csv_exported", "csv_filename", "external_transaction_id", "notes",
+        ],
+        select(
+            changes.c.payment_id,
+            changes.c.processed_at,
+            literal(process_type),
+            changes.c.result_status,
+            changes.c.amount,
+            literal(False),
+            literal(os.path.basename(summary.source)),
+            changes.c.external_transaction_id,
+            changes.c.error_message,
+        ),
+    ))
+    await db.execute(
+        update(Payment)
+        .where(Payment.id == changes.c.payment_id)
+        .values(
+            status=changes.c.payment_status,
+            payment_date=changes.c.processed_at,
+            error_code=changes.c.error_code,
+            error_message=changes.c.error_message,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await record_payments_settled(db, (
+        (line.processed_at or processed_at, line.amount, line.succeeded) for line, _ in settled
+    ))
+
+
+@tracked_job("payment_reconciliation", items=lambda summary: summary.lines)
+async def reconcile_results(
+    db: AsyncSession,
+    lines: Iterable[ResultLine],
+    source: str,
+    process_type: str,
+    payment_method: Optional[str] = None,
+    chunk_size: int = RECONCILE_CHUNK_SIZE,
+    progress: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> ReconciliationSummary:
+    """
+    結果行を決済へ一括消込
+    progress はチャンクごとに処理済みの行数で呼ぶ。commit は呼び出し側で行う。
+    """
+    started = time.perf_counter()
+    summary = ReconciliationSummary(source=source)
+    processed_at = datetime.now(timezone.utc)
+
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            break
+        summary.lines += len(chunk)
+        await _apply_chunk(db, chunk, summary, process_type, payment_method, processed_at)
+        if progress is not None:
+            await progress(summary.lines)
+
+    summary.elapsed_seconds = time.perf_counter() - started
+    return summary
+
+
+async def ingest_transfer_result_file(
+    db: AsyncSession,
+    path: str,
+    progress: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> ReconciliationSummary:
+    """口座振替結果CSVの取込（commit は呼び出し側で行う）"""
+    return await reconcile_results(
+        db,
+        parse_transfer_result_file(path),
+        source=path,
+        process_type="bank_transfer",
+        payment_method=PaymentMethod.BANK_TRANSFER.value,
+        progress=progress,
+    )
\ No newline at end of file
@@ -0,0 +1 @@
+# Reward calculation engines
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""
+IROAS BOSS System - Binary Bonus Engine
+バイナリーボーナス計算エンジン
+
+upline ツリー全体を配列として一括ロードし、子 -> 親の1パスで
+全会員の左脚・右脚売上を集計する。報酬額は弱い脚の売上 × BINARY_BONUS_RATE。
+
+売上は銭単位の整数値で合計する（加算順によらず同じ結果になる）。workers > 1 の場合は
+ツリーをサブツリーに分けてプロセスプールで並列に集計する（結果は逐次実行と同一）。
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import tracked_job
+from app.models.reward import RewardType
+from app.services.rewards.common import (
+    build_reward_row,
+    delete_calculated_rewards,
+    floor_amounts,
+    period_bounds,
+    to_amount,
+    write_rewards,
+)
+from app.services.rewards.parallel import (
+    PARALLEL_MIN_MEMBERS,
+    ArraySpec,
+    SharedArrays,
+    TreePartitioning,
+    attach_arrays,
+    local_parent,
+    partition_tree,
+    process_pool,
+)
+from app.services.rewards.tree import (
+    POSITION_LEFT,
+    POSITION_RIGHT,
+    MemberTree,
+    load_member_tree,
+    subtree_volumes,
+    tree_levels,
+)
+
+
+@dataclass
+class BinaryBonusSummary:
+    """バイナリーボーナス計算結果サマリー"""
+    reward_period: date
+    members_loaded: int
+    rewards_created: int
+    total_amount: Decimal
+    elapsed_seconds: float
+
+
+def _to_cents(volume: np.ndarray) -> np.ndarray:
+    """売上（円）-> 銭単位の整数値（float64 のまま。2^53 銭までは合計が厳密）"""
+    return np.round(volume * 100)
+
+
+def _leg_volumes(parent: np.ndarray, position: np.ndarray, subtree: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """子のサブツリー売上 -> 親の左脚・右脚売上"""
+    n = parent.shape[0]
+    has_parent = parent >= 0
+    left_children = has_parent & (position == POSITION_LEFT)
+    right_children = has_parent & (position == POSITION_RIGHT)
+
+    left = np.bincount(parent[left_children], weights=subtree[left_children], minlength=n)
+    right = np.bincount(parent[right_children], weights=subtree[right_children], minlength=n)
+    return left, right
+
+
+def compute_leg_volumes(
+    tree: MemberTree,
+    workers: int = 1,
+    executor: Optional[Executor] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    全会員の左脚・右脚売上を計算
+    ポジション未設定の子のサブツリーはどちらの脚にも計上しない。
+    workers > 1 かつ PARALLEL_MIN_MEMBERS 以上の場合はサブツリーごとに並列に計算する
+    （executor 未指定時はその場でプロセスプールを起動する）。
+    """
+    levels = tree_levels(tree.parent)
+    if workers > 1 and tree.size >= PARALLEL_MIN_MEMBERS:
+        partitioning = partition_tree(tree.parent, workers, levels)
+        if partitioning is not None:
+            return _parallel_leg_volumes(tree, partitioning, workers, executor)
+
+    subtree = subtree_volumes(tree.parent, _to_cents(tree.volume), levels)
+    left, right = _leg_volumes(tree.parent, tree.position, subtree)
+    return left / 100, right / 100
+
+
+def _partition_leg_volumes(spec: ArraySpec, start: int, end: int) -> None:
+    """
+    ワーカー: order[start:end] のサブツリー群の左脚・右脚売上
+    結果は共有メモリの subtree / left / right の担当ノードの位置に書く。
+    """
+    with attach_arrays(spec) as arrays:
+        nodes = arrays["order"][start:end]
+        parent = local_parent(arrays["parent"], arrays["rank"], nodes, start)
+        position = arrays["position"][nodes]
+        subtree = subtree_volumes(parent, arrays["volume"][nodes], tree_levels(parent))
+        left, right = _leg_volumes(parent, position, subtree)
+        arrays["subtree"][nodes] = subtree
+        arrays["left"][nodes] = left
+        arrays["right"][nodes] = right
+
+
+def _top_leg_volumes(
+    parent: np.ndarray,
+    position: np.ndarray,
+    volume: np.ndarray,
+    levels: List[np.ndarray],
+    cut_depth: int,
+    subtree: np.ndarray,
+    left: np.ndarray,
+    right: np.ndarray,
+) -> None:
+    """切断位置より上のノードの集計（パーティションの頂点のサブツリー売上から）"""
+    for depth in range(cut_depth - 1, -1, -1):
+        nodes, children = levels[depth], levels[depth + 1]
+        subtree[nodes] = volume[nodes]
+        np.add.at(subtree, parent[children], subtree[children])
+        for leg, legs in ((POSITION_LEFT, left), (POSITION_RIGHT, right)):
+            leg_children = children[position[children] == leg]
+            np.add.at(legs, parent[leg_children], subtree[leg_children])
+
+
+def _parallel_leg_volumes(
+    tree: MemberTree,
+    partitioning: TreePartitioning,
+    workers: int,
+    executor: Optional[Executor] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    n = tree.size
+    volume = _to_cents(tree.volume)
+    shared = SharedArrays({
+        "parent": tree.parent,
+        "position": tree.position,
+        "volume": volume,
+        "order": partitioning.order,
+        "rank": partitioning.rank,
+        "subtree": np.zeros(n),
+        "left": np.zeros(n),
+        "right": np.zeros(n),
+    })
+    with shared, process_pool(workers, executor) as pool:
+        futures = [
+            pool.submit(_partition_leg_volumes, shared.spec, start, end)
+            for start, end in partitioning.bounds if end > start
+        ]
+        for future in futures:
+            future.result()
+
+        subtree = shared.arrays["subtree"].copy()
+        left = shared.arrays["left"].copy()
+        right = shared.arrays["right"].copy()
+
+    _top_leg_volumes(
+        tree.parent, tree.position, volume, partitioning.levels, partitioning.cut_depth, subtree, left, right
+    )
+    return left / 100, right / 100
+
+
+def compute_binary_bonus(left: np.ndarray, right: np.ndarray, rate: float) -> np.ndarray:
+    """弱い脚の売上 × ボーナス率（円未満切り捨て）"""
+    return floor_amounts(np.minimum(left, right) * rate)
+
+
+def binary_reward_details(left_sales: Decimal, right_sales: Decimal, rate: float) -> dict:
+    """Reward.calculation_details（バイナリーボーナス）"""
+    return {
+        "left_leg_sales": float(left_sales),
+        "right_leg_sales": float(right_sales),
+        "weak_leg_sales": float(min(left_sales, right_sales)),
+        "bonus_rate": rate,
+    }
+
+
+@tracked_job("reward_binary", items=lambda summary: summary.rewards_created)
+async def calculate_binary_bonus(
+    db: AsyncSession,
+    reward_period: date,
+    rate: Optional[float] = None,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> BinaryBonusSummary:
+    """
+    バイナリーボーナスの月次計算
+    同期間の計算済み報酬は置き換える。commit は呼び出し側で行う。
+    workers は並列計算のプロセス数（未指定時は REWARD_CALCULATION_WORKERS）。executor には
+    呼び出し側が保持するプロセスプールを渡す（ジョブワーカー。未指定時は計算のたびに起動する）。
+    """
+    started = time.perf_counter()
+    rate = settings.BINARY_BONUS_RATE if rate is None else rate
+    workers = settings.REWARD_CALCULATION_WORKERS if workers is None else workers
+    period_from, period_to = period_bounds(reward_period)
+
+    tree = await load_member_tree(db, "upline")
+    # 配列計算の間もイベントループ（ジョブのハートビートなど）を止めない
+    left, right = await asyncio.to_thread(compute_leg_volumes, tree, workers, executor)
+    bonus = compute_binary_bonus(left, right, rate)
+
+    payees = np.flatnonzero((bonus > 0) & tree.active)
+    calculation_date = datetime.utcnow()
+    rewards = []
+    calculations = []
+    for index in payees.tolist():
+        amount = to_amount(bonus[index])
+        left_sales = Decimal(str(round(left[index], 2)))
+        right_sales = Decimal(str(round(right[index], 2)))
+        rewards.append(build_reward_row(
+            int(tree.member_ids[index]),
+            period_from,
+            RewardType.BINARY_BONUS.value,
+            amount,
+            binary_reward_details(left_sales, right_sales, rate),
+        ))
+        calculations.append({
+            "calculation_date": calculation_date,
+            "target_period_from": period_from,
+            "target_period_to": period_to,
+            "base_sales": Decimal(str(round(tree.volume[index], 2))),
+            "left_leg_sales": left_sales,
+            "right_leg_sales": right_sales,
+            "bonus_rate": Decimal(str(rate)),
+        })
+
+    await delete_calculated_rewards(db, RewardType.BINARY_BONUS.value, period_from)
+    created = await write_rewards(db, rewards, calculations)
+
+    return BinaryBonusSummary(
+        reward_period=period_from,
+        members_loaded=tree.size,
+        rewards_created=created,
+        total_amount=sum((row["net_amount"] for row in rewards), Decimal(0)),
+        elapsed_seconds=time.perf_counter() - started,
+    )
\ No newline at end of file
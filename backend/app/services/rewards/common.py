@@ -0,0 +1,103 @@
+"""
+IROAS BOSS System - Reward Engine Common
+報酬計算エンジン共通処理（期間計算・一括書き込み）
+"""
+
+import calendar
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.reward import Reward, RewardCalculation, RewardStatus
+
+
+INSERT_BATCH_SIZE = 5000
+
+
+def period_bounds(period: date) -> Tuple[date, date]:
+    """報酬対象期間（月初, 月末）"""
+    start = period.replace(day=1)
+    last_day = calendar.monthrange(start.year, start.month)[1]
+    return start, start.replace(day=last_day)
+
+
+def payout_date(period: date) -> date:
+    """支払予定日（対象月の翌月 PAYOUT_DAY 日）"""
+    start, _ = period_bounds(period)
+    year, month = (start.year + 1, 1) if start.month == 12 else (start.year, start.month + 1)
+    day = min(settings.PAYOUT_DAY, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def floor_amounts(values: np.ndarray) -> np.ndarray:
+    """円未満切り捨て（浮動小数点の丸め誤差で1円ずれないよう事前に丸める）"""
+    return np.floor(np.round(values, 6))
+
+
+def to_amount(value: float) -> Decimal:
+    """円未満切り捨てで金額化"""
+    return Decimal(int(value))
+
+
+def build_reward_row(member_id: int, period: date, reward_type: str, amount: Decimal, details: dict) -> Dict[str, Any]:
+    """Reward 行データ生成"""
+    minimum_payout = Decimal(settings.MINIMUM_PAYOUT_AMOUNT)
+    return {
+        "member_id": member_id,
+        "reward_period": period,
+        "reward_type": reward_type,
+        "gross_amount": amount,
+        "tax_amount": Decimal(0),
+        "net_amount": amount,
+        "minimum_payout": minimum_payout,
+        "is_payout_eligible": amount >= minimum_payout,
+        "status": RewardStatus.CALCULATED.value,
+        "carried_over_amount": Decimal(0),
+        "calculation_details": details,
+        "payment_scheduled_date": payout_date(period),
+    }
+
+
+async def delete_calculated_rewards(db: AsyncSession, reward_type: str, period: date) -> None:
+    """
+    同一期間・同一種別の未確定報酬を削除
+    再計算を冪等にするため、計算済み（未承認）の行のみ入れ替える。
+    """
+    target = select(Reward.id).where(
+        Reward.reward_type == reward_type,
+        Reward.reward_period == period,
+        Reward.status == RewardStatus.CALCULATED.value,
+    )
+    await db.execute(delete(RewardCalculation).where(RewardCalculation.reward_id.in_(target)))
+    await db.execute(delete(Reward).where(Reward.id.in_(target)))
+
+
+async def write_rewards(
+    db: AsyncSession,
+    rewards: List[Dict[str, Any]],
+    calculations: List[Dict[str, Any]],
+) -> int:
+    """
+    Reward / RewardCalculation の一括INSERT
+    calculations[i] は rewards[i] に対応する（reward_id は採番後に付与）。
+    """
+    for start in range(0, len(rewards), INSERT_BATCH_SIZE):
+        reward_batch = rewards[start:start + INSERT_BATCH_SIZE]
+        result = await db.execute(
+            insert(Reward).returning(Reward.id, sort_by_parameter_order=True),
+            reward_batch,
+        )
+        reward_ids = result.scalars().all()
+
+        calculation_batch = [
+            {**calculation, "reward_id": reward_id}
+            for reward_id, calculation in zip(reward_ids, calculations[start:start + INSERT_BATCH_SIZE])
+        ]
+        await db.execute(insert(RewardCalculation), calculation_batch)
+
+    return len(rewards)
\ No newline at end of file
@@ -0,0 +1,401 @@
+"""
+IROAS BOSS System - Incremental Reward Recalculation
+締め後の変更（返金・休会など）に対する報酬の差分再計算
+
+変更のあった会員の祖先（member_tree_paths）だけを再計算し、保存済みの報酬
+（calculation_details）と比べて、金額が変わった会員に差額の調整行を追加する。
+計算済み・承認済み・支払済みの行は変更しない（差額がマイナスの場合はマイナスの調整行）。
+
+- バイナリー: upline の祖先全員。脚売上は祖先パス上の会員と、パスから外れた子の
+  サブツリー合計（クロージャテーブルで各会員1回ずつ集計）から下から順に求める
+- ユニレベル: sponsor の段数上限（UNILEVEL_MAX_DEPTH）までの祖先。段別売上は
+  クロージャテーブルの深さ別に期間売上を集計する
+会員自身のステータス変更（休会・退会）は本人の受取可否に反映する。
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Integer, all_, and_, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.metrics import tracked_job
+from app.models.genealogy import MemberTreePath, TreeType
+from app.models.member import Member, MemberStatus
+from app.models.payment import Payment
+from app.models.reward import Reward, RewardStatus, RewardType
+from app.services.rewards.binary import binary_reward_details, compute_binary_bonus
+from app.services.rewards.common import build_reward_row, floor_amounts, period_bounds, to_amount, write_rewards
+from app.services.rewards.unilevel import period_sales_condition, resolve_level_rates, unilevel_levels
+
+
+ADJUSTMENT_NOTE = "差分再計算による調整"
+
+# binary_position -> (左脚, 右脚) のインデックス
+LEG_INDEX = {"L": 0, "R": 1}
+
+
+@dataclass
+class RecalculationResult:
+    """報酬種別ごとの差分再計算結果"""
+    reward_type: str
+    members_recalculated: int   # 再計算した会員（変更会員の祖先パス）
+    nodes_touched: int          # 集計で読んだ会員数（重複なし）
+    full_recompute_nodes: int   # 全体再計算で読む会員数
+    details_changed: int        # 計算詳細が変わった会員（金額が同じものを含む）
+    adjustments_created: int
+    adjustment_total: Decimal
+
+
+@dataclass
+class IncrementalRecalculationSummary:
+    """差分再計算結果サマリー"""
+    reward_period: date
+    changed_members: int
+    binary: RecalculationResult
+    unilevel: RecalculationResult
+    elapsed_seconds: float
+
+    @property
+    def adjustments_created(self) -> int:
+        return self.binary.adjustments_created + self.unilevel.adjustments_created
+
+
+@dataclass
+class RecalculatedReward:
+    """再計算した会員1人分"""
+    member_id: int
+    amount: Decimal
+    details: Dict[str, Any]
+    calculation: Dict[str, Any]
+
+
+def _ids_param(name: str, member_ids: Sequence[int]):
+    return any_(bindparam(name, list(member_ids), type_=ARRAY(Integer)))
+
+
+async def affected_members(
+    db: AsyncSession,
+    tree_type: str,
+    member_ids: Sequence[int],
+    max_depth: Optional[int] = None,
+) -> List[int]:
+    """変更会員自身と祖先（max_depth 段上まで）"""
+    query = select(MemberTreePath.ancestor_id).where(
+        MemberTreePath.tree_type == tree_type,
+        MemberTreePath.descendant_id == _ids_param("changed_ids", member_ids),
+    ).distinct()
+    if max_depth is not None:
+        query = query.where(MemberTreePath.depth <= max_depth)
+    return sorted((await db.execute(query)).scalars().all())
+
+
+async def _member_rows(db: AsyncSession, member_ids: Sequence[int]) -> Dict[int, Any]:
+    result = await db.execute(
+        select(Member.id, Member.upline_id, Member.binary_position, Member.total_sales, Member.status)
+        .where(Member.id == _ids_param("member_ids", member_ids))
+    )
+    return {row.id: row for row in result}
+
+
+async def recompute_binary(
+    db: AsyncSession,
+    member_ids: Sequence[int],
+    period_from: date,
+    period_to: date,
+    rate: float,
+) -> Tuple[List[RecalculatedReward], int]:
+    """
+    祖先パス上の会員のバイナリーボーナスを再計算（戻り値は (結果, 読んだ会員数)）
+    パス上の会員の子のうちパス外の子はサブツリー合計をクロージャテーブルで集計し、
+    パス上の子は下から順に合計していく。パス外の子のサブツリーは互いに重ならない。
+    """
+    members = await _member_rows(db, member_ids)
+
+    # パス外の子: サブツリー（自身を含む）の売上合計
+    child = aliased(Member)
+    descendant = aliased(Member)
+    off_path = await db.execute(
+        select(
+            child.upline_id,
+            child.binary_position,
+            func.sum(func.coalesce(descendant.total_sales, 0)),
+            func.count(),
+        )
+        .join(MemberTreePath, and_(
+            MemberTreePath.tree_type == TreeType.UPLINE.value,
+            MemberTreePath.ancestor_id == child.id,
+        ))
+        .join(descendant, descendant.id == MemberTreePath.descendant_id)
+        .where(
+            child.upline_id == _ids_param("path_ids", member_ids),
+            child.id != all_(bindparam("path_member_ids", list(member_ids), type_=ARRAY(Integer))),
+        )
+        .group_by(child.id, child.upline_id, child.binary_position)
+    )
+
+    legs = {member_id: [0.0, 0.0] for member_id in members}
+    subtree = {member_id: float(row.total_sales or 0) for member_id, row in members.items()}
+    touched = len(members)
+    for parent_id, position, sales, count in off_path:
+        if position in LEG_INDEX:
+            legs[parent_id][LEG_INDEX[position]] += float(sales)
+        subtree[parent_id] += float(sales)
+        touched += count
+
+    # パス上の子 -> 親の順（子が全て済んだ会員から）に合計する
+    pending = {member_id: 0 for member_id in members}
+    for row in members.values():
+        if row.upline_id in pending:
+            pending[row.upline_id] += 1
+    ready = [member_id for member_id, count in pending.items() if count == 0]
+    while ready:
+        member_id = ready.pop()
+        row = members[member_id]
+        if row.upline_id not in members:
+            continue
+        if row.binary_position in LEG_INDEX:
+            legs[row.upline_id][LEG_INDEX[row.binary_position]] += subtree[member_id]
+        subtree[row.upline_id] += subtree[member_id]
+        pending[row.upline_id] -= 1
+        if pending[row.upline_id] == 0:
+            ready.append(row.upline_id)
+
+    ids = sorted(members)
+    left = np.asarray([legs[member_id][0] for member_id in ids])
+    right = np.asarray([legs[member_id][1] for member_id in ids])
+    bonus = compute_binary_bonus(left, right, rate)
+
+    calculation_date = datetime.utcnow()
+    results = []
+    for index, member_id in enumerate(ids):
+        active = members[member_id].status == MemberStatus.ACTIVE.value
+        left_sales = Decimal(str(round(left[index], 2)))
+        right_sales = Decimal(str(round(right[index], 2)))
+        results.append(RecalculatedReward(
+            member_id=member_id,
+            amount=to_amount(bonus[index]) if active else Decimal(0),
+            details=binary_reward_details(left_sales, right_sales, rate),
+            calculation={
+                "calculation_date": calculation_date,
+                "target_period_from": period_from,
+                "target_period_to": period_to,
+                "base_sales": Decimal(str(round(float(members[member_id].total_sales or 0), 2))),
+                "left_leg_sales": left_sales,
+                "right_leg_sales": right_sales,
+                "bonus_rate": Decimal(str(rate)),
+            },
+        ))
+    return results, touched
+
+
+async def recompute_unilevel(
+    db: AsyncSession,
+    member_ids: Sequence[int],
+    period_from: date,
+    period_to: date,
+    level_rates: Sequence[float],
+) -> Tuple[List[RecalculatedReward], int]:
+    """
+    祖先の段別下位売上（深さ別の期間売上）からユニレベルボーナスを再計算
+    戻り値は (結果, 読んだ会員数)。祖先どうしのダウンラインは重なるため会員IDで数える。
+    """
+    max_depth = len(level_rates)
+    result = await db.execute(
+        select(
+            MemberTreePath.ancestor_id,
+            MemberTreePath.depth,
+            func.sum(func.coalesce(Payment.amount, 0)),
+        )
+        .outerjoin(Payment, and_(
+            Payment.member_id == MemberTreePath.descendant_id,
+            period_sales_condition(period_from, period_to),
+        ))
+        .where(
+            MemberTreePath.tree_type == TreeType.SPONSOR.value,
+            MemberTreePath.ancestor_id == _ids_param("ancestor_ids", member_ids),
+            MemberTreePath.depth.between(1, max_depth),
+        )
+        .group_by(MemberTreePath.ancestor_id, MemberTreePath.depth)
+    )
+
+    ids = sorted(member_ids)
+    column = {member_id: index for index, member_id in enumerate(ids)}
+    level_volumes = np.zeros((max_depth, len(ids)), dtype=np.float64)
+    for ancestor_id, depth, amount in result:
+        level_volumes[depth - 1, column[ancestor_id]] = float(amount)
+    touched = (await db.execute(
+        select(func.count(func.distinct(MemberTreePath.descendant_id))).where(
+            MemberTreePath.tree_type == TreeType.SPONSOR.value,
+            MemberTreePath.ancestor_id == _ids_param("touched_ids", member_ids),
+            MemberTreePath.depth <= max_depth,
+        )
+    )).scalar()
+
+    commissions = (
+        floor_amounts(np.asarray(level_rates, dtype=np.float64) @ level_volumes)
+        if level_rates else np.zeros(len(ids))
+    )
+    statuses = dict((await db.execute(
+        select(Member.id, Member.status).where(Member.id == _ids_param("member_ids", ids))
+    )).all())
+
+    calculation_date = datetime.utcnow()
+    results = []
+    for index, member_id in enumerate(ids):
+        levels = unilevel_levels(level_volumes[:, index], level_rates)
+        active = statuses.get(member_id) == MemberStatus.ACTIVE.value
+        results.append(RecalculatedReward(
+            member_id=member_id,
+            amount=to_amount(commissions[index]) if active else Decimal(0),
+            details={"levels": levels, "max_depth": max_depth},
+            calculation={
+                "calculation_date": calculation_date,
+                "target_period_from": period_from,
+                "target_period_to": period_to,
+                "base_sales": Decimal(str(round(float(level_volumes[:, index].sum()), 2))),
+                "bonus_rate": Decimal(str(level_rates[0])) if level_rates else Decimal(0),
+                "calculation_steps": {"levels": levels},
+            },
+        ))
+    return results, touched
+
+
+async def recorded_rewards(
+    db: AsyncSession,
+    reward_type: str,
+    period: date,
+    member_ids: Sequence[int],
+) -> Dict[int, Tuple[Decimal, Optional[dict]]]:
+    """
+    保存済みの報酬（キャンセル以外）: 会員ID -> (手取り額の合計, 最新の計算詳細)
+    調整行も含めるため、合計は前回までの計算結果の金額になる。
+    """
+    result = await db.execute(
+        select(Reward.member_id, Reward.net_amount, Reward.calculation_details)
+        .where(
+            Reward.reward_type == reward_type,
+            Reward.reward_period == period,
+            Reward.status != RewardStatus.CANCELLED.value,
+            Reward.member_id == _ids_param("member_ids", member_ids),
+        )
+        .order_by(Reward.id)
+    )
+    recorded: Dict[int, Tuple[Decimal, Optional[dict]]] = {}
+    for member_id, amount, details in result:
+        total, _ = recorded.get(member_id, (Decimal(0), None))
+        recorded[member_id] = (total + amount, details)
+    return recorded
+
+
+def _without_adjustment(details: Optional[dict]) -> Optional[dict]:
+    if details is None:
+        return None
+    return {key: value for key, value in details.items() if key != "adjustment"}
+
+
+async def write_adjustments(
+    db: AsyncSession,
+    reward_type: str,
+    period: date,
+    recalculated: List[RecalculatedReward],
+    changed_member_ids: Sequence[int],
+) -> Tuple[int, int, Decimal]:
+    """
+    保存済みの報酬と比べて差額の調整行を追加する
+    戻り値: (計算詳細が変わった会員数, 追加した調整行数, 差額の合計)
+    """
+    recorded = await recorded_rewards(db, reward_type, period, [r.member_id for r in recalculated])
+    rewards = []
+    calculations = []
+    details_changed = 0
+    for reward in recalculated:
+        previous_amount, previous_details = recorded.get(reward.member_id, (Decimal(0), None))
+        if previous_details is not None and _without_adjustment(previous_details) != reward.details:
+            details_changed += 1
+        difference = reward.amount - previous_amount
+        if difference == 0:
+            continue
+        row = build_reward_row(reward.member_id, period, reward_type, difference, {
+            **reward.details,
+            "adjustment": {
+                "previous_amount": float(previous_amount),
+                "recalculated_amount": float(reward.amount),
+                "previous_details": _without_adjustment(previous_details),
+                "changed_members": sorted(changed_member_ids)[:100],
+            },
+        })
+        row["notes"] = ADJUSTMENT_NOTE
+        rewards.append(row)
+        calculations.append(reward.calculation)
+
+    created = await write_rewards(db, rewards, calculations)
+    return details_changed, created, sum((row["net_amount"] for row in rewards), Decimal(0))
+
+
+async def _ensure_closed(db: AsyncSession, reward_type: str, period: date) -> None:
+    closed = (await db.execute(
+        select(Reward.id).where(Reward.reward_type == reward_type, Reward.reward_period == period).limit(1)
+    )).first()
+    if closed is None:
+        raise ValueError(f"{reward_type} for {period:%Y-%m} has not been calculated; run the monthly close first")
+
+
+@tracked_job("reward_recalculate", items=lambda summary: summary.adjustments_created)
+async def recalculate_rewards(
+    db: AsyncSession,
+    reward_period: date,
+    changed_member_ids: Sequence[int],
+    rate: Optional[float] = None,
+    rates: Optional[Sequence[float]] = None,
+    max_depth: Optional[int] = None,
+) -> IncrementalRecalculationSummary:
+    """
+    変更会員の影響範囲だけの報酬再計算（締め済みの期間のみ）
+    バイナリー・ユニレベルの両方について、保存済みの報酬との差額を調整行として追加する。
+    commit は呼び出し側で行う。
+    """
+    started = time.perf_counter()
+    rate = settings.BINARY_BONUS_RATE if rate is None else rate
+    level_rates = resolve_level_rates(rates, max_depth)
+    period_from, period_to = period_bounds(reward_period)
+    changed = sorted(set(changed_member_ids))
+    total_members = (await db.execute(select(func.count()).select_from(Member))).scalar()
+
+    results = {}
+    for reward_type, tree_type, depth, recompute, parameter in (
+        (RewardType.BINARY_BONUS.value, TreeType.UPLINE.value, None, recompute_binary, rate),
+        (RewardType.UNILEVEL_BONUS.value, TreeType.SPONSOR.value, len(level_rates), recompute_unilevel, level_rates),
+    ):
+        await _ensure_closed(db, reward_type, period_from)
+        affected = await affected_members(db, tree_type, changed, depth) if changed else []
+        recalculated, touched = (
+            await recompute(db, affected, period_from, period_to, parameter) if affected else ([], 0)
+        )
+        details_changed, created, total = await write_adjustments(
+            db, reward_type, period_from, recalculated, changed
+        )
+        results[reward_type] = RecalculationResult(
+            reward_type=reward_type,
+            members_recalculated=len(affected),
+            nodes_touched=touched,
+            full_recompute_nodes=total_members,
+            details_changed=details_changed,
+            adjustments_created=created,
+            adjustment_total=total,
+        )
+
+    return IncrementalRecalculationSummary(
+        reward_period=period_from,
+        changed_members=len(changed),
+        binary=results[RewardType.BINARY_BONUS.value],
+        unilevel=results[RewardType.UNILEVEL_BONUS.value],
+        elapsed_seconds=time.perf_counter() - started,
+    )
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+IROAS BOSS System - Parallel Tree Partitioning
+報酬計算の並列化（独立したサブツリーへの分割・共有メモリ）
+
+ツリーを上位の一定の深さで切り、その深さの各ノードを頂点とするサブツリーを
+独立したパーティションとしてプロセスプールで並列に計算する。切断位置より上の
+少数のノード（上位ノード）は、各パーティションの結果から親プロセスで計算する。
+ツリーの配列は共有メモリに置き、各ワーカーは担当範囲だけを読んで、結果を
+共有メモリの出力配列（担当ノードの位置）に書く。
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.rewards.tree import NO_PARENT, tree_levels
+
+
+# これ未満の会員数では並列化しない（プロセス間の受け渡しの方が高くつく）
+PARALLEL_MIN_MEMBERS = 100000
+
+# ワーカーあたりのパーティション数の目安（サイズの偏りを均すため）
+PARTITIONS_PER_WORKER = 4
+
+# 共有メモリ上の配列の受け渡し情報: 名前 -> (共有メモリ名, shape, dtype)
+ArraySpec = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+
+@dataclass
+class TreePartitioning:
+    """ツリーのパーティション分割"""
+    levels: List[np.ndarray]         # tree_levels() の結果
+    cut_depth: int                   # この深さのノードがパーティションの頂点
+    order: np.ndarray                # パーティションに属するノード（ワーカーごとに連続）
+    rank: np.ndarray                 # index -> order 内の位置（上位ノードは -1）
+    bounds: List[Tuple[int, int]]    # ワーカーごとの order の範囲
+
+
+def partition_tree(
+    parent: np.ndarray,
+    workers: int,
+    levels: Optional[List[np.ndarray]] = None,
+) -> Optional[TreePartitioning]:
+    """
+    ツリーを workers 個のワーカーに分割する
+    パーティションが workers * PARTITIONS_PER_WORKER 個以上になる最も浅い深さで切り、
+    大きいパーティションから順に担当件数の最も少ないワーカーへ割り当てる（同じ入力なら
+    同じ分割になる）。十分な数に分けられない場合は None。
+    """
+    levels = tree_levels(parent) if levels is None else levels
+    target = workers * PARTITIONS_PER_WORKER
+    cut_depth = next((depth for depth, nodes in enumerate(levels) if nodes.size >= target), None)
+    if cut_depth is None:
+        return None
+
+    n = parent.shape[0]
+    partition_roots = levels[cut_depth]
+    label = np.full(n, -1, dtype=np.int64)
+    label[partition_roots] = np.arange(partition_roots.size)
+    for nodes in levels[cut_depth + 1:]:
+        label[nodes] = label[parent[nodes]]
+    inside = label >= 0
+    sizes = np.bincount(label[inside], minlength=partition_roots.size)
+
+    worker_of_partition = np.empty(partition_roots.size, dtype=np.int64)
+    loads = [0] * workers
+    for partition in np.argsort(-sizes, kind="stable").tolist():
+        worker = min(range(workers), key=loads.__getitem__)
+        worker_of_partition[partition] = worker
+        loads[worker] += int(sizes[partition])
+
+    # 上位ノードは末尾（番号 workers）に集めて order から除く
+    worker_of_node = np.full(n, workers, dtype=np.int64)
+    worker_of_node[inside] = worker_of_partition[label[inside]]
+    counts = np.bincount(worker_of_node, minlength=workers + 1)[:workers]
+    ends = np.cumsum(counts)
+    order = np.argsort(worker_of_node, kind="stable")[:int(ends[-1])]
+    rank = np.full(n, -1, dtype=np.int64)
+    rank[order] = np.arange(order.size)
+
+    return TreePartitioning(
+        levels=levels,
+        cut_depth=cut_depth,
+        order=order,
+        rank=rank,
+        bounds=list(zip((ends - counts).tolist(), ends.tolist())),
+    )
+
+
+def local_parent(parent: np.ndarray, rank: np.ndarray, nodes: np.ndarray, start: int) -> np.ndarray:
+    """
+    担当範囲内の親インデックス
+    nodes は order[start:end]。範囲外（上位ノード）を指す親はルート扱い。
+    """
+    result = np.full(nodes.size, NO_PARENT, dtype=np.int64)
+    parents = parent[nodes]
+    has_parent = np.flatnonzero(parents != NO_PARENT)
+    position = rank[parents[has_parent]] - start
+    inside = (position >= 0) & (position < nodes.size)
+    result[has_parent[inside]] = position[inside]
+    return result
+
+
+class SharedArrays:
+    """
+    共有メモリ上の配列（親プロセスで作成・破棄する）
+    spec をワーカーに渡し、ワーカーは attach_arrays() で同じ配列を参照する。
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._blocks: List[SharedMemory] = []
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.spec: ArraySpec = {}
+        try:
+            for name, array in arrays.items():
+                block = SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+                shared[...] = array
+                self.arrays[name] = shared
+                self.spec[name] = (block.name, array.shape, array.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        self.arrays.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@contextmanager
+def attach_arrays(spec: ArraySpec) -> Iterator[Dict[str, np.ndarray]]:
+    """ワーカー側: 共有メモリ上の配列を参照する（終了時に切り離す）"""
+    blocks = [SharedMemory(name=block_name) for block_name, _, _ in spec.values()]
+    arrays = {
+        name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        for (name, (_, shape, dtype)), block in zip(spec.items(), blocks)
+    }
+    try:
+        yield arrays
+    finally:
+        arrays.clear()
+        for block in blocks:
+            block.close()
+
+
+@contextmanager
+def process_pool(workers: int, executor: Optional[Executor] = None) -> Iterator[Executor]:
+    """
+    並列計算用のプロセスプール（executor 指定時はそれを使う）
+    イベントループ・スレッドを持つプロセスから fork しないよう spawn で起動する。
+    """
+    if executor is not None:
+        yield executor
+        return
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        yield pool
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+IROAS BOSS System - Member Tree Arrays
+報酬計算用の配列ベース会員ツリー
+
+会員テーブルを1回のクエリで読み込み、親インデックス配列に変換する。
+ORMのリレーション（upline / sponsor）を1ノードずつ辿らずに、
+全会員分の集計を配列演算で行うための共通基盤。
+"""
+
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.member import Member, MemberStatus
+
+
+NO_PARENT = -1
+
+# binary_position のコード化
+POSITION_NONE = 0
+POSITION_LEFT = 1
+POSITION_RIGHT = 2
+
+# ツリー種別 -> 親を指すカラム
+TREE_PARENT_COLUMNS = {
+    "upline": Member.upline_id,
+    "sponsor": Member.sponsor_id,
+}
+
+LOAD_PARTITION_SIZE = 50000
+
+
+@dataclass
+class MemberTree:
+    """配列ベースの会員ツリー（インデックスは members.id の昇順）"""
+    member_ids: np.ndarray   # int64: index -> members.id
+    parent: np.ndarray       # int64: 親のindex（ルートは NO_PARENT）
+    position: np.ndarray     # int8: POSITION_*
+    volume: np.ndarray       # float64: 集計対象の売上
+    active: np.ndarray       # bool: 報酬受取対象（アクティブ会員）
+
+    @property
+    def size(self) -> int:
+        return int(self.member_ids.shape[0])
+
+    def index_of(self, member_ids: Sequence[int]) -> np.ndarray:
+        """members.id -> index（存在しないIDは NO_PARENT）"""
+        return map_ids_to_index(self.member_ids, np.asarray(member_ids, dtype=np.int64))
+
+
+def map_ids_to_index(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """昇順のID配列に対してIDをインデックスへ変換する"""
+    if sorted_ids.size == 0:
+        return np.full(ids.shape, NO_PARENT, dtype=np.int64)
+    index = np.searchsorted(sorted_ids, ids)
+    index = np.minimum(index, sorted_ids.size - 1)
+    found = sorted_ids[index] == ids
+    return np.where(found, index, NO_PARENT).astype(np.int64)
+
+
+def build_tree(
+    member_ids: np.ndarray,
+    parent_ids: np.ndarray,
+    position: np.ndarray,
+    volume: np.ndarray,
+    active: np.ndarray,
+) -> MemberTree:
+    """
+    ID配列からツリーを構築する
+    parent_ids の 0 は親なしとして扱う。存在しない会員を指す親もルート扱い。
+    """
+    order = np.argsort(member_ids, kind="stable")
+    member_ids = member_ids[order]
+    parent = map_ids_to_index(member_ids, parent_ids[order])
+    return MemberTree(
+        member_ids=member_ids,
+        parent=parent,
+        position=position[order],
+        volume=volume[order],
+        active=active[order],
+    )
+
+
+def tree_levels(parent: np.ndarray) -> List[np.ndarray]:
+    """
+    幅優先の階層分割
+    戻り値の levels[d] は深さ d のノードindex配列。
+    逆順に処理すると子 -> 親の順（ポストオーダー相当）で集計できる。
+    """
+    n = parent.shape[0]
+    has_parent = parent != NO_PARENT
+
+    # 親ごとに子を並べた CSR 形式の隣接配列
+    child_parent = parent[has_parent]
+    children = np.flatnonzero(has_parent)[np.argsort(child_parent, kind="stable")]
+    counts = np.bincount(child_parent, minlength=n)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    levels: List[np.ndarray] = []
+    frontier = np.flatnonzero(~has_parent)
+    visited = 0
+    while frontier.size:
+        levels.append(frontier)
+        visited += frontier.size
+        lengths = counts[frontier]
+        total = int(lengths.sum())
+        if total == 0:
+            break
+        # 各ノードの子範囲 [offset, offset + length) を一括で展開
+        starts = np.repeat(offsets[frontier] - np.cumsum(lengths) + lengths, lengths)
+        frontier = children[starts + np.arange(total)]
+
+    if visited != n:
+        raise ValueError(f"Member tree contains a cycle ({n - visited} members unreachable from any root)")
+    return levels
+
+
+def subtree_volumes(parent: np.ndarray, volume: np.ndarray, levels: List[np.ndarray]) -> np.ndarray:
+    """各ノードを頂点とするサブツリーの売上合計（自身を含む）"""
+    subtree = volume.astype(np.float64, copy=True)
+    n = parent.shape[0]
+    for nodes in reversed(levels[1:]):
+        subtree += np.bincount(parent[nodes], weights=subtree[nodes], minlength=n)
+    return subtree
+
+
+def encode_positions(values: Sequence) -> np.ndarray:
+    """binary_position ('L' / 'R' / None) をコード配列へ変換"""
+    codes = {"L": POSITION_LEFT, "R": POSITION_RIGHT}
+    return np.fromiter((codes.get(v, POSITION_NONE) for v in values), dtype=np.int8, count=len(values))
+
+
+async def load_member_tree(db: AsyncSession, tree: str = "upline") -> MemberTree:
+    """
+    会員ツリーを一括ロード
+    membersテーブルを1クエリでストリーミングし、配列に詰め替える。
+    """
+    parent_column = TREE_PARENT_COLUMNS[tree]
+    query = select(
+        Member.id,
+        parent_column,
+        Member.binary_position,
+        Member.total_sales,
+        Member.status,
+    ).order_by(Member.id)
+
+    ids: List[np.ndarray] = []
+    parents: List[np.ndarray] = []
+    positions: List[np.ndarray] = []
+    volumes: List[np.ndarray] = []
+    actives: List[np.ndarray] = []
+
+    result = await db.stream(query.execution_options(yield_per=LOAD_PARTITION_SIZE))
+    async for partition in result.partitions(LOAD_PARTITION_SIZE):
+        member_id, parent_id, position, sales, status = zip(*partition)
+        ids.append(np.fromiter(member_id, dtype=np.int64, count=len(partition)))
+        parents.append(np.fromiter((p or 0 for p in parent_id), dtype=np.int64, count=len(partition)))
+        positions.append(encode_positions(position))
+        volumes.append(np.fromiter((float(s or 0) for s in sales), dtype=np.float64, count=len(partition)))
+        actives.append(np.fromiter(
+            (s == MemberStatus.ACTIVE.value for s in status), dtype=bool, count=len(partition)
+        ))
+
+    if not ids:
+        empty = np.zeros(0, dtype=np.int64)
+        return MemberTree(empty, empty.copy(), np.zeros(0, dtype=np.int8), np.zeros(0), np.zeros(0, dtype=bool))
+
+    return build_tree(
+        np.concatenate(ids),
+        np.concatenate(parents),
+        np.concatenate(positions),
+        np.concatenate(volumes),
+        np.concatenate(actives),
+    )
\ No newline at end of file
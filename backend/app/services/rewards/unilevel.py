@@ -0,0 +1,183 @@
+"""
+IROAS BOSS System - Unilevel Bonus Engine
+ユニレベルボーナス計算エンジン
+
+sponsor ツリーを配列として一括ロードし、期間売上を1段ずつ親へ伝播させて
+「k段下の売上合計 × k段目の率」を全会員分まとめて計算する。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import tracked_job
+from app.models.payment import Payment, PaymentStatus
+from app.models.reward import RewardType
+from app.services.rewards.common import (
+    build_reward_row,
+    delete_calculated_rewards,
+    floor_amounts,
+    period_bounds,
+    to_amount,
+    write_rewards,
+)
+from app.services.rewards.tree import NO_PARENT, MemberTree, load_member_tree
+
+
+@dataclass
+class UnilevelBonusSummary:
+    """ユニレベルボーナス計算結果サマリー"""
+    reward_period: date
+    members_loaded: int
+    rewards_created: int
+    total_amount: Decimal
+    max_depth: int
+    elapsed_seconds: float
+
+
+def resolve_level_rates(
+    rates: Optional[Sequence[float]] = None,
+    max_depth: Optional[int] = None,
+) -> List[float]:
+    """
+    段ごとの報酬率を決定
+    rates 未指定時は設定値を使用し、max_depth で段数を打ち切る。
+    """
+    max_depth = settings.UNILEVEL_MAX_DEPTH if max_depth is None else max_depth
+    if rates is None:
+        rates = settings.UNILEVEL_LEVEL_RATES or [settings.UNILEVEL_BONUS_RATE] * max_depth
+    return [float(rate) for rate in rates][:max_depth]
+
+
+def compute_level_volumes(parent: np.ndarray, volume: np.ndarray, max_depth: int) -> np.ndarray:
+    """
+    段別の下位売上
+    戻り値[k - 1, i] は会員 i のちょうど k 段下にいる会員の売上合計。
+    """
+    n = parent.shape[0]
+    has_parent = parent != NO_PARENT
+    child_parent = parent[has_parent]
+
+    level_volumes = np.zeros((max_depth, n), dtype=np.float64)
+    carry = volume.astype(np.float64, copy=True)
+    for depth in range(max_depth):
+        carry = np.bincount(child_parent, weights=carry[has_parent], minlength=n)
+        level_volumes[depth] = carry
+        if not carry.any():
+            break
+    return level_volumes
+
+
+def compute_unilevel_commissions(tree: MemberTree, rates: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    全会員のユニレベルボーナスを計算
+    戻り値: (報酬額[円未満切り捨て], 段別下位売上)
+    """
+    level_volumes = compute_level_volumes(tree.parent, tree.volume, len(rates))
+    commissions = np.asarray(rates, dtype=np.float64) @ level_volumes if rates else np.zeros(tree.size)
+    return floor_amounts(commissions), level_volumes
+
+
+def unilevel_levels(level_volumes: np.ndarray, rates: Sequence[float]) -> List[dict]:
+    """会員1人分の段別下位売上 -> calculation_details の levels（売上のある段のみ）"""
+    return [
+        {
+            "depth": depth + 1,
+            "sales": round(float(level_volumes[depth]), 2),
+            "rate": rate,
+        }
+        for depth, rate in enumerate(rates)
+        if level_volumes[depth] > 0
+    ]
+
+
+def period_sales_condition(period_from: date, period_to: date):
+    """期間売上の対象となる決済（決済完了のみ。返金・キャンセル済みは含まない）"""
+    return and_(
+        Payment.status == PaymentStatus.COMPLETED.value,
+        Payment.payment_date >= period_from,
+        Payment.payment_date < period_to + timedelta(days=1),
+    )
+
+
+async def load_period_sales(db: AsyncSession, tree: MemberTree, period_from: date, period_to: date) -> np.ndarray:
+    """期間内の決済完了額を会員ごとに集計（ツリーのindex順）"""
+    query = select(
+        Payment.member_id,
+        func.sum(Payment.amount),
+    ).where(period_sales_condition(period_from, period_to)).group_by(Payment.member_id)
+
+    result = await db.execute(query)
+    rows = result.all()
+
+    sales = np.zeros(tree.size, dtype=np.float64)
+    if rows:
+        member_ids, amounts = zip(*rows)
+        index = tree.index_of(member_ids)
+        found = index != NO_PARENT
+        sales[index[found]] = np.asarray([float(a) for a in amounts])[found]
+    return sales
+
+
+@tracked_job("reward_unilevel", items=lambda summary: summary.rewards_created)
+async def calculate_unilevel_bonus(
+    db: AsyncSession,
+    reward_period: date,
+    rates: Optional[Sequence[float]] = None,
+    max_depth: Optional[int] = None,
+) -> UnilevelBonusSummary:
+    """
+    ユニレベルボーナスの月次計算
+    同期間の計算済み報酬は置き換える。commit は呼び出し側で行う。
+    """
+    started = time.perf_counter()
+    level_rates = resolve_level_rates(rates, max_depth)
+    period_from, period_to = period_bounds(reward_period)
+
+    tree = await load_member_tree(db, "sponsor")
+    tree.volume = await load_period_sales(db, tree, period_from, period_to)
+    # 配列計算の間もイベントループ（ジョブのハートビートなど）を止めない
+    commissions, level_volumes = await asyncio.to_thread(compute_unilevel_commissions, tree, level_rates)
+
+    payees = np.flatnonzero((commissions > 0) & tree.active)
+    calculation_date = datetime.utcnow()
+    rewards = []
+    calculations = []
+    for index in payees.tolist():
+        amount = to_amount(commissions[index])
+        levels = unilevel_levels(level_volumes[:, index], level_rates)
+        rewards.append(build_reward_row(
+            int(tree.member_ids[index]),
+            period_from,
+            RewardType.UNILEVEL_BONUS.value,
+            amount,
+            {"levels": levels, "max_depth": len(level_rates)},
+        ))
+        calculations.append({
+            "calculation_date": calculation_date,
+            "target_period_from": period_from,
+            "target_period_to": period_to,
+            "base_sales": Decimal(str(round(float(level_volumes[:, index].sum()), 2))),
+            "bonus_rate": Decimal(str(level_rates[0])),
+            "calculation_steps": {"levels": levels},
+        })
+
+    await delete_calculated_rewards(db, RewardType.UNILEVEL_BONUS.value, period_from)
+    created = await write_rewards(db, rewards, calculations)
+
+    return UnilevelBonusSummary(
+        reward_period=period_from,
+        members_loaded=tree.size,
+        rewards_created=created,
+        total_amount=sum((row["net_amount"] for row in rewards), Decimal(0)),
+        max_depth=len(level_rates),
+        elapsed_seconds=time.perf_counter() - started,
+    )
\ No newline at end of file
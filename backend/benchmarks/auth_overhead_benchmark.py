@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Auth Overhead Benchmark
+認証（get_current_user）の1リクエストあたりの処理時間とSQL文数の比較
+
+- legacy: トークンをデコードして毎回 users を引く（従来の実装）
+- claims: クレーム入りのトークン（principal_cache 経由）
+- revoked: 失効後のトークン（初回のみ DB、以降はキャッシュ済みのプリンシパル）
+
+ユーザーは1トランザクション内で作成し、最後に rollback するため
+DATABASE_URL のデータは変更されない。Redis に接続できない場合はプロセス内LRUのみで動く。
+
+    python benchmarks/auth_overhead_benchmark.py [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import jwt
+
+from app.api.api_v1.endpoints.auth import create_access_token, get_current_user, get_user_by_email
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.principals import Principal, principal_cache
+from app.core.profiling import QueryCounter
+from app.models.user import User as UserModel, UserRole
+
+
+async def legacy_get_current_user(token: str, db):
+    """従来の get_current_user（デコード + メールアドレスでユーザー取得）"""
+    payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
+    return await get_user_by_email(db, payload["sub"])
+
+
+async def measure(authenticate, token: str, db, requests: int):
+    """(1リクエストあたりの µs のリスト, SQL文数)"""
+    timings = []
+    with QueryCounter(engine) as queries:
+        for _ in range(requests):
+            started = time.perf_counter()
+            user = await authenticate(token=token, db=db)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+            assert user is not None
+    return timings, queries.count
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Auth overhead benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - Auth Overhead Benchmark")
+    print("=" * 50)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            user = UserModel(
+                email="auth-benchmark@example.com",
+                hashed_password="-",
+                full_name="Auth Benchmark",
+                role=UserRole.OPERATOR.value,
+                is_active=True,
+            )
+            db.add(user)
+            await db.flush()
+
+            revoked_token = create_access_token(Principal.from_user(user).claims())
+            await principal_cache.revoke(user.email)
+            # 失効と同じ秒に発行したトークンは失効扱いになるため、次の秒まで待つ
+            await asyncio.sleep(1.1)
+            claims_token = create_access_token(Principal.from_user(user).claims())
+            legacy_token = create_access_token({"sub": user.email})
+
+            scenarios = {
+                "legacy": (legacy_get_current_user, legacy_token),
+                "claims": (get_current_user, claims_token),
+                "revoked": (get_current_user, revoked_token),
+            }
+            # ウォームアップ（接続・文のコンパイルキャッシュ）
+            for authenticate, token in scenarios.values():
+                await measure(authenticate, token, db, 50)
+
+            results = {}
+            print(f"{'path':<8} {'mean µs':>8} {'p50 µs':>8} {'p95 µs':>8} {'queries':>8}")
+            for name, (authenticate, token) in scenarios.items():
+                timings, queries = await measure(authenticate, token, db, args.requests)
+                results[name] = statistics.mean(timings)
+                p95 = sorted(timings)[int(len(timings) * 0.95)]
+                print(f"{name:<8} {results[name]:>8.1f} {statistics.median(timings):>8.1f} "
+                      f"{p95:>8.1f} {queries:>8,}")
+            print(f"📊 principal cache: {principal_cache.snapshot()}")
+            print(f"⏱️  claims token is {results['legacy'] / results['claims']:.1f}x faster than legacy "
+                  f"({args.requests:,} requests per path)")
+
+            await db.rollback()
+    finally:
+        await principal_cache.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
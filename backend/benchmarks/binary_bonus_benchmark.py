@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Binary Bonus Benchmark
+バイナリーボーナス計算エンジンのベンチマーク
+
+合成ツリー（1万 / 10万 / 100万会員）で左右脚売上の集計時間を計測する。
+DB接続は不要（ロード後の配列計算部分のみを計測）。
+
+    python benchmarks/binary_bonus_benchmark.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.rewards.binary import compute_binary_bonus, compute_leg_volumes
+from app.services.rewards.tree import POSITION_LEFT, POSITION_RIGHT, MemberTree
+from benchmarks.synthetic_trees import random_binary_tree
+
+
+def reference_leg_volumes(tree: MemberTree):
+    """素朴な参照実装（ノードごとに祖先を辿って加算）"""
+    left = np.zeros(tree.size)
+    right = np.zeros(tree.size)
+    for node in range(tree.size):
+        child, parent = node, tree.parent[node]
+        while parent >= 0:
+            if tree.position[child] == POSITION_LEFT:
+                left[parent] += tree.volume[node]
+            elif tree.position[child] == POSITION_RIGHT:
+                right[parent] += tree.volume[node]
+            child, parent = parent, tree.parent[parent]
+    return left, right
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Binary bonus engine benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - Binary Bonus Benchmark")
+    print("=" * 50)
+
+    # 小規模ツリーで参照実装と一致することを確認
+    sample = random_binary_tree(2000, seed=1)
+    expected = reference_leg_volumes(sample)
+    actual = compute_leg_volumes(sample)
+    if not all(np.allclose(a, b) for a, b in zip(actual, expected)):
+        print("❌ leg volumes differ from reference implementation")
+        sys.exit(1)
+    print("✅ leg volumes match reference implementation (2,000 members)")
+
+    for size in args.sizes:
+        build_started = time.perf_counter()
+        tree = random_binary_tree(size, seed=size)
+        build_seconds = time.perf_counter() - build_started
+
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            left, right = compute_leg_volumes(tree)
+            bonus = compute_binary_bonus(left, right, settings.BINARY_BONUS_RATE)
+            timings.append(time.perf_counter() - started)
+
+        best = min(timings)
+        payees = int(np.count_nonzero((bonus > 0) & tree.active))
+        print(
+            f"{size:>9,} members | build {build_seconds:7.2f}s | "
+            f"calculate {best * 1000:9.1f} ms | {size / best:>12,.0f} members/s | payees {payees:,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - GMO Transfer Export Benchmark
+総合振込CSV作成のベンチマーク
+
+支払対象となる合成会員（既定10万人）と、繰越対象（口座未登録・最低支払額未満）の
+会員を各1割ずつ1トランザクション内で投入し、
+振込データ作成（バッチID付与・繰越・CSV出力）の時間を計測する。
+最後に rollback するため、DATABASE_URL のデータは変更されない。
+
+    python benchmarks/gmo_transfer_benchmark.py [--payees 100000] [--output /tmp/transfer.csv]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.models.member import Member
+from app.models.reward import Reward, RewardStatus, RewardType
+from app.services.gmo_transfer import export_transfer_file
+
+
+SEED_BATCH_SIZE = 1000
+REWARD_PERIOD = date(2099, 1, 1)
+
+
+def synthetic_members(payees: int, seed: int = 1):
+    """合成会員（支払対象 payees 人 + 口座未登録 1割）"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    for i in range(payees + payees // 5):
+        has_account = i < payees or i % 2 == 0
+        yield {
+            "member_code": f"B{i:09d}",
+            "family_name": "ベンチ",
+            "given_name": f"{i}",
+            "family_name_kana": "ベンチ",
+            "given_name_kana": "タロウ",
+            "email": f"gmo-benchmark-{i}@example.invalid",
+            "status": "active",
+            "is_active": True,
+            "organization_level": 1,
+            "registration_date": now,
+            "bank_code": f"{rng.randint(1, 9999):04d}" if has_account else None,
+            "bank_name": "ミツイスミトモ",
+            "branch_code": f"{rng.randint(1, 999):03d}" if has_account else None,
+            "branch_name": "ホンテン",
+            "account_type": "普通",
+            "account_number": f"{rng.randint(0, 9999999):07d}" if has_account else None,
+        }
+
+
+def synthetic_rewards(member_ids, payees: int, seed: int = 2):
+    """合成報酬（会員あたり1〜3件、支払対象外の口座登録済み会員は最低支払額未満）"""
+    rng = random.Random(seed)
+    for i, member_id in enumerate(member_ids):
+        small = i >= payees and i % 2 == 0
+        for reward_type in rng.sample(list(RewardType), rng.randint(1, 3)):
+            amount = Decimal(rng.randint(100, 1000) if small else rng.randint(5000, 50000))
+            yield {
+                "member_id": member_id,
+                "reward_period": REWARD_PERIOD,
+                "reward_type": reward_type.value,
+                "gross_amount": amount,
+                "tax_amount": Decimal(0),
+                "net_amount": amount,
+                "minimum_payout": Decimal(settings.MINIMUM_PAYOUT_AMOUNT),
+                "is_payout_eligible": False,
+                "status": RewardStatus.APPROVED.value,
+                "carried_over_amount": Decimal(0),
+            }
+
+
+async def seed(db, payees: int):
+    """合成データ投入"""
+    members = Member.__table__
+    member_ids = []
+    batch = []
+    for member in synthetic_members(payees):
+        batch.append(member)
+        if len(batch) == SEED_BATCH_SIZE:
+            result = await db.execute(insert(members).returning(members.c.id, sort_by_parameter_order=True), batch)
+            member_ids.extend(result.scalars().all())
+            batch = []
+    if batch:
+        result = await db.execute(insert(members).returning(members.c.id, sort_by_parameter_order=True), batch)
+        member_ids.extend(result.scalars().all())
+
+    rewards = 0
+    batch = []
+    for reward in synthetic_rewards(member_ids, payees):
+        batch.append(reward)
+        if len(batch) == SEED_BATCH_SIZE:
+            await db.execute(insert(Reward.__table__), batch)
+            rewards += len(batch)
+            batch = []
+    if batch:
+        await db.execute(insert(Reward.__table__), batch)
+        rewards += len(batch)
+    return rewards
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="GMO transfer export benchmark")
+    parser.add_argument("--payees", type=int, default=100000)
+    parser.add_argument("--output", default="/tmp/gmo_transfer_benchmark.csv")
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - GMO Transfer Export Benchmark")
+    print("=" * 50)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            rewards = await seed(db, args.payees)
+            # 定常運用時と同じく会員テーブルの統計がある状態で計測する
+            await db.execute(text("ANALYZE members"))
+            print(f"🌱 seeded {args.payees:,} payees / {rewards:,} rewards in {time.perf_counter() - started:.1f}s")
+
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            summary = await export_transfer_file(db, REWARD_PERIOD, args.output, batch_id="GMO-BENCHMARK")
+            rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+            print(f"✅ payees:       {summary.payees:,} ({summary.rewards_stamped:,} rewards stamped)")
+            print(f"↪️  carried over: {summary.rewards_carried_over:,} rewards "
+                  f"({summary.missing_bank_account:,} members without bank account)")
+            print(f"⏱️  export:       {summary.elapsed_seconds:.2f}s "
+                  f"({summary.payees / summary.elapsed_seconds:,.0f} payees/s)")
+            print(f"📄 {args.output}: {os.path.getsize(args.output):,} bytes")
+            print(f"🧠 peak RSS growth during export: {(rss_after - rss_before) / 1024:,.1f} MB")
+
+            await db.rollback()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - IPS Card Billing Benchmark
+IPSカード請求ファイル作成・結果取込のベンチマーク
+
+合成の会員・カード決済（既定10万件）を1トランザクション内で投入し、
+請求ファイル作成 -> 結果ファイル（OK/NG）生成 -> 結果取込 の時間を計測する。
+最後に rollback するため、DATABASE_URL のデータは変更されない。
+
+    python benchmarks/ips_card_benchmark.py [--payments 100000] [--workdir /tmp]
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.member import Member
+from app.models.payment import Payment, PaymentMethod, PaymentStatus
+from app.services.ips_card import IPS_FILE_ENCODING, export_ips_convert_file, ingest_ips_result_file
+
+
+SEED_BATCH_SIZE = 5000
+CHARGE_AMOUNT = Decimal(10670)
+RESULT_HEADER = [
+    "IPS決済番号", "検索種別", "店舗側オーダー番号", "電話番号", "メールアドレス",
+    "金額(税込)", "送料", "処理結果コード", "決済結果",
+]
+
+
+async def seed(db, count: int) -> None:
+    """合成データ投入（会員番号は既存データと衝突しない9000万番台）"""
+    members = Member.__table__
+    now = datetime.utcnow()
+    for start in range(0, count, SEED_BATCH_SIZE):
+        batch = [
+            {
+                "member_code": f"{90000000 + i}",
+                "family_name": "ベンチ",
+                "given_name": f"{i}",
+                "email": f"ips-benchmark-{i}@example.invalid",
+                "status": "active",
+                "is_active": True,
+                "organization_level": 1,
+                "registration_date": now,
+            }
+            for i in range(start, min(start + SEED_BATCH_SIZE, count))
+        ]
+        result = await db.execute(insert(members).returning(members.c.id), batch)
+        await db.execute(insert(Payment.__table__), [
+            {
+                "member_id": member_id,
+                "amount": CHARGE_AMOUNT,
+                "currency": "JPY",
+                "payment_method": PaymentMethod.CREDIT_CARD.value,
+                "status": PaymentStatus.PENDING.value,
+            }
+            for member_id in result.scalars().all()
+        ])
+
+
+def write_result_file(convert_path: str, result_path: str, ng_rate: float = 0.05) -> None:
+    """請求ファイルから結果ファイルを合成（一定割合をNG）"""
+    rng = random.Random(1)
+    with open(convert_path, encoding=IPS_FILE_ENCODING, newline="") as src, \
+            open(result_path, "w", encoding=IPS_FILE_ENCODING, newline="") as dst:
+        writer = csv.writer(dst, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+        writer.writerow(RESULT_HEADER)
+        for _, order_number, amount, _ in csv.reader(src):
+            result = "NG" if rng.random() < ng_rate else "OK"
+            writer.writerow(["", "", order_number, "", "", amount, "", "", result])
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="IPS card billing benchmark")
+    parser.add_argument("--payments", type=int, default=100000)
+    parser.add_argument("--workdir", default="/tmp")
+    args = parser.parse_args()
+
+    convert_path = os.path.join(args.workdir, "ips_benchmark_convert.csv")
+    result_path = os.path.join(args.workdir, "ips_benchmark_result.csv")
+
+    print("IROAS BOSS System - IPS Card Billing Benchmark")
+    print("=" * 50)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await seed(db, args.payments)
+            await db.execute(text("ANALYZE members"))
+            await db.execute(text("ANALYZE payments"))
+            print(f"🌱 seeded {args.payments:,} card payments in {time.perf_counter() - started:.1f}s")
+
+            exported = await export_ips_convert_file(db, convert_path)
+            print(f"📤 export:  {exported.payments:,} payments in {exported.elapsed_seconds:.2f}s "
+                  f"({exported.payments / exported.elapsed_seconds:,.0f}/s)")
+
+            write_result_file(convert_path, result_path)
+
+            summary = await ingest_ips_result_file(db, result_path)
+            print(f"📥 ingest:  {summary.lines:,} lines in {summary.elapsed_seconds:.2f}s "
+                  f"({summary.lines / summary.elapsed_seconds:,.0f}/s)")
+            print(f"   OK {summary.succeeded:,} / NG {summary.failed:,} / unmatched {summary.unmatched:,}")
+
+            await db.rollback()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
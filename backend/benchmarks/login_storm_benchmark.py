@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Login Storm Benchmark
+ログインの集中中に他のエンドポイントの応答時間がどうなるかの計測
+
+ログインを同時に --logins 件送りながら、GET /auth/me（トークンのクレームだけで
+応答し DB を引かない）を一定間隔で送り続け、その応答時間（送信予定時刻から）を比較する。
+- inline: イベントループ上で bcrypt を実行（従来の login と同じ）
+- pooled: POST /auth/token（password_hasher のスレッドプールで実行）
+
+ユーザーは外側のトランザクション内で作成し、最後に rollback するため
+DATABASE_URL のデータは変更されない。
+
+    python benchmarks/login_storm_benchmark.py [--logins 20] [--probe-interval 0.01]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.api_v1.endpoints.auth import create_access_token, get_user_by_email, router as auth_router
+from app.core.database import engine, get_db
+from app.core.passwords import password_hasher
+from app.core.principals import Principal
+from app.models.user import User as UserModel, UserRole
+
+
+PASSWORD = "storm-benchmark-password"
+
+
+def build_app(db: AsyncSession) -> FastAPI:
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/auth")
+
+    @app.post("/inline/token")
+    async def inline_login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+        """従来の login（イベントループ上で bcrypt を実行）"""
+        user = await get_user_by_email(db, form_data.username)
+        if not user or not password_hasher.context.verify(form_data.password, user.hashed_password):
+            raise HTTPException(status_code=401)
+        return {"access_token": create_access_token(Principal.from_user(user).claims())}
+
+    async def override_get_db():
+        yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    return app
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def storm(client: httpx.AsyncClient, login_path: str, email: str, token: str, logins: int, interval: float):
+    """(ログイン全体の秒数, /auth/me の応答時間 ms のリスト)"""
+    running = True
+    probe_times = []
+
+    async def probe():
+        # 応答時間は送信予定時刻から数える（イベントループが止まって送れなかった時間も含める）
+        scheduled = time.perf_counter()
+        while running:
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            response = await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+            response.raise_for_status()
+            probe_times.append((time.perf_counter() - scheduled) * 1000)
+            scheduled += interval
+
+    async def login():
+        response = await client.post(login_path, data={"username": email, "password": PASSWORD})
+        response.raise_for_status()
+
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(interval * 5)
+    started = time.perf_counter()
+    if logins:
+        await asyncio.gather(*[login() for _ in range(logins)])
+    else:
+        await asyncio.sleep(1)
+    elapsed = time.perf_counter() - started
+    running = False
+    await prober
+    return elapsed, probe_times
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Login storm benchmark")
+    parser.add_argument("--logins", type=int, default=20, help="同時に送るログイン数")
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="GET /auth/me の送信間隔（秒）")
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - Login Storm Benchmark")
+    print("=" * 50)
+    print(f"🔐 bcrypt rounds {password_hasher.rounds}, {password_hasher.workers} hashing threads, "
+          f"queue limit {password_hasher.max_queue}, {args.logins} concurrent logins")
+
+    try:
+        async with engine.connect() as connection:
+            transaction = await connection.begin()
+            db = AsyncSession(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
+            try:
+                user = UserModel(
+                    email="login-storm@example.com",
+                    hashed_password=await password_hasher.hash(PASSWORD),
+                    full_name="Login Storm",
+                    role=UserRole.OPERATOR.value,
+                    is_active=True,
+                )
+                db.add(user)
+                await db.flush()
+                token = create_access_token(Principal.from_user(user).claims())
+
+                app = build_app(db)
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    # 待機時の応答時間
+                    _, idle_times = await storm(client, "/auth/token", user.email, token, 0, args.probe_interval)
+                    print(f"{'mode':<8} {'logins s':>9} {'probes':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+                    print(f"{'idle':<8} {'-':>9} {len(idle_times):>7} {statistics.median(idle_times):>8.1f} "
+                          f"{percentile(idle_times, 0.95):>8.1f} {max(idle_times):>8.1f}")
+                    for mode, path in (("inline", "/inline/token"), ("pooled", "/auth/token")):
+                        elapsed, times = await storm(client, path, user.email, token, args.logins, args.probe_interval)
+                        print(f"{mode:<8} {elapsed:>9.2f} {len(times):>7} {statistics.median(times):>8.1f} "
+                              f"{percentile(times, 0.95):>8.1f} {max(times):>8.1f}")
+                print(f"📊 password hashing: {password_hasher.snapshot()}")
+            finally:
+                await db.close()
+                await transaction.rollback()
+    finally:
+        password_hasher.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
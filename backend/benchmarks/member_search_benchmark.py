@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Member Search Benchmark
+会員検索（pg_trgm）のレイテンシ計測
+
+合成会員（既定100万人）を1トランザクション内で投入し、検索語の種類ごとに
+search_members を繰り返し実行して p50 / p95 を表示する。
+最後に rollback するため、DATABASE_URL のデータは変更されない。
+pg_trgm・btree_gin 拡張と members の検索用索引が作成済みであること。
+
+    python benchmarks/member_search_benchmark.py [--members 1000000] [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.member import Member
+from app.services.member_search import search_members
+
+
+SEED_BATCH_SIZE = 5000
+PAGE_SIZE = 50
+
+# 会員番号は既存データと衝突しない8000万番台
+MEMBER_CODE_BASE = 80000000
+
+FAMILY_NAMES = [
+    ("佐藤", "サトウ"), ("鈴木", "スズキ"), ("高橋", "タカハシ"), ("田中", "タナカ"), ("伊藤", "イトウ"),
+    ("渡辺", "ワタナベ"), ("山本", "ヤマモト"), ("中村", "ナカムラ"), ("小林", "コバヤシ"), ("加藤", "カトウ"),
+    ("吉田", "ヨシダ"), ("山田", "ヤマダ"), ("佐々木", "ササキ"), ("山口", "ヤマグチ"), ("松本", "マツモト"),
+    ("井上", "イノウエ"), ("木村", "キムラ"), ("林", "ハヤシ"), ("斎藤", "サイトウ"), ("清水", "シミズ"),
+]
+GIVEN_NAMES = [
+    ("太郎", "タロウ"), ("花子", "ハナコ"), ("一郎", "イチロウ"), ("美咲", "ミサキ"), ("健太", "ケンタ"),
+    ("陽子", "ヨウコ"), ("翔", "ショウ"), ("直樹", "ナオキ"), ("由美", "ユミ"), ("大輔", "ダイスケ"),
+    ("恵", "メグミ"), ("拓也", "タクヤ"), ("愛", "アイ"), ("和也", "カズヤ"), ("真由美", "マユミ"),
+]
+
+# 検索語の種類 -> 検索語を作る関数（会員数に依存するものは rng と件数を受け取る）
+QUERIES = {
+    "kana (half-width)": lambda rng, n: "ﾀﾅｶ",
+    "kana (hiragana)": lambda rng, n: "やまもと",
+    "kanji 2 chars": lambda rng, n: rng.choice(FAMILY_NAMES)[0][:2],
+    "full name": lambda rng, n: " ".join((rng.choice(FAMILY_NAMES)[0], rng.choice(GIVEN_NAMES)[0])),
+    "member code": lambda rng, n: f"{MEMBER_CODE_BASE + rng.randrange(n)}",
+    "member code prefix": lambda rng, n: f"{MEMBER_CODE_BASE + rng.randrange(n)}"[:6],
+    "email fragment": lambda rng, n: f"search-benchmark-{rng.randrange(n)}@",
+    "phone": lambda rng, n: f"090-{rng.randrange(10000):04d}",
+    "no match": lambda rng, n: "zzzqqq",
+}
+
+
+def synthetic_members(count: int, seed: int = 1):
+    """合成会員"""
+    rng = random.Random(seed)
+    base = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        family, family_kana = rng.choice(FAMILY_NAMES)
+        given, given_kana = rng.choice(GIVEN_NAMES)
+        yield {
+            "member_code": f"{MEMBER_CODE_BASE + i}",
+            "family_name": family,
+            "given_name": given,
+            "family_name_kana": family_kana,
+            "given_name_kana": given_kana,
+            "email": f"search-benchmark-{i}@example.com",
+            "phone": f"090-{rng.randrange(10000):04d}-{rng.randrange(10000):04d}",
+            "status": "active",
+            "is_active": True,
+            "organization_level": 1,
+            "registration_date": base + timedelta(minutes=5 * i),
+        }
+
+
+async def seed(db, count: int) -> None:
+    """合成データ投入"""
+    batch = []
+    for member in synthetic_members(count):
+        batch.append(member)
+        if len(batch) == SEED_BATCH_SIZE:
+            await db.execute(insert(Member.__table__), batch)
+            batch = []
+    if batch:
+        await db.execute(insert(Member.__table__), batch)
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Member search benchmark")
+    parser.add_argument("--members", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=50, help="検索語の種類ごとの実行回数")
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - Member Search Benchmark")
+    print("=" * 50)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await seed(db, args.members)
+            await db.execute(text("ANALYZE members"))
+            print(f"🌱 seeded {args.members:,} members in {time.perf_counter() - started:.1f}s")
+
+            rng = random.Random(2)
+            all_timings = []
+            print(f"{'query':<20} {'hits':>9} {'p50 ms':>8} {'p95 ms':>8}")
+            for label, make_query in QUERIES.items():
+                timings = []
+                hits = 0
+                for _ in range(args.repeat):
+                    query = make_query(rng, args.members)
+                    started = time.perf_counter()
+                    page = await search_members(db, query=query, limit=PAGE_SIZE)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    hits += page.total
+                all_timings.extend(timings)
+                print(f"{label:<20} {hits // args.repeat:>9,} "
+                      f"{statistics.median(timings):>8.1f} {percentile(timings, 0.95):>8.1f}")
+            print(f"⏱️  overall p95: {percentile(all_timings, 0.95):.1f} ms "
+                  f"({len(all_timings):,} searches, page size {PAGE_SIZE})")
+
+            await db.rollback()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
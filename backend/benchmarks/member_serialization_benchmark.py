@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Member List Serialization Benchmark
+会員一覧の full（ORM エンティティ + Member.from_orm）と
+summary（列を絞った SELECT + 行 dict）の取得・シリアライズ時間の比較
+
+合成会員を1トランザクション内で投入し、1000件のページを繰り返し取得して
+取得（SQL + 行の組み立て）とシリアライズ（JSON化）の p50 と応答サイズを表示する。
+最後に rollback するため、DATABASE_URL のデータは変更されない。
+
+    python benchmarks/member_serialization_benchmark.py [--members 20000] [--repeat 30]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.orm import selectinload
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.member import Member as MemberModel
+from app.schemas.member import Member, MemberList, MemberSummaryList
+from app.services.member_search import COUNT_NONE, SUMMARY_FIELDS, search_members
+from benchmarks.member_search_benchmark import seed
+
+
+PAGE_SIZE = 1000
+
+
+def serialize_full(page) -> bytes:
+    """GET /members/ の view=full と同じ組み立て"""
+    return MemberList(
+        members=[Member.from_orm(member) for member in page.members],
+        total=page.total, page=1, size=PAGE_SIZE,
+    ).model_dump_json(by_alias=True).encode()
+
+
+def serialize_summary(page) -> bytes:
+    """GET /members/ の view=summary と同じ組み立て"""
+    return MemberSummaryList.model_construct(
+        members=page.members, total=page.total, total_estimated=False, page=1, size=PAGE_SIZE,
+        next_cursor=None,
+    ).model_dump_json(by_alias=True).encode()
+
+
+VIEWS = {
+    "full": (None, serialize_full),
+    "summary": (SUMMARY_FIELDS, serialize_summary),
+}
+
+
+async def measure(db, fields, serialize, offsets):
+    """ページごとの (取得 ms, シリアライズ ms, 応答バイト数)"""
+    fetch_times, serialize_times, sizes = [], [], []
+    for skip in offsets:
+        started = time.perf_counter()
+        page = await search_members(
+            db, skip=skip, limit=PAGE_SIZE, count=COUNT_NONE, fields=fields,
+            options=(selectinload(MemberModel.sponsor),)
+        )
+        fetched = time.perf_counter()
+        body = serialize(page)
+        fetch_times.append((fetched - started) * 1000)
+        serialize_times.append((time.perf_counter() - fetched) * 1000)
+        sizes.append(len(body))
+        # identity map に残ったエンティティで次のページが速くならないようにする
+        db.expunge_all()
+    return fetch_times, serialize_times, sizes
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Member list serialization benchmark")
+    parser.add_argument("--members", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=30, help="表示形式ごとのページ取得回数")
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - Member List Serialization Benchmark")
+    print("=" * 50)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await seed(db, args.members)
+            await db.execute(text("ANALYZE members"))
+            print(f"🌱 seeded {args.members:,} members in {time.perf_counter() - started:.1f}s")
+
+            rng = random.Random(1)
+            offsets = [rng.randrange(max(1, args.members - PAGE_SIZE)) for _ in range(args.repeat)]
+            # ウォームアップ（接続・文のコンパイルキャッシュ）
+            for fields, serialize in VIEWS.values():
+                await measure(db, fields, serialize, offsets[:2])
+
+            results = {}
+            print(f"{'view':<8} {'fetch ms':>9} {'json ms':>8} {'total ms':>9} {'KB/page':>8}")
+            for view, (fields, serialize) in VIEWS.items():
+                fetch_times, serialize_times, sizes = await measure(db, fields, serialize, offsets)
+                totals = [f + s for f, s in zip(fetch_times, serialize_times)]
+                results[view] = statistics.median(totals)
+                print(f"{view:<8} {statistics.median(fetch_times):>9.1f} {statistics.median(serialize_times):>8.1f} "
+                      f"{results[view]:>9.1f} {statistics.median(sizes) / 1024:>8.1f}")
+            print(f"⏱️  summary is {results['full'] / results['summary']:.1f}x faster per {PAGE_SIZE:,}-row page (p50)")
+
+            await db.rollback()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
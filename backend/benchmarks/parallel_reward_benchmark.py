@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Parallel Reward Benchmark
+バイナリーボーナス集計の並列化（サブツリー分割 + プロセスプール）のスケーリング計測
+
+合成ツリーで workers = 1（逐次）と各ワーカー数の集計時間を計測し、結果（左右脚売上・
+報酬額）が逐次実行と完全に一致することを確認する。プロセスプールは事前に起動して
+おき（月次締めでは1回だけ起動する）、起動時間は別に表示する。
+CPU コア数を超えるワーカー数では速度は上がらない。
+
+    python benchmarks/parallel_reward_benchmark.py [--size 1000000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.rewards.binary import compute_binary_bonus, compute_leg_volumes
+from app.services.rewards.parallel import partition_tree
+from benchmarks.synthetic_trees import random_binary_tree
+
+
+def best_time(repeat: int, calculate) -> tuple:
+    """repeat 回実行して最短時間と最後の結果を返す"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = calculate()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Parallel binary bonus benchmark")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - Parallel Reward Benchmark")
+    print("=" * 50)
+
+    build_started = time.perf_counter()
+    tree = random_binary_tree(args.size, seed=args.size)
+    # 銭単位の端数を含む売上でも逐次実行と一致することを確認する
+    rng = np.random.default_rng(args.size)
+    tree.volume = tree.volume + rng.integers(0, 100, tree.size) / 100
+    print(f"🌳 {tree.size:,} members (build {time.perf_counter() - build_started:.1f}s), {os.cpu_count()} CPUs")
+
+    rate = settings.BINARY_BONUS_RATE
+    serial_seconds, (left, right) = best_time(args.repeat, lambda: compute_leg_volumes(tree))
+    expected_bonus = compute_binary_bonus(left, right, rate)
+
+    print(f"{'workers':>7} {'partitions':>10} {'pool start':>10} {'calculate':>10} {'speedup':>8}  identical")
+    mismatches = 0
+    for workers in args.workers:
+        if workers <= 1:
+            print(f"{1:>7} {'-':>10} {'-':>10} {serial_seconds * 1000:>8.0f}ms {1:>7.2f}x  (serial)")
+            continue
+
+        partitioning = partition_tree(tree.parent, workers)
+        partitions = len(partitioning.levels[partitioning.cut_depth]) if partitioning else 0
+
+        pool_started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            # 全ワーカーを起動してモジュールを読み込ませておく
+            list(pool.map(compute_leg_volumes, [random_binary_tree(10, seed=0)] * workers))
+            pool_seconds = time.perf_counter() - pool_started
+
+            seconds, (parallel_left, parallel_right) = best_time(
+                args.repeat, lambda: compute_leg_volumes(tree, workers, executor=pool)
+            )
+
+        identical = (
+            np.array_equal(left, parallel_left)
+            and np.array_equal(right, parallel_right)
+            and np.array_equal(expected_bonus, compute_binary_bonus(parallel_left, parallel_right, rate))
+        )
+        mismatches += not identical
+        print(
+            f"{workers:>7} {partitions:>10} {pool_seconds * 1000:>8.0f}ms {seconds * 1000:>8.0f}ms "
+            f"{serial_seconds / seconds:>7.2f}x  {'✅' if identical else '❌'}"
+        )
+
+    if mismatches:
+        print("❌ parallel results differ from the serial run")
+        sys.exit(1)
+    print("✅ parallel results are identical to the serial run")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
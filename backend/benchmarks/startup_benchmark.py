@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Startup Benchmark
+ワーカー起動時間の計測（import main と起動時のDB処理）
+
+--workers 個のプロセスを同時に起動し（uvicorn --workers と同じ状況）、それぞれで
+- import: import main（アプリ・ルーター・モデルの読み込み）
+- connect: DB への最初の接続
+- check: 起動時のマイグレーション確認（head の読み込み + alembic_version を1回）
+- create_all: 従来の起動処理 Base.metadata.create_all（rollback するため DB は変更しない）
+- deferred: 起動時に読み込まなくなったモジュール（openpyxl・passlib の bcrypt）の読み込み
+を計測する。
+
+    python benchmarks/startup_benchmark.py [--workers 4] [--runs 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+# 起動時に読み込まれていないことを確認するモジュール
+DEFERRED_MODULES = ("openpyxl", "numpy", "pandas", "passlib.context", "alembic")
+PHASES = ("import", "connect", "check", "create_all", "deferred")
+
+
+async def measure_worker() -> dict:
+    """1ワーカー分の計測（子プロセスで実行）"""
+    timings = {}
+    started = time.perf_counter()
+    import main  # noqa: F401
+    timings["import"] = time.perf_counter() - started
+    loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+
+    from app.core.database import engine
+    from app.core.migrations import current_revisions, expected_heads
+    from app.core.profiling import QueryCounter
+    from app.models.base import Base
+
+    queries = {}
+    try:
+        started = time.perf_counter()
+        async with engine.connect():
+            pass
+        timings["connect"] = time.perf_counter() - started
+
+        with QueryCounter(engine) as counter:
+            started = time.perf_counter()
+            heads = expected_heads()
+            await current_revisions(engine)
+            timings["check"] = time.perf_counter() - started
+        queries["check"] = counter.count
+
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            with QueryCounter(engine) as counter:
+                started = time.perf_counter()
+                await conn.run_sync(Base.metadata.create_all)
+                timings["create_all"] = time.perf_counter() - started
+            queries["create_all"] = counter.count
+            await transaction.rollback()
+    finally:
+        await engine.dispose()
+
+    started = time.perf_counter()
+    from openpyxl import Workbook  # noqa: F401
+    from app.core.passwords import password_hasher
+    password_hasher.context.handler("bcrypt").get_backend()
+    timings["deferred"] = time.perf_counter() - started
+    password_hasher.shutdown()
+
+    return {"timings": timings, "queries": queries, "loaded": loaded, "heads": len(heads)}
+
+
+def run_workers(workers: int) -> list:
+    """--workers 個の子プロセスを同時に起動し、結果を集める"""
+    processes = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            cwd=BACKEND_DIR,
+            stdout=subprocess.PIPE,
+        )
+        for _ in range(workers)
+    ]
+    results = []
+    for process in processes:
+        stdout, _ = process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"worker exited with {process.returncode}")
+        results.append(json.loads(stdout.decode().strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Worker startup benchmark")
+    parser.add_argument("--workers", type=int, default=4, help="同時に起動するワーカー数")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(measure_worker())))
+        return
+
+    print("IROAS BOSS System - Startup Benchmark")
+    print("=" * 50)
+    print(f"🚀 {args.workers} workers x {args.runs} runs")
+
+    results = []
+    for _ in range(args.runs):
+        results.extend(run_workers(args.workers))
+
+    print(f"{'phase':<11} {'p50 ms':>8} {'max ms':>8} {'queries':>8}")
+    medians = {}
+    for phase in PHASES:
+        values = [result["timings"][phase] * 1000 for result in results]
+        medians[phase] = statistics.median(values)
+        queries = results[0]["queries"].get(phase, "-")
+        print(f"{phase:<11} {medians[phase]:>8.1f} {max(values):>8.1f} {queries:>8}")
+
+    loaded = sorted({name for result in results for name in result["loaded"]})
+    print(f"📦 deferred modules loaded by import main: {', '.join(loaded) or 'none'}")
+    if not results[0]["heads"]:
+        print("⚠️  no Alembic revisions in alembic/versions (check reads alembic_version only)")
+    boot = medians["import"] + medians["connect"] + medians["check"]
+    legacy_boot = medians["import"] + medians["deferred"] + medians["connect"] + medians["create_all"]
+    print(f"⏱️  boot {boot:.0f} ms per worker (previous startup path ~{legacy_boot:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+IROAS BOSS System - Synthetic Trees
+ベンチマーク用の合成会員ツリー生成
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.rewards.tree import (
+    POSITION_LEFT,
+    POSITION_RIGHT,
+    MemberTree,
+    build_tree,
+)
+
+
+def random_binary_tree(size: int, seed: int = 0) -> MemberTree:
+    """
+    ランダムなバイナリーツリー
+    既存ノードの空きポジションに新規会員を順に配置する（スピルオーバー相当）。
+    """
+    rng = np.random.default_rng(seed)
+    parent_ids = np.zeros(size, dtype=np.int64)
+    position = np.zeros(size, dtype=np.int8)
+
+    free_slots = [1 * 2, 1 * 2 + 1]  # member_id * 2 + (0: L, 1: R)
+    picks = rng.random(size)
+    for member_id in range(2, size + 1):
+        pick = int(picks[member_id - 1] * len(free_slots))
+        slot = free_slots[pick]
+        free_slots[pick] = free_slots[-1]
+        free_slots.pop()
+        parent_ids[member_id - 1] = slot // 2
+        position[member_id - 1] = POSITION_RIGHT if slot % 2 else POSITION_LEFT
+        free_slots.append(member_id * 2)
+        free_slots.append(member_id * 2 + 1)
+
+    return build_tree(
+        np.arange(1, size + 1, dtype=np.int64),
+        parent_ids,
+        position,
+        rng.integers(0, 5, size=size) * 10670.0,
+        rng.random(size) < 0.9,
+    )
+
+
+def random_sponsor_tree(size: int, seed: int = 0) -> MemberTree:
+    """
+    ランダムなスポンサーツリー（子の数に上限なし）
+    紹介者は先に登録された会員から選ぶ。
+    """
+    rng = np.random.default_rng(seed)
+    member_ids = np.arange(1, size + 1, dtype=np.int64)
+    # 直近の会員ほど紹介者になりやすい分布（深いツリーを作る）
+    offsets = np.floor(rng.random(size) ** 3 * np.arange(size)).astype(np.int64)
+    parent_ids = np.where(member_ids > 1, member_ids - 1 - offsets, 0)
+
+    return build_tree(
+        member_ids,
+        parent_ids,
+        np.zeros(size, dtype=np.int8),
+        rng.integers(0, 5, size=size) * 10670.0,
+        rng.random(size) < 0.9,
+    )
\ No newline at end of file
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Unilevel Bonus Benchmark
+ユニレベルボーナス計算エンジンの検証・ベンチマーク
+
+合成スポンサーツリーで、配列演算による段別伝播の結果を
+再帰による素朴な参照実装と照合し、計算時間を計測する。
+
+    python benchmarks/unilevel_bonus_benchmark.py [--sizes 10000 100000 1000000] [--depth 7]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.rewards.common import floor_amounts
+from app.services.rewards.tree import MemberTree
+from app.services.rewards.unilevel import compute_unilevel_commissions
+from benchmarks.synthetic_trees import random_sponsor_tree
+
+
+def reference_commissions(tree: MemberTree, rates) -> np.ndarray:
+    """再帰による参照実装（各会員から子を辿って段ごとに加算）"""
+    children = defaultdict(list)
+    for node, parent in enumerate(tree.parent.tolist()):
+        if parent >= 0:
+            children[parent].append(node)
+
+    def downline_commission(node: int, depth: int) -> float:
+        if depth > len(rates):
+            return 0.0
+        total = 0.0
+        for child in children[node]:
+            total += tree.volume[child] * rates[depth - 1]
+            total += downline_commission(child, depth + 1)
+        return total
+
+    return floor_amounts(np.array([downline_commission(node, 1) for node in range(tree.size)]))
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Unilevel bonus engine benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--depth", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rates = [0.05, 0.04, 0.03, 0.02, 0.02, 0.01, 0.01, 0.01, 0.01, 0.01][:args.depth]
+    rates += [0.01] * (args.depth - len(rates))
+
+    print("IROAS BOSS System - Unilevel Bonus Benchmark")
+    print("=" * 50)
+
+    for seed in range(5):
+        sample = random_sponsor_tree(3000, seed=seed)
+        expected = reference_commissions(sample, rates)
+        actual, _ = compute_unilevel_commissions(sample, rates)
+        if not np.allclose(actual, expected):
+            mismatched = int(np.count_nonzero(~np.isclose(actual, expected)))
+            print(f"❌ seed={seed}: {mismatched} members differ from reference implementation")
+            sys.exit(1)
+    print(f"✅ commissions match reference implementation (5 trees x 3,000 members, depth {args.depth})")
+
+    for size in args.sizes:
+        tree = random_sponsor_tree(size, seed=size)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            commissions, _ = compute_unilevel_commissions(tree, rates)
+            timings.append(time.perf_counter() - started)
+
+        best = min(timings)
+        payees = int(np.count_nonzero((commissions > 0) & tree.active))
+        print(
+            f"{size:>9,} members | calculate {best * 1000:9.1f} ms | "
+            f"{size / best:>12,.0f} members/s | payees {payees:,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
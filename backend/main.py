@@ -3,15 +3,25 @@ IROAS BOSS System - FastAPI Main Application
 MLM管理システムのメインエントリーポイント
 """
 
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
 
 from app.api.api_v1.api import api_router
+from app.core.cache import response_cache
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import AsyncSessionLocal, engine, read_engine
 from app.core.logging import setup_logging
+from app.core.migrations import check_migrations
+from app.core.metrics import MetricsMiddleware, pool_collector, register_snapshot, render_metrics
+from app.core.passwords import password_hasher
+from app.core.principals import principal_cache
+from app.core.profiling import QueryProfilingMiddleware
+from app.services.job_handlers import JOB_DEFINITIONS
+from app.services.jobs import JobWorker
 
 
 @asynccontextmanager
@@ -20,14 +30,27 @@ async def lifespan(app: FastAPI):
     # Startup
     setup_logging()
     
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # テーブルは alembic upgrade head で作成する。起動時は head まで移行済みかだけ確認
+    if settings.DB_CHECK_MIGRATIONS:
+        await check_migrations(engine)
+    
+    # 開発用: API プロセス内でジョブを実行（本番は scripts/job_worker.py）
+    worker_stop = asyncio.Event()
+    worker_task = None
+    if settings.JOB_WORKER_IN_PROCESS:
+        worker_task = asyncio.create_task(JobWorker(JOB_DEFINITIONS, AsyncSessionLocal).run(stop=worker_stop))
     
     yield
     
     # Shutdown
+    if worker_task is not None:
+        worker_stop.set()
+        await worker_task
+    await response_cache.close()
+    await principal_cache.close()
+    password_hasher.shutdown()
     await engine.dispose()
+    await read_engine.dispose()
 
 
 app = FastAPI(
@@ -49,10 +72,22 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.BACKEND_CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
     allow_headers=["*"],
 )
 
+# SQL文数・DB時間の計測（本番以外では X-DB-Time / Server-Timing ヘッダーを返す）
+app.add_middleware(QueryProfilingMiddleware)
+
+# Metrics middleware（最も外側で応答時間を測る）
+app.add_middleware(MetricsMiddleware)
+
+pool_collector.register("primary", engine)
+pool_collector.register("read", read_engine)
+register_snapshot("boss_response_cache", response_cache.snapshot)
+register_snapshot("boss_principal_cache", principal_cache.snapshot)
+register_snapshot("boss_password_hashing", password_hasher.snapshot)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -74,4 +109,26 @@ async def health_check():
         "status": "healthy",
         "environment": settings.ENVIRONMENT,
         "version": settings.VERSION
+    }
+
+
+@app.get("/health/cache")
+async def cache_stats():
+    """Response cache hit/miss statistics"""
+    return response_cache.snapshot()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    body, content_type = render_metrics()
+    return Response(body, headers={"Content-Type": content_type})
+
+
+@app.get("/health/auth")
+async def auth_stats():
+    """Principal cache and password hashing queue statistics"""
+    return {
+        "principals": principal_cache.snapshot(),
+        "password_hashing": password_hasher.snapshot(),
     }
\ No newline at end of file
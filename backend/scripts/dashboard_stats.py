@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Dashboard Rollup Maintenance
+ダッシュボード月次集計（monthly_stats）のバックフィル・確認
+
+    python scripts/dashboard_stats.py rebuild
+    python scripts/dashboard_stats.py show [--months 12]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import CACHE_TAG_DASHBOARD, response_cache
+from app.core.database import AsyncSessionLocal, engine
+from app.services.dashboard_stats import get_monthly_snapshots, rebuild_monthly_stats
+
+
+async def rebuild() -> None:
+    """payments・members・rewards から全期間を再集計"""
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        months = await rebuild_monthly_stats(db)
+        await db.commit()
+    await response_cache.invalidate(CACHE_TAG_DASHBOARD)
+    print(f"✅ {months:,} months rebuilt in {time.perf_counter() - started:.1f}s")
+
+
+async def show(months: int) -> None:
+    """直近の月次集計を表示"""
+    async with AsyncSessionLocal() as db:
+        snapshots = await get_monthly_snapshots(db, months=months)
+    print(f"{'month':<8} {'sales':>14} {'payout':>14} {'new':>6} {'left':>6} {'members':>8} {'unpaid':>7}")
+    for s in snapshots:
+        unpaid = "-" if s.unpaid_count is None else f"{s.unpaid_count:,}"
+        print(f"{s.month:%Y-%m}  {s.sales_amount:>14,.0f} {s.reward_payout_amount:>14,.0f} "
+              f"{s.new_members:>6,} {s.withdrawals:>6,} {s.total_members:>8,} {unpaid:>7}")
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Dashboard rollup maintenance")
+    parser.add_argument("command", choices=["rebuild", "show"])
+    parser.add_argument("--months", type=int, default=12, help="表示する月数（show）")
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - Dashboard Rollups")
+    print("=" * 50)
+
+    try:
+        if args.command == "rebuild":
+            await rebuild()
+        else:
+            await show(args.months)
+    finally:
+        await response_cache.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - GMO NetBank Transfer Export
+報酬支払用の総合振込CSVを作成
+
+    python scripts/export_gmo_transfer.py 2025-06 [--output transfer_202507.csv] [--transfer-date 2025-07-05]
+
+CSVの書き出しまで成功した場合のみ gmo_batch_id の付与・繰越を確定する。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import CACHE_TAG_DASHBOARD, response_cache
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import push_job_metrics
+from app.services.gmo_transfer import export_transfer_file
+from app.services.rewards.common import payout_date
+
+
+def parse_period(value: str) -> date:
+    """'YYYY-MM' 形式の報酬対象月"""
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Export GMO NetBank transfer CSV for reward payouts")
+    parser.add_argument("period", type=parse_period, help="報酬対象月 (YYYY-MM)")
+    parser.add_argument("--output", help="出力CSV（既定: TrnsMakeCSV_<振込日>.csv）")
+    parser.add_argument("--transfer-date", type=date.fromisoformat, help="振込日（既定: 対象月の翌月 PAYOUT_DAY 日）")
+    parser.add_argument("--batch-id", help="GMOバッチID（既定: 自動採番）")
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - GMO NetBank Transfer Export")
+    print("=" * 50)
+
+    transfer_date = args.transfer_date or payout_date(args.period)
+    output = args.output or f"TrnsMakeCSV_{transfer_date:%Y%m%d}.csv"
+
+    try:
+        async with AsyncSessionLocal() as db:
+            try:
+                summary = await export_transfer_file(
+                    db,
+                    args.period,
+                    output,
+                    batch_id=args.batch_id,
+                    transfer_date=transfer_date,
+                )
+            except Exception:
+                await db.rollback()
+                raise
+            await db.commit()
+        await response_cache.invalidate(CACHE_TAG_DASHBOARD)
+    finally:
+        push_job_metrics("export_gmo_transfer")
+        await response_cache.close()
+        await engine.dispose()
+
+    print(f"🏦 batch: {summary.batch_id} (transfer date {summary.transfer_date})")
+    print(f"✅ payees:          {summary.payees:,} ({summary.rewards_stamped:,} rewards)")
+    print(f"💴 total amount:    ¥{summary.total_amount:,} (fee ¥{summary.transfer_fee:,} each)")
+    print(f"↪️  carried over:    {summary.rewards_carried_over:,} rewards")
+    if summary.missing_bank_account:
+        print(f"⚠️  missing bank account: {summary.missing_bank_account:,} members (carried over)")
+    print(f"📄 {summary.output_path} ({summary.elapsed_seconds:.1f}s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
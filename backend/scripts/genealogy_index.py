@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Genealogy Index Maintenance
+会員ツリー祖先インデックスの再構築・整合性チェック
+
+    python scripts/genealogy_index.py rebuild [--tree sponsor|upline]
+    python scripts/genealogy_index.py check [--tree sponsor|upline]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.genealogy import TreeType
+from app.services.genealogy import check_genealogy, rebuild_genealogy
+
+
+async def rebuild(tree_types) -> bool:
+    """インデックス再構築"""
+    async with AsyncSessionLocal() as db:
+        for tree_type in tree_types:
+            started = time.perf_counter()
+            paths = await rebuild_genealogy(db, tree_type)
+            print(f"✅ {tree_type}: {paths:,} paths rebuilt in {time.perf_counter() - started:.1f}s")
+        await db.commit()
+    return True
+
+
+async def check(tree_types) -> bool:
+    """整合性チェック"""
+    consistent = True
+    async with AsyncSessionLocal() as db:
+        for tree_type in tree_types:
+            result = await check_genealogy(db, tree_type)
+            if result.is_consistent:
+                print(f"✅ {tree_type}: {result.stored_paths:,} paths consistent")
+                continue
+
+            consistent = False
+            print(f"❌ {tree_type}: expected {result.expected_paths:,} paths, stored {result.stored_paths:,}")
+            print(f"   missing: {result.missing_count:,}, unexpected: {result.unexpected_count:,}")
+            for ancestor_id, descendant_id, depth in result.missing:
+                print(f"   - missing    {ancestor_id} -> {descendant_id} (depth {depth})")
+            for ancestor_id, descendant_id, depth in result.unexpected:
+                print(f"   - unexpected {ancestor_id} -> {descendant_id} (depth {depth})")
+    return consistent
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Genealogy index maintenance")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--tree", choices=[t.value for t in TreeType], help="対象ツリー（省略時は両方）")
+    args = parser.parse_args()
+
+    tree_types = [args.tree] if args.tree else [t.value for t in TreeType]
+    try:
+        ok = await (rebuild(tree_types) if args.command == "rebuild" else check(tree_types))
+    finally:
+        await engine.dispose()
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Master Data Import
+旧BOSSシステム会員マスタCSVの一括取込
+
+    python scripts/import_master_data.py ../CSV/master_data.CSV [--batch-size 1000] [--restart]
+
+中断した場合は同じコマンドを再実行するとチェックポイントから再開する。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import CACHE_TAG_DASHBOARD, CACHE_TAG_MEMBERS, response_cache
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import push_job_metrics
+from app.services.member_import import DEFAULT_BATCH_SIZE, import_master_data
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Import legacy master_data.CSV into members")
+    parser.add_argument("path", help="master_data.CSV のパス")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--checkpoint", help="チェックポイントファイル（既定: <CSV>.checkpoint.json）")
+    parser.add_argument("--errors", help="エラーレポートCSV（既定: <CSV>.errors.csv）")
+    parser.add_argument("--restart", action="store_true", help="チェックポイントを無視して最初から取り込む")
+    args = parser.parse_args()
+
+    checkpoint_path = args.checkpoint or f"{args.path}.checkpoint.json"
+    error_report_path = args.errors or f"{args.path}.errors.csv"
+
+    print("IROAS BOSS System - Master Data Import")
+    print("=" * 50)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            report = await import_master_data(
+                db,
+                args.path,
+                batch_size=args.batch_size,
+                checkpoint_path=checkpoint_path,
+                error_report_path=error_report_path,
+                resume=not args.restart,
+            )
+        await response_cache.invalidate(CACHE_TAG_MEMBERS, CACHE_TAG_DASHBOARD)
+    finally:
+        push_job_metrics("import_master_data")
+        await response_cache.close()
+        await engine.dispose()
+
+    if report.rows_resumed:
+        print(f"↪️  resumed after {report.rows_resumed:,} rows")
+    print(f"📄 rows read:      {report.rows_read:,}")
+    print(f"✅ imported:       {report.rows_imported:,}")
+    print(f"⏭️  already exists: {report.rows_skipped:,}")
+    print(f"❌ invalid:        {report.rows_failed:,}")
+    print(f"🔗 parents linked: {report.parents_linked:,}")
+    print(f"⏱️  {report.elapsed_seconds:.1f}s ({report.rows_per_second:,.0f} rows/s)")
+    if report.rows_failed or report.rows_skipped:
+        print(f"   error report: {report.error_report_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
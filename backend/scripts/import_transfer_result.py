@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Transfer Result Import
+口座振替結果CSVの取込・消込
+
+    python scripts/import_transfer_result.py ../resultCSV/105024_TrnsCSV_20250605053341.csv [--dry-run]
+
+ファイル全体を1トランザクションで反映する（途中でエラーになった場合は何も反映しない）。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import CACHE_TAG_DASHBOARD, response_cache
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import push_job_metrics
+from app.services.payment_reconciliation import ReconciliationSummary, ingest_transfer_result_file
+
+
+def print_summary(summary: ReconciliationSummary) -> None:
+    """消込結果の表示"""
+    print(f"📄 lines:     {summary.lines:,}")
+    print(f"✅ succeeded: {summary.succeeded:,} (¥{summary.succeeded_amount:,.0f})")
+    print(f"❌ failed:    {summary.failed:,} (¥{summary.failed_amount:,.0f})")
+    print(f"❓ unmatched: {summary.unmatched:,}")
+    for line_number, member_code, reason in summary.unmatched_lines:
+        print(f"   - line {line_number}: {member_code or '-'} {reason}")
+    if summary.unmatched > len(summary.unmatched_lines):
+        print(f"   ... and {summary.unmatched - len(summary.unmatched_lines):,} more")
+    print(f"⏱️  {summary.elapsed_seconds:.2f}s")
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Import bank transfer result CSV")
+    parser.add_argument("path", help="振替結果CSVのパス")
+    parser.add_argument("--dry-run", action="store_true", help="消込結果を表示するだけで反映しない")
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - Transfer Result Import")
+    print("=" * 50)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            try:
+                summary = await ingest_transfer_result_file(db, args.path)
+            except Exception:
+                await db.rollback()
+                raise
+            if args.dry_run:
+                await db.rollback()
+            else:
+                await db.commit()
+                await response_cache.invalidate(CACHE_TAG_DASHBOARD)
+    finally:
+        push_job_metrics("import_transfer_result")
+        await response_cache.close()
+        await engine.dispose()
+
+    print_summary(summary)
+    if args.dry_run:
+        print("ℹ️  dry run: nothing was committed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - IPS Card Billing
+IPSカード決済の請求ファイル作成・結果取込
+
+    python scripts/ips_card.py export IPScard_convert_20250605.csv [--due-before 2025-06-05]
+    python scripts/ips_card.py import ../resultCSV/IPScardresult_20250605.csv [--dry-run]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import CACHE_TAG_DASHBOARD, response_cache
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import push_job_metrics
+from app.services.ips_card import export_ips_convert_file, ingest_ips_result_file
+
+
+async def export(args) -> None:
+    """請求ファイル作成"""
+    due_before = None
+    if args.due_before:
+        due_before = datetime.fromisoformat(args.due_before).replace(tzinfo=timezone.utc)
+    async with AsyncSessionLocal() as db:
+        summary = await export_ips_convert_file(db, args.path, due_before=due_before)
+    print(f"✅ {summary.payments:,} payments (¥{summary.total_amount:,.0f})")
+    print(f"📄 {summary.output_path} ({summary.elapsed_seconds:.2f}s)")
+
+
+async def ingest(args) -> None:
+    """結果ファイル取込"""
+    async with AsyncSessionLocal() as db:
+        try:
+            summary = await ingest_ips_result_file(db, args.path)
+        except Exception:
+            await db.rollback()
+            raise
+        if args.dry_run:
+            await db.rollback()
+        else:
+            await db.commit()
+            await response_cache.invalidate(CACHE_TAG_DASHBOARD)
+    print(f"📄 lines:     {summary.lines:,}")
+    print(f"✅ OK:        {summary.succeeded:,} (¥{summary.succeeded_amount:,.0f})")
+    print(f"❌ NG:        {summary.failed:,} (¥{summary.failed_amount:,.0f})")
+    print(f"❓ unmatched: {summary.unmatched:,}")
+    for line_number, member_code, reason in summary.unmatched_lines:
+        print(f"   - line {line_number}: {member_code or '-'} {reason}")
+    print(f"⏱️  {summary.elapsed_seconds:.2f}s")
+    if args.dry_run:
+        print("ℹ️  dry run: nothing was committed")
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="IPS card billing batch")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="請求ファイル作成")
+    export_parser.add_argument("path", help="出力CSVのパス")
+    export_parser.add_argument("--due-before", help="支払期限がこの日時より前の決済のみ (ISO形式)")
+
+    import_parser = subparsers.add_parser("import", help="結果ファイル取込")
+    import_parser.add_argument("path", help="結果CSVのパス")
+    import_parser.add_argument("--dry-run", action="store_true", help="消込結果を表示するだけで反映しない")
+
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - IPS Card Billing")
+    print("=" * 50)
+
+    try:
+        if args.command == "export":
+            await export(args)
+        else:
+            await ingest(args)
+    finally:
+        push_job_metrics("ips_card")
+        await response_cache.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
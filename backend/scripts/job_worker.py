@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+IROAS BOSS System - Job Worker
+バックグラウンドジョブ（報酬計算・振込データ作成・消込）のワーカー
+
+jobs テーブルの実行待ちジョブを登録順に1件ずつ実行する。複数起動した場合も
+同じジョブは1つのワーカーだけが実行する。SIGINT / SIGTERM で実行中のジョブの
+終了後に停止する。
+
+    python scripts/job_worker.py [--once] [--poll-interval 2]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import push_job_metrics
+from app.services.job_handlers import JOB_DEFINITIONS
+from app.services.jobs import JobWorker
+
+
+async def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--once", action="store_true", help="実行待ちのジョブがなくなったら終了する")
+    parser.add_argument("--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL,
+                        help="実行待ちがない場合の確認間隔（秒）")
+    parser.add_argument("--worker-id", help="ワーカー名（既定: ホスト名:PID）")
+    args = parser.parse_args()
+
+    print("IROAS BOSS System - Job Worker")
+    print("=" * 50)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker = JobWorker(
+        JOB_DEFINITIONS,
+        AsyncSessionLocal,
+        worker_id=args.worker_id,
+        poll_interval=args.poll_interval,
+    )
+    print(f"👷 {worker.worker_id}: {', '.join(JOB_DEFINITIONS)}")
+
+    try:
+        executed = await worker.run(stop=stop, once=args.once)
+    finally:
+        push_job_metrics("job_worker")
+        await response_cache.close()
+        await engine.dispose()
+
+    print(f"✅ {executed:,} jobs executed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
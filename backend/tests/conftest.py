@@ -0,0 +1,43 @@
+"""
+IROAS BOSS System - Test Fixtures
+テスト共通フィクスチャ
+
+DB を使うテストは DATABASE_URL の DB（alembic upgrade head 済み）に対して、
+外側のトランザクション内で実行して最後に rollback する（データは変更されない）。
+DB に接続できない・head まで移行されていない場合は skip する。
+"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.database import async_database_url
+from app.core.migrations import SchemaRevisionMismatch, check_migrations
+
+
+@pytest_asyncio.fixture
+async def db_engine():
+    """テスト用エンジン（テストごとにイベントループが変わるため接続はプールしない）"""
+    engine = create_async_engine(async_database_url, poolclass=NullPool)
+    try:
+        await check_migrations(engine)
+    except (OSError, DBAPIError, SchemaRevisionMismatch) as e:
+        await engine.dispose()
+        pytest.skip(f"database not available: {e}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(db_engine) -> AsyncSession:
+    """rollback されるトランザクション内のセッション（commit はセーブポイント）"""
+    async with db_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""
+IROAS BOSS System - Test Data Factories
+DB テスト用の会員データ
+
+会員番号は既存データと衝突しない8100万番台を使う。
+"""
+
+from datetime import datetime
+from typing import Any
+
+from app.models.member import Member
+
+
+MEMBER_CODE_BASE = 81000000
+
+
+def member_code(number: int) -> str:
+    return f"{MEMBER_CODE_BASE + number}"
+
+
+def make_member(number: int, **fields: Any) -> Member:
+    """テスト用の会員（flush は呼び出し側で行う）"""
+    values = {
+        "member_code": member_code(number),
+        "family_name": "検証",
+        "given_name": f"会員{number}",
+        "family_name_kana": "ケンショウ",
+        "given_name_kana": "カイイン",
+        "email": f"test-{MEMBER_CODE_BASE + number}@example.com",
+        "status": "active",
+        "registration_date": datetime(2024, 1, 1),
+    }
+    values.update(fields)
+    return Member(**values)
\ No newline at end of file
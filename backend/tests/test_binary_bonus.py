@@ -0,0 +1,98 @@
+"""
+IROAS BOSS System - Binary Bonus Engine Tests
+左右脚売上・バイナリーボーナスを参照実装（祖先を1ノードずつ辿る）と照合する
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.services.rewards.binary import binary_reward_details, compute_binary_bonus, compute_leg_volumes
+from app.services.rewards.tree import NO_PARENT, POSITION_LEFT, POSITION_NONE, POSITION_RIGHT, build_tree
+from benchmarks.binary_bonus_benchmark import reference_leg_volumes
+from benchmarks.synthetic_trees import random_binary_tree
+
+
+def small_tree():
+    """
+    1
+    ├─L 2
+    │   ├─L 4 (5,000)
+    │   └─R 5 (3,000.50)
+    └─R 3 (7,000)
+        └─(ポジション未設定) 6 (9,999)
+    """
+    return build_tree(
+        member_ids=np.array([1, 2, 3, 4, 5, 6], dtype=np.int64),
+        parent_ids=np.array([0, 1, 1, 2, 2, 3], dtype=np.int64),
+        position=np.array([POSITION_NONE, POSITION_LEFT, POSITION_RIGHT, POSITION_LEFT, POSITION_RIGHT, POSITION_NONE],
+                          dtype=np.int8),
+        volume=np.array([1000.0, 2000.0, 7000.0, 5000.0, 3000.50, 9999.0]),
+        active=np.ones(6, dtype=bool),
+    )
+
+
+def test_leg_volumes_of_small_tree():
+    left, right = compute_leg_volumes(small_tree())
+
+    # ルートの左脚は 2 のサブツリー全体、右脚は 3 のサブツリー（位置未設定の 6 を含む）
+    assert left.tolist() == [10000.50, 5000.0, 0.0, 0.0, 0.0, 0.0]
+    assert right.tolist() == [16999.0, 3000.50, 0.0, 0.0, 0.0, 0.0]
+
+
+@pytest.mark.parametrize("size, seed", [(1, 0), (2, 1), (500, 2), (5000, 3)])
+def test_leg_volumes_match_reference(size, seed):
+    tree = random_binary_tree(size, seed=seed)
+    tree.volume = tree.volume + np.random.default_rng(seed).integers(0, 100, size) / 100
+
+    left, right = compute_leg_volumes(tree)
+    expected_left, expected_right = reference_leg_volumes(tree)
+
+    np.testing.assert_allclose(left, expected_left, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(right, expected_right, rtol=0, atol=1e-6)
+
+
+def test_parent_outside_the_tree_is_a_root():
+    tree = build_tree(
+        member_ids=np.array([10, 11], dtype=np.int64),
+        parent_ids=np.array([99, 10], dtype=np.int64),
+        position=np.array([POSITION_LEFT, POSITION_RIGHT], dtype=np.int8),
+        volume=np.array([100.0, 200.0]),
+        active=np.ones(2, dtype=bool),
+    )
+    assert tree.parent.tolist() == [NO_PARENT, 0]
+
+    left, right = compute_leg_volumes(tree)
+    assert left.tolist() == [0.0, 0.0]
+    assert right.tolist() == [200.0, 0.0]
+
+
+def test_cycle_is_rejected():
+    tree = build_tree(
+        member_ids=np.array([1, 2, 3], dtype=np.int64),
+        parent_ids=np.array([0, 3, 2], dtype=np.int64),
+        position=np.array([POSITION_NONE, POSITION_LEFT, POSITION_LEFT], dtype=np.int8),
+        volume=np.zeros(3),
+        active=np.ones(3, dtype=bool),
+    )
+    with pytest.raises(ValueError, match="cycle"):
+        compute_leg_volumes(tree)
+
+
+def test_bonus_is_weak_leg_times_rate_floored():
+    left = np.array([10000.50, 5000.0, 0.0, 333.0])
+    right = np.array([16999.0, 3000.50, 100.0, 1000.0])
+
+    # 0.1 倍の浮動小数点誤差（333 * 0.1 = 33.300000000000004 等）で1円ずれない
+    assert compute_binary_bonus(left, right, 0.1).tolist() == [1000.0, 300.0, 0.0, 33.0]
+
+
+def test_reward_details():
+    details = binary_reward_details(Decimal("10000.50"), Decimal("16999"), 0.1)
+    assert details == {
+        "left_leg_sales": 10000.5,
+        "right_leg_sales": 16999.0,
+        "weak_leg_sales": 10000.5,
+        "bonus_rate": 0.1,
+    }
\ No newline at end of file
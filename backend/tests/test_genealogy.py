@@ -0,0 +1,113 @@
+"""
+IROAS BOSS System - Genealogy Index Tests
+クロージャテーブル（member_tree_paths）の登録・サブツリー移動・再構築
+"""
+
+import pytest
+from sqlalchemy import select
+
+from app.models.genealogy import MemberTreePath, TreeType
+from app.models.member import Member
+from app.services.genealogy import check_genealogy, index_new_member, move_member, rebuild_genealogy
+from tests.factories import make_member
+
+
+pytestmark = pytest.mark.asyncio
+
+SPONSOR = TreeType.SPONSOR.value
+UPLINE = TreeType.UPLINE.value
+
+
+async def add_member(db, number: int, parent=None, index: bool = True) -> Member:
+    """紹介者・直上者とも parent の会員を登録（index=False ならインデックスに入れない）"""
+    parent_id = parent.id if parent is not None else None
+    member = make_member(number, sponsor_id=parent_id, upline_id=parent_id)
+    db.add(member)
+    await db.flush()
+    if index:
+        await index_new_member(db, member)
+    return member
+
+
+async def ancestors(db, tree_type: str, member: Member) -> dict:
+    """祖先の会員ID -> 階層差（自分自身は 0）"""
+    result = await db.execute(
+        select(MemberTreePath.ancestor_id, MemberTreePath.depth).where(
+            MemberTreePath.tree_type == tree_type,
+            MemberTreePath.descendant_id == member.id,
+        )
+    )
+    return dict(result.all())
+
+
+async def test_index_new_member_adds_paths_to_every_ancestor(db):
+    root = await add_member(db, 8500)
+    child = await add_member(db, 8501, root)
+    grandchild = await add_member(db, 8502, child)
+
+    for tree_type in (SPONSOR, UPLINE):
+        assert await ancestors(db, tree_type, grandchild) == {grandchild.id: 0, child.id: 1, root.id: 2}
+        assert await ancestors(db, tree_type, root) == {root.id: 0}
+    level = (await db.execute(select(Member.organization_level).where(Member.id == grandchild.id))).scalar()
+    assert level == 3
+
+
+async def test_move_member_moves_whole_subtree(db):
+    root = await add_member(db, 8510)
+    moved = await add_member(db, 8511, root)
+    child = await add_member(db, 8512, moved)
+    grandchild = await add_member(db, 8513, child)
+    sibling = await add_member(db, 8514, moved)
+    new_root = await add_member(db, 8515)
+    new_parent = await add_member(db, 8516, new_root)
+
+    await move_member(db, SPONSOR, moved.id, new_parent.id)
+
+    assert await ancestors(db, SPONSOR, moved) == {moved.id: 0, new_parent.id: 1, new_root.id: 2}
+    assert await ancestors(db, SPONSOR, child) == {child.id: 0, moved.id: 1, new_parent.id: 2, new_root.id: 3}
+    assert await ancestors(db, SPONSOR, grandchild) == {
+        grandchild.id: 0, child.id: 1, moved.id: 2, new_parent.id: 3, new_root.id: 4,
+    }
+    assert await ancestors(db, SPONSOR, sibling) == {sibling.id: 0, moved.id: 1, new_parent.id: 2, new_root.id: 3}
+    # 移動していないツリーはそのまま
+    assert await ancestors(db, UPLINE, grandchild) == {grandchild.id: 0, child.id: 1, moved.id: 2, root.id: 3}
+
+
+async def test_move_member_to_top(db):
+    root = await add_member(db, 8520)
+    moved = await add_member(db, 8521, root)
+    child = await add_member(db, 8522, moved)
+
+    await move_member(db, SPONSOR, moved.id, None)
+
+    assert await ancestors(db, SPONSOR, moved) == {moved.id: 0}
+    assert await ancestors(db, SPONSOR, child) == {child.id: 0, moved.id: 1}
+
+
+async def test_move_under_own_downline_is_rejected(db):
+    root = await add_member(db, 8530)
+    child = await add_member(db, 8531, root)
+    grandchild = await add_member(db, 8532, child)
+
+    with pytest.raises(ValueError, match="own downline"):
+        await move_member(db, SPONSOR, root.id, grandchild.id)
+    with pytest.raises(ValueError, match="own downline"):
+        await move_member(db, SPONSOR, child.id, child.id)
+
+    assert await ancestors(db, SPONSOR, grandchild) == {grandchild.id: 0, child.id: 1, root.id: 2}
+
+
+async def test_rebuild_matches_parent_columns(db):
+    root = await add_member(db, 8540, index=False)
+    child = await add_member(db, 8541, root, index=False)
+    await add_member(db, 8542, child, index=False)
+
+    for tree_type in (SPONSOR, UPLINE):
+        assert (await check_genealogy(db, tree_type)).missing_count > 0
+
+        created = await rebuild_genealogy(db, tree_type)
+        check = await check_genealogy(db, tree_type)
+
+        assert created == check.expected_paths == check.stored_paths
+        assert (check.missing_count, check.unexpected_count) == (0, 0)
+        assert (check.missing, check.unexpected) == ([], [])
\ No newline at end of file
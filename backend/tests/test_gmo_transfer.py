@@ -0,0 +1,153 @@
+"""
+IROAS BOSS System - GMO NetBank Transfer File Tests
+総合振込CSVの行レイアウト・振込用半角カナ変換・支払対象の判定と繰越の確認
+"""
+
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.reward import Reward, RewardStatus, RewardType
+from app.services.gmo_transfer import TRANSFER_FILE_ENCODING, export_transfer_file, to_bank_kana, transfer_row
+from app.services.rewards.common import build_reward_row
+from tests.factories import make_member, member_code
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("ヤマダ　タロウ", "ﾔﾏﾀﾞ ﾀﾛｳ"),
+    ("やまだ たろう", "ﾔﾏﾀﾞ ﾀﾛｳ"),
+    ("ショウ", "ｼﾖｳ"),
+    ("ジーエムオー", "ｼﾞ-ｴﾑｵ-"),
+    ("パピプ", "ﾊﾟﾋﾟﾌﾟ"),
+    ("ヴィ", "ｳﾞｲ"),
+    ("ｶﾌﾞｼｷｶﾞｲｼｬ", "ｶﾌﾞｼｷｶﾞｲｼﾔ"),
+    ("カ）イロアス", "ｶ)ｲﾛｱｽ"),
+    ("abc", "ABC"),
+    ("  ", ""),
+    (None, ""),
+])
+def test_to_bank_kana(value, expected):
+    assert to_bank_kana(value) == expected
+
+
+def test_transfer_row_layout():
+    row = transfer_row(
+        member_id=12,
+        member_code="0000123",
+        bank_code="0310",
+        bank_name="ジーエムオーアオゾラネット",
+        branch_code="101",
+        account_type="当座",
+        account_number=" 1234567 ",
+        account_holder=None,
+        family_name_kana="ヤマダ",
+        given_name_kana="タロウ",
+        amount=5000,
+    )
+
+    # 数字のみの項目は先頭0を落とし、口座名義が未登録なら氏名カナを使う
+    assert row == [12, 123, 310, "ｼﾞ-ｴﾑｵ-ｱｵｿﾞﾗﾈﾂﾄ", 101, 2, "1234567", "ﾔﾏﾀﾞﾀﾛｳ", 5000]
+
+
+def test_transfer_row_keeps_non_numeric_codes_and_defaults_to_ordinary_account():
+    row = transfer_row(13, "A0012", "0310", None, "101", None, "7654321", "カ）イロアス", None, None, 1)
+
+    assert row == [13, "A0012", 310, "", 101, 1, "7654321", "ｶ)ｲﾛｱｽ", 1]
+
+
+def test_transfer_row_is_written_as_cp932_crlf():
+    row = transfer_row(12, "0000123", "0310", "ジーエムオーアオゾラネット", "101", "普通", "1234567",
+                       "ヤマダ　タロウ", None, None, 5000)
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\r\n").writerow(row)
+
+    encoded = buffer.getvalue().encode(TRANSFER_FILE_ENCODING)
+    assert encoded == "12,123,310,ｼﾞ-ｴﾑｵ-ｱｵｿﾞﾗﾈﾂﾄ,101,1,1234567,ﾔﾏﾀﾞ ﾀﾛｳ,5000\r\n".encode("cp932")
+    # 半角カナは cp932 で1バイト
+    assert len(encoded) == len(buffer.getvalue())
+
+def _reward(member_id: int, period: date, amount: int, status: str = RewardStatus.CALCULATED.value) -> Reward:
+    row = build_reward_row(member_id, period, RewardType.BINARY_BONUS.value, Decimal(amount), {})
+    return Reward(**{**row, "status": status})
+
+
+async def _export(db, tmp_path, monkeypatch, period: date, batch_id: str):
+    monkeypatch.setattr(settings, "MINIMUM_PAYOUT_AMOUNT", 5000)
+    monkeypatch.setattr(settings, "GMO_TRANSFER_FEE", 0)
+    path = tmp_path / f"{batch_id}.csv"
+    summary = await export_transfer_file(db, period, str(path), batch_id=batch_id)
+    with open(path, encoding=TRANSFER_FILE_ENCODING, newline="") as f:
+        rows = list(csv.reader(f))
+    assert summary.payees == len(rows)
+    assert summary.total_amount == sum(int(row[-1]) for row in rows)
+    # DB に既存の報酬があってもよいよう、このテストの会員の行だけを返す
+    return summary, {row[1]: row for row in rows if row[1].startswith("8100")}
+
+
+@pytest.mark.asyncio
+async def test_export_pays_closed_rewards_and_carries_over_the_rest(db, tmp_path, monkeypatch):
+    bank_account = dict(
+        bank_code="0310", bank_name="ジーエムオーアオゾラネット", branch_code="101",
+        account_type="普通", account_number="1234567",
+    )
+    payee = make_member(1, **bank_account, account_holder="ヤマダ　タロウ")
+    no_account = make_member(2)
+    below_minimum = make_member(3, **bank_account)
+    db.add_all([payee, no_account, below_minimum])
+    await db.flush()
+
+    january, february = date(2024, 1, 1), date(2024, 2, 1)
+    db.add_all([
+        _reward(payee.id, january, 6000),
+        _reward(payee.id, january, 1500),
+        _reward(no_account.id, january, 8000),
+        _reward(below_minimum.id, january, 3000),
+        _reward(payee.id, february, 9000),         # 対象月より後は含めない
+    ])
+    await db.flush()
+
+    summary, rows = await _export(db, tmp_path, monkeypatch, january, "GMO-TEST-01")
+
+    assert rows == {
+        member_code(1): ["%d" % payee.id, member_code(1), "310", "ｼﾞ-ｴﾑｵ-ｱｵｿﾞﾗﾈﾂﾄ", "101", "1", "1234567",
+                         "ﾔﾏﾀﾞ ﾀﾛｳ", "7500"],
+    }
+    assert summary.missing_bank_account >= 1
+
+    rewards = (await db.execute(
+        select(Reward.member_id, Reward.reward_period, Reward.status, Reward.gmo_batch_id)
+        .where(Reward.member_id.in_([payee.id, no_account.id, below_minimum.id]))
+        .order_by(Reward.member_id, Reward.reward_period, Reward.id)
+    )).all()
+    assert [tuple(reward[1:]) for reward in rewards] == [
+        (january, RewardStatus.APPROVED.value, "GMO-TEST-01"),
+        (january, RewardStatus.APPROVED.value, "GMO-TEST-01"),
+        (february, RewardStatus.CALCULATED.value, None),
+        (january, RewardStatus.CARRIED_OVER.value, None),
+        (january, RewardStatus.CARRIED_OVER.value, None),
+    ]
+
+    # 翌月: 繰越分は当月分と合算して支払う（口座を登録した会員・最低支払額に達した会員）
+    no_account.bank_code, no_account.branch_code, no_account.account_number = "0005", "001", "7654321"
+    db.add(_reward(below_minimum.id, february, 2000))
+    await db.flush()
+
+    summary, rows = await _export(db, tmp_path, monkeypatch, february, "GMO-TEST-02")
+
+    assert {code: row[-1] for code, row in rows.items()} == {
+        member_code(1): "9000",
+        member_code(2): "8000",
+        member_code(3): "5000",
+    }
+    unpaid = (await db.execute(
+        select(func.count()).select_from(Reward).where(
+            Reward.member_id.in_([payee.id, no_account.id, below_minimum.id]),
+            Reward.gmo_batch_id.is_(None),
+        )
+    )).scalar()
+    assert unpaid == 0
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+IROAS BOSS System - Incremental Reward Recalculation Tests
+締め後の変更に対する差分再計算の結果を全体再計算と照合する
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.member import MemberStatus
+from app.models.payment import Payment, PaymentMethod, PaymentStatus
+from app.models.reward import Reward, RewardStatus, RewardType
+from app.services.genealogy import index_new_member
+from app.services.rewards.binary import calculate_binary_bonus
+from app.services.rewards.incremental import recalculate_rewards
+from app.services.rewards.unilevel import calculate_unilevel_bonus
+from tests.factories import make_member
+
+
+pytestmark = pytest.mark.asyncio
+
+PERIOD = date(2031, 3, 1)
+RATE = 0.1
+LEVEL_RATES = [0.1, 0.05, 0.03]
+
+# 番号 -> (親の番号, 左右, 累計売上)。紹介者・直上者とも同じ親
+#         1
+#      2     3
+#    4   5  6  7
+#   8
+TREE = {
+    1: (None, None, 100000),
+    2: (1, "L", 200000),
+    3: (1, "R", 150000),
+    4: (2, "L", 50000),
+    5: (2, "R", 80000),
+    6: (3, "L", 60000),
+    7: (3, "R", 30000),
+    8: (4, "L", 40000),
+}
+
+
+def completed_payment(member_id: int, amount: int) -> Payment:
+    return Payment(
+        member_id=member_id,
+        amount=Decimal(amount),
+        payment_method=PaymentMethod.CREDIT_CARD.value,
+        status=PaymentStatus.COMPLETED.value,
+        payment_date=datetime(2031, 3, 15, tzinfo=timezone.utc),
+    )
+
+
+async def create_tree(db) -> dict:
+    members = {}
+    for number, (parent, position, total_sales) in TREE.items():
+        parent_id = members[parent].id if parent else None
+        member = make_member(
+            8300 + number,
+            sponsor_id=parent_id,
+            upline_id=parent_id,
+            binary_position=position,
+            total_sales=Decimal(total_sales),
+        )
+        db.add(member)
+        await db.flush()
+        await index_new_member(db, member)
+        members[number] = member
+    return members
+
+
+async def reward_totals(db, member_ids) -> dict:
+    """(報酬種別, 会員ID) -> キャンセル以外の手取り額の合計（0 は除く）"""
+    result = await db.execute(
+        select(Reward.reward_type, Reward.member_id, func.sum(Reward.net_amount))
+        .where(
+            Reward.reward_period == PERIOD,
+            Reward.status != RewardStatus.CANCELLED.value,
+            Reward.member_id.in_(member_ids),
+        )
+        .group_by(Reward.reward_type, Reward.member_id)
+    )
+    return {(reward_type, member_id): total for reward_type, member_id, total in result if total != 0}
+
+
+async def close_period(db) -> None:
+    await calculate_binary_bonus(db, PERIOD, rate=RATE, workers=1)
+    await calculate_unilevel_bonus(db, PERIOD, rates=LEVEL_RATES)
+
+
+async def test_recalculation_matches_full_close(db):
+    members = await create_tree(db)
+    member_ids = [member.id for member in members.values()]
+    payments = {number: completed_payment(member.id, 10000 * number) for number, member in members.items()}
+    db.add_all(payments.values())
+    await db.flush()
+
+    await close_period(db)
+    closed = await reward_totals(db, member_ids)
+
+    # 締め後の変更: 休会・返金・累計売上の修正・追加の決済
+    members[2].status = MemberStatus.SUSPENDED.value
+    payments[8].status = PaymentStatus.REFUNDED.value
+    members[7].total_sales = Decimal(100000)
+    db.add(completed_payment(members[6].id, 25000))
+    await db.flush()
+    changed = [members[number].id for number in (2, 8, 7, 6)]
+
+    summary = await recalculate_rewards(db, PERIOD, changed, rate=RATE, rates=LEVEL_RATES)
+
+    assert summary.adjustments_created > 0
+    recalculated = await reward_totals(db, member_ids)
+    assert recalculated != closed
+    assert (RewardType.BINARY_BONUS.value, members[2].id) not in recalculated
+    # 再計算は変更会員と祖先（5 以外）。集計で読むのは 5 を含むツリーの全員で、各会員1回ずつ数える
+    assert summary.binary.members_recalculated == len(TREE) - 1
+    assert summary.unilevel.members_recalculated == len(TREE) - 1
+    assert summary.binary.nodes_touched == len(TREE)
+    assert summary.unilevel.nodes_touched == len(TREE)
+
+    # 同じ変更での再実行は差額がないため調整行を作らない
+    rows = (await db.execute(select(func.count()).select_from(Reward))).scalar()
+    rerun = await recalculate_rewards(db, PERIOD, changed, rate=RATE, rates=LEVEL_RATES)
+    assert rerun.adjustments_created == 0
+    assert (await db.execute(select(func.count()).select_from(Reward))).scalar() == rows
+    assert rerun.binary.adjustment_total == 0 and rerun.unilevel.adjustment_total == 0
+
+    # 全体再計算（計算済みの行を置き換える）と会員ごとの合計が一致する
+    await close_period(db)
+    assert await reward_totals(db, member_ids) == recalculated
+
+
+async def test_recalculation_requires_closed_period(db):
+    members = await create_tree(db)
+
+    with pytest.raises(ValueError, match="has not been calculated"):
+        await recalculate_rewards(db, date(2031, 4, 1), [members[8].id], rate=RATE, rates=LEVEL_RATES)
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+IROAS BOSS System - IPS Card Billing File Tests
+IPSカード請求ファイル・結果ファイルの形式の確認
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models.member import Member
+from app.models.payment import Payment, PaymentMethod, PaymentStatus
+from app.services.ips_card import IPS_FILE_ENCODING, export_ips_convert_file, order_number, parse_ips_result_file
+
+
+RESULT_HEADER = "IPS決済番号,検索種別,店舗側オーダー番号,電話番号,メールアドレス,金額(税込),送料,処理結果コード,決済結果"
+
+
+@pytest.mark.parametrize("member_code, expected", [
+    ("0000123", "00000000123"),
+    ("123", "00000000123"),
+    (" 81000001 ", "00081000001"),
+    ("A12", "00000000A12"),
+])
+def test_order_number(member_code, expected):
+    assert order_number(member_code) == expected
+
+
+def test_parse_result_file(tmp_path):
+    path = tmp_path / "IPScardresult_20240131.csv"
+    path.write_bytes("\r\n".join([
+        RESULT_HEADER,
+        "IPS0001,1,00000000123,0312345678,a@example.com,\"10,670\",0,000,OK",
+        "IPS0002,1,00000000124,,,5335,0,G12,ng",
+        ",1,,,,abc,0,,NG",
+    ]).encode(IPS_FILE_ENCODING))
+
+    first, second, third = parse_ips_result_file(str(path))
+
+    assert (first.line_number, first.member_code, first.amount, first.succeeded) == (2, "0000123", Decimal(10670), True)
+    assert (first.external_transaction_id, first.error_code, first.error_message) == ("IPS0001", None, None)
+
+    assert (second.member_code, second.amount, second.succeeded) == ("0000124", Decimal(5335), False)
+    assert (second.error_code, second.error_message) == ("G12", "IPS決済結果NG")
+
+    # 会員番号・金額の不正な行は消込側で未消込にする
+    assert (third.line_number, third.member_code, third.amount, third.external_transaction_id) == (4, None, None, None)
+
+
+@pytest.mark.asyncio
+async def test_convert_file_bills_oldest_pending_card_payment_per_member(db, tmp_path):
+    now = datetime.utcnow()
+    members = [
+        Member(member_code=code, family_name="検証", given_name="会員", email=f"ips-{code}@example.com",
+               registration_date=now)
+        for code in ("81009001", "81009002")
+    ]
+    db.add_all(members)
+    await db.flush()
+    db.add_all([
+        Payment(member_id=members[0].id, amount=Decimal("10670"), payment_method=PaymentMethod.CREDIT_CARD.value,
+                due_date=now + timedelta(days=1)),
+        Payment(member_id=members[0].id, amount=Decimal("5335"), payment_method=PaymentMethod.CREDIT_CARD.value,
+                due_date=now + timedelta(days=2)),
+        Payment(member_id=members[1].id, amount=Decimal("21340"), payment_method=PaymentMethod.BANK_TRANSFER.value),
+        Payment(member_id=members[1].id, amount=Decimal("3000"), payment_method=PaymentMethod.CREDIT_CARD.value,
+                status=PaymentStatus.COMPLETED.value),
+    ])
+    await db.flush()
+
+    path = tmp_path / "IPScard_convert.csv"
+    summary = await export_ips_convert_file(db, str(path))
+
+    # DB に既存の決済があってもよいよう、このテストの会員の行だけを見る
+    lines = path.read_bytes().split(b"\r\n")
+    assert lines[-1] == b""
+    ours = [line for line in lines if b'"0008100900' in line]
+    assert ours == ['"3","00081009001","10670","JPY"'.encode(IPS_FILE_ENCODING)]
+    assert summary.payments == len(lines) - 1
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+IROAS BOSS System - Member Bulk Operation Tests
+会員一括登録・一括更新の行ごとの検証とツリー移動
+"""
+
+import pytest
+from sqlalchemy import select
+
+from app.models.genealogy import TreeType
+from app.models.member import Member, MemberStatus
+from app.services.genealogy import get_depth
+from app.services.member_bulk import RESULT_CREATED, RESULT_ERROR, RESULT_UPDATED, bulk_create_members, bulk_update_members
+from tests.factories import MEMBER_CODE_BASE, make_member, member_code
+
+
+pytestmark = pytest.mark.asyncio
+
+MISSING_ID = 2**31 - 1
+
+
+def item(number: int, **fields) -> dict:
+    values = {
+        "member_code": member_code(number),
+        "family_name": "一括",
+        "given_name": f"会員{number}",
+        "email": f"bulk-{MEMBER_CODE_BASE + number}@example.com",
+    }
+    values.update(fields)
+    return values
+
+
+async def load(db, member_id: int):
+    result = await db.execute(
+        select(
+            Member.status, Member.is_active, Member.organization_level, Member.sponsor_id, Member.email,
+            Member.activation_date, Member.suspension_date, Member.withdrawal_date,
+        ).where(Member.id == member_id)
+    )
+    return result.one()
+
+
+async def create_line(db, first: int, length: int) -> list:
+    """紹介者・直上者とも1本の系列（先頭が最上位）を一括登録して会員IDを返す"""
+    ids = []
+    for number in range(first, first + length):
+        parent = ids[-1] if ids else None
+        report = await bulk_create_members(db, [item(number, sponsor_id=parent, upline_id=parent)])
+        ids.append(report.results[0].id)
+    return ids
+
+
+async def test_bulk_create_reports_each_row(db):
+    existing = make_member(8200, email="bulk-existing@example.com")
+    db.add(existing)
+    await db.flush()
+
+    report = await bulk_create_members(db, [
+        item(8201),
+        item(8201, email="bulk-other@example.com"),
+        item(8202, email=item(8201)["email"]),
+        item(8200, email="bulk-new@example.com"),
+        item(8203, email="bulk-existing@example.com"),
+        item(8204, sponsor_id=MISSING_ID),
+        item(8205, upline_id=MISSING_ID),
+        {"member_code": member_code(8206), "family_name": "一括"},
+        item(8207, sponsor_id=existing.id, upline_id=existing.id),
+    ])
+
+    assert [(result.index, result.status) for result in report.results] == [
+        (0, RESULT_CREATED),
+        (1, RESULT_ERROR),
+        (2, RESULT_ERROR),
+        (3, RESULT_ERROR),
+        (4, RESULT_ERROR),
+        (5, RESULT_ERROR),
+        (6, RESULT_ERROR),
+        (7, RESULT_ERROR),
+        (8, RESULT_CREATED),
+    ]
+    errors = [result.error for result in report.results]
+    assert errors[1] == "Duplicate member code in request"
+    assert errors[2] == "Duplicate email in request"
+    assert errors[3] == "Member code already exists"
+    assert errors[4] == "Email already exists"
+    assert errors[5] == "Sponsor not found"
+    assert errors[6] == "Upline not found"
+    assert "email" in errors[7]
+    assert (report.succeeded, report.failed) == (2, 7)
+
+    child = await load(db, report.results[8].id)
+    assert child.status == MemberStatus.PENDING.value
+    assert child.organization_level == existing.organization_level + 1
+    assert await get_depth(db, TreeType.SPONSOR.value, report.results[8].id, report.results[8].id) == 0
+
+
+async def test_bulk_create_indexes_new_members_under_their_parents(db):
+    root, child, grandchild = await create_line(db, 8210, 3)
+
+    for tree_type in (TreeType.SPONSOR.value, TreeType.UPLINE.value):
+        assert await get_depth(db, tree_type, root, grandchild) == 2
+        assert await get_depth(db, tree_type, child, grandchild) == 1
+    assert (await load(db, grandchild)).organization_level == (await load(db, root)).organization_level + 2
+
+
+async def test_bulk_update_reports_each_row(db):
+    root, child, grandchild, leaf = await create_line(db, 8220, 4)
+    other, = await create_line(db, 8230, 1)
+    another, = await create_line(db, 8231, 1)
+
+    report = await bulk_update_members(db, [
+        {"id": root, "sponsor_id": grandchild},
+        {"id": child, "status": MemberStatus.SUSPENDED.value},
+        {"id": child, "status": MemberStatus.ACTIVE.value},
+        {"id": MISSING_ID, "status": MemberStatus.ACTIVE.value},
+        {"id": leaf, "email": item(8230)["email"]},
+        {"id": other, "upline_id": MISSING_ID},
+        {"id": another, "family_name": None},
+        {"id": grandchild, "status": MemberStatus.WITHDRAWN.value},
+    ])
+
+    assert [(result.index, result.status, result.error) for result in report.results] == [
+        (0, RESULT_ERROR, "Cannot move a member under its own downline"),
+        (1, RESULT_UPDATED, None),
+        (2, RESULT_ERROR, "Duplicate id in request"),
+        (3, RESULT_ERROR, "Member not found"),
+        (4, RESULT_ERROR, "Email already exists"),
+        (5, RESULT_ERROR, "Upline not found"),
+        (6, RESULT_ERROR, "family_name: may not be null"),
+        (7, RESULT_UPDATED, None),
+    ]
+
+    # 循環になる移動はセーブポイントで取り消され、ツリーは元のまま
+    assert (await load(db, root)).sponsor_id is None
+    assert await get_depth(db, TreeType.SPONSOR.value, root, grandchild) == 2
+    assert await get_depth(db, TreeType.SPONSOR.value, grandchild, root) is None
+
+    suspended = await load(db, child)
+    assert suspended.status == MemberStatus.SUSPENDED.value
+    assert suspended.suspension_date is not None
+    assert suspended.activation_date is None and suspended.withdrawal_date is None
+    assert suspended.is_active is True
+
+    withdrawn = await load(db, grandchild)
+    assert withdrawn.status == MemberStatus.WITHDRAWN.value
+    assert withdrawn.withdrawal_date is not None
+    assert withdrawn.suspension_date is None
+    assert withdrawn.is_active is False
+    assert (await load(db, leaf)).email == item(8223)["email"]
+
+
+async def test_bulk_update_moves_subtree(db):
+    root, child, grandchild = await create_line(db, 8240, 3)
+    other, = await create_line(db, 8250, 1)
+
+    report = await bulk_update_members(db, [
+        {"id": child, "sponsor_id": other},
+        {"id": grandchild, "given_name": "変更"},
+    ])
+
+    assert report.failed == 0
+    assert await get_depth(db, TreeType.SPONSOR.value, other, grandchild) == 2
+    assert await get_depth(db, TreeType.SPONSOR.value, root, child) is None
+    # upline は変更していない
+    assert await get_depth(db, TreeType.UPLINE.value, root, grandchild) == 2
+    assert (await load(db, grandchild)).organization_level == (await load(db, other)).organization_level + 2
\ No newline at end of file
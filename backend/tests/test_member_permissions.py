@@ -0,0 +1,53 @@
+"""
+IROAS BOSS System - Member Endpoint Permission Tests
+口座情報を含むエクスポート・一括登録/更新は管理者のみ
+"""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.api_v1.endpoints.auth import get_current_active_user
+from app.api.api_v1.endpoints.members import router as members_router
+from app.core.principals import Principal
+from app.models.user import UserRole
+
+
+pytestmark = pytest.mark.asyncio
+
+
+def principal(role: str) -> Principal:
+    return Principal(id=1, email=f"{role}@example.com", full_name=role, role=role, is_active=True)
+
+
+async def request(method: str, url: str, role=None, **kwargs) -> httpx.Response:
+    """role 指定時はそのユーザーとして、未指定ならトークンなしで送る（DB には届かない）"""
+    app = FastAPI()
+    app.include_router(members_router, prefix="/members")
+    if role is not None:
+        app.dependency_overrides[get_current_active_user] = lambda: principal(role)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.request(method, url, **kwargs)
+
+
+@pytest.mark.parametrize("method, url, body", [
+    ("GET", "/members/export", None),
+    ("POST", "/members/bulk", []),
+    ("PATCH", "/members/bulk", []),
+])
+async def test_requires_authentication(method, url, body):
+    response = await request(method, url, json=body)
+
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize("role", [UserRole.OPERATOR.value, UserRole.VIEWER.value])
+@pytest.mark.parametrize("method, url, body", [
+    ("GET", "/members/export", None),
+    ("POST", "/members/bulk", []),
+    ("PATCH", "/members/bulk", []),
+])
+async def test_requires_admin(method, url, body, role):
+    response = await request(method, url, role=role, json=body)
+
+    assert response.status_code == 403
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+IROAS BOSS System - Member Endpoint Query Count Tests
+会員 API の1リクエストあたりのSQL文数が件数に依存しない（N+1 がない）ことの確認
+
+会員数・取得件数・一括処理の件数を変えて同じリクエストを実行し、発行された
+SQL文の数が一致することを確認する。あわせて、会員のリレーションが暗黙に
+遅延ロードされない（lazy="raise_on_sql"）ことを確認する。
+"""
+
+import random
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.api.api_v1.endpoints.auth import get_current_active_user
+from app.api.api_v1.endpoints.members import router as members_router
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.principals import Principal
+from app.core.profiling import QueryCounter
+from app.models.member import Member
+from app.models.user import UserRole
+
+
+pytestmark = pytest.mark.asyncio
+
+# 会員番号は既存データと衝突しない8100万番台
+MEMBER_CODE_BASE = 81000000
+
+SMALL = 20
+SCALE = 10
+
+
+def member_item(number: int, sponsor_id=None) -> dict:
+    """一括登録の1件"""
+    return {
+        "member_code": f"{MEMBER_CODE_BASE + number}",
+        "family_name": "検証",
+        "given_name": f"会員{number}",
+        "family_name_kana": "ケンショウ",
+        "given_name_kana": "カイイン",
+        "email": f"query-count-{number}@example.com",
+        "sponsor_id": sponsor_id,
+        "upline_id": sponsor_id,
+    }
+
+
+class Scenario:
+    """会員 members 人・1リクエストの件数 items 件でのリクエスト群"""
+
+    def __init__(self, client: httpx.AsyncClient, members: int, items: int):
+        self.client = client
+        self.members = members
+        self.items = items
+        self.random = random.Random(1)
+        self.next_number = 0
+        self.root_id = None
+        self.member_ids = []
+
+    def new_items(self, count: int, sponsor_ids) -> list:
+        items = []
+        for _ in range(count):
+            items.append(member_item(self.next_number, self.random.choice(sponsor_ids) if sponsor_ids else None))
+            self.next_number += 1
+        return items
+
+    async def bulk_create(self, items: list) -> list:
+        response = await self.client.post("/members/bulk", json=items)
+        response.raise_for_status()
+        return [result["id"] for result in response.json()["results"]]
+
+    async def seed(self) -> None:
+        """ルート1人 + その下のスポンサー層 + 残りはスポンサー層の誰かの下"""
+        self.root_id, = await self.bulk_create(self.new_items(1, None))
+        sponsors = await self.bulk_create(self.new_items(max(1, self.members // 10), [self.root_id]))
+        others = await self.bulk_create(self.new_items(self.members - len(sponsors) - 1, sponsors))
+        self.member_ids = sponsors + others
+
+    def requests(self):
+        """名前 -> リクエストを送るコルーチン関数"""
+        member_id = self.member_ids[-1]
+        return {
+            "GET /members (full)": lambda: self.client.get("/members/", params={"limit": self.members}),
+            "GET /members (summary)": lambda: self.client.get(
+                "/members/", params={"limit": self.members, "view": "summary"}
+            ),
+            "GET /members (search)": lambda: self.client.get(
+                "/members/", params={"limit": self.members, "search": "ケンショウ"}
+            ),
+            "GET /members (estimated)": lambda: self.client.get(
+                "/members/", params={"limit": self.members, "count": "estimated"}
+            ),
+            "GET /members/stats": lambda: self.client.get("/members/stats"),
+            "GET /members/{id}": lambda: self.client.get(f"/members/{member_id}"),
+            "GET /members/{id}/downline": lambda: self.client.get(
+                f"/members/{self.root_id}/downline", params={"tree": "sponsor", "limit": self.members}
+            ),
+            "POST /members": lambda: self.client.post(
+                "/members/", json=self.new_items(1, self.member_ids)[0]
+            ),
+            "PUT /members/{id}": lambda: self.client.put(
+                f"/members/{member_id}", json={"sponsor_id": self.root_id, "status": "active"}
+            ),
+            "POST /members/bulk": lambda: self.client.post(
+                "/members/bulk", json=self.new_items(self.items, self.member_ids)
+            ),
+            "PATCH /members/bulk": lambda: self.client.patch(
+                "/members/bulk", json=[{"id": i, "status": "suspended"} for i in self.member_ids[:self.items]]
+            ),
+        }
+
+
+async def count_queries(db_engine, members: int, items: int) -> dict:
+    """各リクエストのSQL文数と実行されたSQL文（データは rollback で破棄）"""
+    async with db_engine.connect() as connection:
+        transaction = await connection.begin()
+        db = AsyncSession(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
+
+        async def override_get_db():
+            yield db
+
+        app = FastAPI()
+        app.include_router(members_router, prefix="/members")
+        # 参照用セッションも同じトランザクションで読む（投入したデータが見えるように）
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        # 一括登録・更新は管理者のみ（認証のクエリは数えない）
+        app.dependency_overrides[get_current_active_user] = lambda: Principal(
+            id=1, email="admin@example.com", full_name="admin", role=UserRole.ADMIN.value, is_active=True
+        )
+
+        counts = {}
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                scenario = Scenario(client, members, items)
+                await scenario.seed()
+                for name, send in scenario.requests().items():
+                    # 前のリクエストで読んだエンティティを使い回さない
+                    db.expunge_all()
+                    with QueryCounter(db_engine) as queries:
+                        response = await send()
+                    assert response.status_code < 400, f"{name}: {response.status_code} {response.text}"
+                    counts[name] = queries.statements
+        finally:
+            await db.close()
+            await transaction.rollback()
+    return counts
+
+
+async def test_query_count_does_not_depend_on_row_count(db_engine, monkeypatch):
+    # レスポンスキャッシュを通さずに毎回 DB を読ませる
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    small = await count_queries(db_engine, SMALL, SMALL)
+    large = await count_queries(db_engine, SMALL * SCALE, SMALL * SCALE)
+
+    mismatches = {
+        name: (len(statements), len(large[name]))
+        for name, statements in small.items() if len(statements) != len(large[name])
+    }
+    details = "\n".join(
+        f"--- {name} ({SMALL * SCALE:,} members)\n" + "\n".join(
+            "    " + " ".join(statement.split())[:160] for statement in large[name]
+        )
+        for name in mismatches
+    )
+    assert not mismatches, f"query count depends on row count: {mismatches}\n{details}"
+
+
+async def _add_member_with_sponsor(db: AsyncSession) -> int:
+    sponsor = Member(
+        member_code=f"{MEMBER_CODE_BASE}", family_name="検証", given_name="紹介者",
+        email="lazy-load-sponsor@example.com", registration_date=datetime.utcnow(),
+    )
+    db.add(sponsor)
+    await db.flush()
+    member = Member(
+        member_code=f"{MEMBER_CODE_BASE + 1}", family_name="検証", given_name="会員",
+        email="lazy-load-member@example.com", registration_date=datetime.utcnow(),
+        sponsor_id=sponsor.id, upline_id=sponsor.id,
+    )
+    db.add(member)
+    await db.flush()
+    db.expunge_all()
+    return member.id
+
+
+async def test_member_relationships_are_not_lazy_loaded(db):
+    member_id = await _add_member_with_sponsor(db)
+    member = (await db.execute(select(Member).where(Member.id == member_id))).scalar_one()
+
+    for relationship in ("sponsor", "sponsored_members", "upline", "downline_members", "payments", "rewards"):
+        with pytest.raises(InvalidRequestError):
+            getattr(member, relationship)
+
+
+async def test_member_relationships_load_when_requested(db):
+    member_id = await _add_member_with_sponsor(db)
+    query = select(Member).options(selectinload(Member.sponsor)).where(Member.id == member_id)
+    member = (await db.execute(query)).scalar_one()
+
+    assert member.sponsor.given_name == "紹介者"
\ No newline at end of file
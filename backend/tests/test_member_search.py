@@ -0,0 +1,74 @@
+"""
+IROAS BOSS System - Member Search Tests
+会員一覧のキーセットカーソル・列指定・検索語の正規化・推定件数
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.services.member_search import (
+    COUNT_ESTIMATED,
+    MAX_SEARCH_TERMS,
+    parse_after,
+    parse_fields,
+    search_members,
+    search_terms,
+)
+from tests.factories import make_member
+
+
+def test_keyset_cursor_round_trip():
+    registration_date = datetime(2024, 1, 31, 23, 59, 59, 123456, tzinfo=timezone.utc)
+
+    cursor = encode_cursor(registration_date, 81000001)
+
+    assert parse_after(decode_cursor(cursor, 2)) == (registration_date, 81000001)
+    assert parse_after(None) is None
+
+
+@pytest.mark.parametrize("values", [["yesterday", 1], ["2024-01-31T00:00:00+00:00", "x"], [20240131, 1]])
+def test_invalid_keyset_values(values):
+    # エンドポイントは ValueError / TypeError を 400 にする
+    with pytest.raises((ValueError, TypeError)):
+        parse_after(decode_cursor(encode_cursor(*values), 2))
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields("member_code, family_name,,id") == ("id", "member_code", "family_name")
+
+    with pytest.raises(ValueError, match="account_number"):
+        parse_fields("member_code,account_number")
+
+
+def test_search_terms_are_normalized():
+    assert search_terms("ﾔﾏﾀﾞ　たろう  ＡＢＣ 090-1234-5678 やまだ") == [
+        ("ヤマダ", "ﾔﾏﾀﾞ"),
+        ("タロウ", "たろう"),
+        ("abc", "ＡＢＣ"),
+        ("09012345678", "090-1234-5678"),
+    ]
+    assert len(search_terms(" ".join(f"term{i}" for i in range(10)))) == MAX_SEARCH_TERMS
+    assert search_terms("   ") == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", [None, "ケンショウ", "100%_'; --"])
+async def test_estimated_count_with_search_terms(db, query):
+    # 検索語（引用符・LIKE の特殊文字を含む）はバインドパラメーターで EXPLAIN に渡す
+    page = await search_members(db, query=query, limit=10, count=COUNT_ESTIMATED)
+
+    assert page.total_estimated
+    assert page.total >= 0
+
+@pytest.mark.asyncio
+async def test_exact_count_is_independent_of_the_page(db):
+    db.add_all([make_member(number, given_name="カウント確認") for number in range(1, 4)])
+    await db.flush()
+
+    for skip, expected_rows in ((0, 2), (2, 1), (5, 0)):
+        page = await search_members(db, query="カウント確認", skip=skip, limit=2)
+
+        assert (len(page.members), page.total, page.total_estimated) == (expected_rows, 3, False)
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+IROAS BOSS System - Pagination Cursor Tests
+キーセットページネーション用カーソルの変換・検証
+"""
+
+import base64
+
+import pytest
+
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.services.genealogy import parse_downline_after
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(3, 1024)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == [3, 1024]
+
+
+def test_cursor_is_url_safe():
+    # "?>" は標準の base64 では "/" を含む
+    cursor = encode_cursor("?>?>", 1)
+
+    assert not set(cursor) & set("+/=")
+    assert decode_cursor(cursor, 2) == ["?>?>", 1]
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_missing_cursor(cursor):
+    assert decode_cursor(cursor, 2) is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "!!",                                                       # base64 でない
+    base64.urlsafe_b64encode(b"not json").decode(),             # JSON でない
+    base64.urlsafe_b64encode(b'{"depth": 1}').decode(),         # 配列でない
+    encode_cursor(1),                                           # 要素数が違う
+    encode_cursor(1, 2, 3),
+])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 2)
+
+
+def test_downline_cursor_round_trip():
+    assert parse_downline_after(decode_cursor(encode_cursor(2, 57), 2)) == (2, 57)
+    assert parse_downline_after(None) is None
+
+
+@pytest.mark.parametrize("values", [["1", 2], [1, "x"], [1.5, 2], [True, 2], [None, 2]])
+def test_downline_cursor_values_must_be_integers(values):
+    with pytest.raises(ValueError):
+        parse_downline_after(decode_cursor(encode_cursor(*values), 2))
\ No newline at end of file
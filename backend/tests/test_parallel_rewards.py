@@ -0,0 +1,116 @@
+"""
+IROAS BOSS System - Parallel Reward Calculation Tests
+ツリーのパーティション分割と、並列集計の結果が逐次実行と完全に一致することの確認
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pytest
+
+from app.services.rewards import binary
+from app.services.rewards.binary import compute_leg_volumes
+from app.services.rewards.parallel import PARTITIONS_PER_WORKER, local_parent, partition_tree
+from app.services.rewards.tree import NO_PARENT
+from benchmarks.synthetic_trees import random_binary_tree, random_sponsor_tree
+
+
+def sen_tree(size: int, seed: int):
+    """銭単位の端数を含む売上のバイナリーツリー"""
+    tree = random_binary_tree(size, seed=seed)
+    tree.volume = tree.volume + np.random.default_rng(seed).integers(0, 100, size) / 100
+    return tree
+
+
+@pytest.mark.parametrize("workers", [2, 3, 8])
+def test_partitioning_covers_each_member_once(workers):
+    tree = random_sponsor_tree(5000, seed=workers)
+    partitioning = partition_tree(tree.parent, workers)
+    assert partitioning is not None
+
+    depth = np.empty(tree.size, dtype=np.int64)
+    for level, nodes in enumerate(partitioning.levels):
+        depth[nodes] = level
+    inside = depth >= partitioning.cut_depth
+
+    # 切断位置以下の会員はちょうど1回ずつ order に現れ、上位ノードは現れない
+    assert sorted(partitioning.order.tolist()) == np.flatnonzero(inside).tolist()
+    assert (partitioning.rank[~inside] == -1).all()
+    assert (partitioning.rank[partitioning.order] == np.arange(partitioning.order.size)).all()
+    assert len(partitioning.levels[partitioning.cut_depth]) >= workers * PARTITIONS_PER_WORKER
+
+    # ワーカーの範囲は order を隙間なく分割する
+    assert partitioning.bounds[0][0] == 0
+    assert partitioning.bounds[-1][1] == partitioning.order.size
+    assert all(end == start for (_, end), (start, _) in zip(partitioning.bounds, partitioning.bounds[1:]))
+
+    # 各会員の親は同じワーカーの担当範囲内か、上位ノード（パーティションの頂点の場合）
+    worker = np.full(tree.size, -1)
+    for number, (start, end) in enumerate(partitioning.bounds):
+        worker[partitioning.order[start:end]] = number
+    children = partitioning.order[depth[partitioning.order] > partitioning.cut_depth]
+    assert (worker[tree.parent[children]] == worker[children]).all()
+
+
+def test_partitioning_is_deterministic():
+    tree = random_sponsor_tree(3000, seed=7)
+    first = partition_tree(tree.parent, 4)
+    second = partition_tree(tree.parent, 4)
+
+    assert np.array_equal(first.order, second.order)
+    assert first.bounds == second.bounds
+
+
+def test_narrow_tree_is_not_partitioned():
+    chain = np.arange(-1, 99, dtype=np.int64)
+
+    assert partition_tree(chain, 2) is None
+
+
+def test_local_parent_treats_parents_outside_the_range_as_roots():
+    #     0
+    #   1   2
+    #  3 4   5
+    parent = np.array([NO_PARENT, 0, 0, 1, 1, 2], dtype=np.int64)
+    nodes = np.array([1, 3, 4])
+    rank = np.full(parent.size, -1)
+    rank[nodes] = np.arange(nodes.size) + 10
+
+    assert local_parent(parent, rank, nodes, 10).tolist() == [NO_PARENT, 0, 0]
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_parallel_leg_volumes_are_identical_to_serial(workers, monkeypatch):
+    tree = sen_tree(20000, seed=workers)
+    expected_left, expected_right = compute_leg_volumes(tree)
+
+    monkeypatch.setattr(binary, "PARALLEL_MIN_MEMBERS", 0)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        left, right = compute_leg_volumes(tree, workers, executor=pool)
+
+    assert np.array_equal(left, expected_left)
+    assert np.array_equal(right, expected_right)
+
+
+def test_parallel_leg_volumes_in_worker_processes(monkeypatch):
+    tree = sen_tree(20000, seed=11)
+    expected_left, expected_right = compute_leg_volumes(tree)
+
+    monkeypatch.setattr(binary, "PARALLEL_MIN_MEMBERS", 0)
+    with ProcessPoolExecutor(max_workers=2, mp_context=get_context("spawn")) as pool:
+        left, right = compute_leg_volumes(tree, 2, executor=pool)
+
+    assert np.array_equal(left, expected_left)
+    assert np.array_equal(right, expected_right)
+
+
+def test_small_trees_fall_back_to_serial():
+    tree = sen_tree(1000, seed=5)
+
+    # PARALLEL_MIN_MEMBERS 未満ではプールを使わない
+    left, right = compute_leg_volumes(tree, 4, executor=None)
+    expected_left, expected_right = compute_leg_volumes(tree)
+
+    assert np.array_equal(left, expected_left)
+    assert np.array_equal(right, expected_right)
\ No newline at end of file
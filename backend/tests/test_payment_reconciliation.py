@@ -0,0 +1,70 @@
+"""
+IROAS BOSS System - Payment Reconciliation Tests
+結果行と処理中決済の引き当て（同一会員・同一金額が複数ある場合）
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.models.payment import Payment, PaymentMethod, PaymentResult, PaymentStatus
+from app.services.payment_reconciliation import RESULT_FAILURE, RESULT_SUCCESS, ResultLine, reconcile_results
+from tests.factories import make_member, member_code
+
+
+pytestmark = pytest.mark.asyncio
+
+
+def pending_payment(member_id: int, amount: int, due_day: int) -> Payment:
+    return Payment(
+        member_id=member_id,
+        amount=Decimal(amount),
+        payment_method=PaymentMethod.BANK_TRANSFER.value,
+        status=PaymentStatus.PENDING.value,
+        due_date=datetime(2031, 5, due_day, tzinfo=timezone.utc),
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [5000, 1])
+async def test_same_member_and_amount_settle_separate_payments(db, chunk_size):
+    member = make_member(8400)
+    db.add(member)
+    await db.flush()
+    later = pending_payment(member.id, 5000, 27)
+    earlier = pending_payment(member.id, 5000, 12)
+    db.add_all([later, earlier])
+    await db.flush()
+
+    code = member_code(8400)
+    summary = await reconcile_results(
+        db,
+        [
+            ResultLine(line_number=2, member_code=code, amount=Decimal(5000), succeeded=True),
+            ResultLine(line_number=3, member_code=code, amount=Decimal(5000), succeeded=False, error_message="残高不足"),
+            ResultLine(line_number=4, member_code=code, amount=Decimal(7000), succeeded=True),
+        ],
+        source="105024_TrnsCSV_test.csv",
+        process_type="bank_transfer",
+        payment_method=PaymentMethod.BANK_TRANSFER.value,
+        chunk_size=chunk_size,
+    )
+
+    assert (summary.lines, summary.succeeded, summary.failed, summary.unmatched) == (3, 1, 1, 1)
+    assert summary.unmatched_lines == [(4, code, "no pending payment for member and amount")]
+
+    # 行番号順に支払期限の早い決済から引き当てる
+    statuses = dict((await db.execute(
+        select(Payment.id, Payment.status).where(Payment.id.in_([earlier.id, later.id]))
+    )).all())
+    assert statuses == {earlier.id: PaymentStatus.COMPLETED.value, later.id: PaymentStatus.FAILED.value}
+
+    results = (await db.execute(
+        select(PaymentResult.payment_id, PaymentResult.result_status, PaymentResult.notes)
+        .where(PaymentResult.payment_id.in_([earlier.id, later.id]))
+    )).all()
+    assert sorted(results) == sorted([
+        (earlier.id, RESULT_SUCCESS, None),
+        (later.id, RESULT_FAILURE, "残高不足"),
+    ])
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+IROAS BOSS System - Principal Cache Tests
+トークンのクレームによる認証と、失効後の DB 参照への切り替え
+"""
+
+import time
+
+import pytest
+
+from app.core.principals import Principal, PrincipalCache
+
+
+pytestmark = pytest.mark.asyncio
+
+SUBJECT = "admin@example.com"
+PRINCIPAL = Principal(id=1, email=SUBJECT, full_name="管理者", role="admin", is_active=True)
+# DB 上の最新の状態（権限を変更済み）
+DB_PRINCIPAL = Principal(id=1, email=SUBJECT, full_name="管理者", role="viewer", is_active=True)
+
+
+class FakeRedis:
+    """プロセス間で共有される Redis の代わり（get / set のみ）"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+class FakeConnection:
+    def __init__(self, client):
+        self._client = client
+        self.down = client is None
+
+    def client(self):
+        return self._client
+
+    def failed(self, error):
+        self.down = True
+
+    async def close(self):
+        pass
+
+
+class Loader:
+    """DB からの読み込み（呼ばれた回数を数える）"""
+
+    def __init__(self, principal=DB_PRINCIPAL):
+        self.principal = principal
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.principal
+
+
+def make_cache(client, local_ttl=30):
+    cache = PrincipalCache(
+        url="redis://unused", prefix="test:principal", ttl=300, local_ttl=local_ttl,
+        local_max_bytes=1 << 20, token_ttl=1800, retry_seconds=30,
+    )
+    cache.redis = FakeConnection(client)
+    return cache
+
+
+def token(issued_at, principal=PRINCIPAL):
+    return {**principal.claims(), "iat": issued_at}
+
+
+async def test_claims_are_used_without_revocation():
+    cache = make_cache(FakeRedis())
+    load = Loader()
+
+    assert await cache.resolve(token(int(time.time())), load) == PRINCIPAL
+    assert load.calls == 0
+    assert cache.stats.claims == 1
+
+
+async def test_tokens_issued_before_revocation_use_the_database():
+    cache = make_cache(FakeRedis())
+    load = Loader()
+    issued_at = int(time.time()) - 60
+
+    await cache.revoke(SUBJECT)
+
+    assert await cache.resolve(token(issued_at), load) == DB_PRINCIPAL
+    # 2回目以降は DB から読んだプリンシパルをキャッシュから使う
+    assert await cache.resolve(token(issued_at), load) == DB_PRINCIPAL
+    assert load.calls == 1
+    assert (cache.stats.db_loads, cache.stats.cached) == (1, 1)
+
+
+async def test_tokens_issued_after_revocation_use_claims():
+    cache = make_cache(FakeRedis())
+    load = Loader()
+
+    await cache.revoke(SUBJECT)
+    reissued = token(int(time.time()) + 1, DB_PRINCIPAL)
+
+    assert await cache.resolve(reissued, load) == DB_PRINCIPAL
+    assert load.calls == 0
+
+
+async def test_revocation_in_another_process():
+    shared = FakeRedis()
+    cache = make_cache(shared, local_ttl=0)
+    other_process = make_cache(shared)
+    load = Loader()
+    issued_at = int(time.time()) - 60
+
+    assert await cache.resolve(token(issued_at), load) == PRINCIPAL
+    await other_process.revoke(SUBJECT)
+
+    # プロセス内LRUの TTL が切れた後は Redis の失効記録を読む
+    assert await cache.resolve(token(issued_at), load) == DB_PRINCIPAL
+    assert load.calls == 1
+
+
+async def test_claims_are_not_trusted_while_redis_is_down():
+    cache = make_cache(None)
+    load = Loader()
+    issued_at = int(time.time())
+
+    assert await cache.resolve(token(issued_at), load) == DB_PRINCIPAL
+    assert await cache.resolve(token(issued_at), load) == DB_PRINCIPAL
+    assert load.calls == 1
+
+
+async def test_old_tokens_without_principal_claims_use_the_database():
+    cache = make_cache(FakeRedis())
+    load = Loader()
+
+    assert await cache.resolve({"sub": SUBJECT, "iat": int(time.time())}, load) == DB_PRINCIPAL
+    assert load.calls == 1
+
+
+async def test_deleted_user_is_not_cached():
+    cache = make_cache(FakeRedis())
+    load = Loader(principal=None)
+    issued_at = int(time.time()) - 60
+
+    await cache.revoke(SUBJECT)
+
+    assert await cache.resolve(token(issued_at), load) is None
+    assert await cache.resolve(token(issued_at), load) is None
+    assert load.calls == 2
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+IROAS BOSS System - Unilevel Bonus Engine Tests
+段別下位売上・ユニレベルボーナスを参照実装（子を再帰で辿る）と照合する
+"""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.rewards.unilevel import (
+    compute_level_volumes,
+    compute_unilevel_commissions,
+    resolve_level_rates,
+    unilevel_levels,
+)
+from benchmarks.synthetic_trees import random_sponsor_tree
+from benchmarks.unilevel_bonus_benchmark import reference_commissions
+
+
+# 0 <- 1 <- 2 <- 3、0 <- 4
+PARENT = np.array([-1, 0, 1, 2, 0], dtype=np.int64)
+VOLUME = np.array([100.0, 200.0, 300.0, 400.0, 500.0])
+
+
+def test_level_volumes_of_chain():
+    level_volumes = compute_level_volumes(PARENT, VOLUME, 4)
+
+    assert level_volumes[:, 0].tolist() == [700.0, 300.0, 400.0, 0.0]
+    assert level_volumes[:, 1].tolist() == [300.0, 400.0, 0.0, 0.0]
+    assert level_volumes[:, 3].tolist() == [0.0, 0.0, 0.0, 0.0]
+
+
+@pytest.mark.parametrize("size, seed, rates", [
+    (1, 0, [0.1]),
+    (300, 1, [0.05, 0.04, 0.03]),
+    (3000, 2, [0.1, 0.07, 0.05, 0.03, 0.02, 0.01, 0.01]),
+])
+def test_commissions_match_reference(size, seed, rates):
+    tree = random_sponsor_tree(size, seed=seed)
+
+    commissions, _ = compute_unilevel_commissions(tree, rates)
+
+    np.testing.assert_array_equal(commissions, reference_commissions(tree, rates))
+
+
+def test_no_rates_pays_nothing():
+    tree = random_sponsor_tree(50, seed=3)
+
+    commissions, level_volumes = compute_unilevel_commissions(tree, [])
+
+    assert not commissions.any()
+    assert level_volumes.shape == (0, tree.size)
+
+
+def test_resolve_level_rates(monkeypatch):
+    assert resolve_level_rates([0.1, 0.05, 0.02], max_depth=2) == [0.1, 0.05]
+
+    monkeypatch.setattr(settings, "UNILEVEL_LEVEL_RATES", [])
+    monkeypatch.setattr(settings, "UNILEVEL_BONUS_RATE", 0.03)
+    assert resolve_level_rates(max_depth=3) == [0.03, 0.03, 0.03]
+
+
+def test_levels_detail_lists_only_levels_with_sales():
+    levels = unilevel_levels(np.array([700.0, 0.0, 123.456]), [0.1, 0.05, 0.02])
+
+    assert levels == [
+        {"depth": 1, "sales": 700.0, "rate": 0.1},
+        {"depth": 3, "sales": 123.46, "rate": 0.02},
+    ]
\ No newline at end of file